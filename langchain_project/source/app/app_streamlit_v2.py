@@ -8,7 +8,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from chains.qa_chain_with_metrics import get_qa_chain_with_metrics
-from vectorstore.retriever import get_retriever
+from vectorstore.registry import get_registry
 from evaluation.judge import LLMJudge
 from evaluation.store import EvaluationStore
 
@@ -201,10 +201,38 @@ with st.sidebar:
         col1, col2 = st.columns(2)
         with col1:
             st.metric(response_time_label, f"{response_time:.2f}초")
-            st.caption(f"검색: {metrics.get('retrieval_time', 0):.2f}초 | 생성: {metrics.get('generation_time', 0):.2f}초")
+            classification_label = {"local": "로컬", "llm": "LLM", "fallback": "키워드(LLM 실패)", "cache": "캐시"}.get(metrics.get('classification_source'), "-")
+            st.caption(
+                f"분류({classification_label}): {metrics.get('classification_time', 0):.2f}초 | "
+                f"임베딩: {metrics.get('embedding_time', 0):.2f}초 | "
+                f"검색: {metrics.get('retrieval_time', 0):.2f}초 | 생성: {metrics.get('generation_time', 0):.2f}초"
+            )
+            if metrics.get('time_to_first_token') is not None:
+                st.caption(
+                    f"첫 토큰: {metrics['time_to_first_token']:.2f}초"
+                    + (f" | 출력 {metrics['tokens_per_second']:.1f} tok/s" if metrics.get('tokens_per_second') else "")
+                )
+            if metrics.get('speculative_overlap_time'):
+                st.caption(f"분류와 동시 검색: {metrics['speculative_overlap_time']:.2f}초 겹침")
         with col2:
             st.metric("토큰 사용", f"{metrics.get('total_tokens', 0):,}")
             st.caption(f"검색 문서: {metrics.get('retrieved_docs_count', 0)}개")
+            if metrics.get('context_token_budget'):
+                st.caption(
+                    f"컨텍스트: {metrics['context_tokens']:,}/{metrics['context_token_budget']:,} 토큰"
+                    + (f" (트리 형식 -{metrics['context_tokens_saved']:,})" if metrics.get('context_tokens_saved') else "")
+                    + (f" (잘림 {metrics['context_docs_truncated']} / 제외 {metrics['context_docs_dropped']})"
+                       if metrics.get('context_docs_truncated') or metrics.get('context_docs_dropped') else "")
+                )
+        
+        if metrics.get('answer_cache_hit'):
+            st.info(f"⚡ 비슷한 질문의 답변 재사용 (유사도 {metrics['answer_cache_similarity']:.3f})")
+        
+        if metrics.get('article_lookup_hits'):
+            st.info(
+                f"📌 조항 색인 직접 조회: {metrics['article_lookup_hits']}개 조항"
+                + (" (분류 생략)" if metrics.get('classification_skipped') else "")
+            )
         
         if metrics.get('fallback_activated'):
             st.warning("⚠️ 필터 실패 → 전체 검색")
@@ -367,10 +395,10 @@ with col1:
         st.session_state.init_attempted = True
         with st.spinner("🔄 시스템 초기화 중..."):
             try:
-                # Qdrant 연결 테스트
-                retriever = get_retriever()
+                # Qdrant 연결 테스트 + client/임베딩 모델/retriever/tokenizer 미리 생성
+                get_registry().warm_up()
                 st.session_state.qdrant_ready = True
-                st.session_state.qa_chain = get_qa_chain_with_metrics(enable_metrics=True)
+                st.session_state.qa_chain = get_qa_chain_with_metrics(enable_metrics=True, streaming=True)
             except ConnectionRefusedError as e:
                 st.session_state.qdrant_ready = False
                 st.markdown(f"""
@@ -423,16 +451,28 @@ with col1:
                 st.session_state.last_processed_question is None
             )
             
+            # 스트리밍 답변 표시 영역 (완료되면 비우고 아래 답변 박스에 최종 답변 표시)
+            stream_box = st.empty()
             with st.spinner("🔍 약관을 검색하고 답변을 생성 중입니다..."):
                 # 스피너 블록 시작 직후 시간 측정 (실제 사용자가 보기 시작하는 시점)
                 user_start_time = time.time()
                 
                 try:
-                    # 답변 생성 (메트릭 포함)
-                    result = st.session_state.qa_chain.invoke({
+                    # 답변 생성 (메트릭 포함): 검색 결과 → 답변 토큰 → 완료 이벤트 순서로 도착
+                    result = None
+                    streamed_answer = ""
+                    for event in st.session_state.qa_chain.stream({
                         "question": question,
                         "enable_metrics": st.session_state.enable_evaluation
-                    })
+                    }):
+                        if event["type"] == "metadata":
+                            stream_box.info(f"📑 {event.get('insurance_type') or '-'} 약관 {len(event.get('docs', []))}개 조항 검색 완료 → 답변 생성 중...")
+                        elif event["type"] == "token":
+                            streamed_answer += event["content"]
+                            stream_box.markdown(streamed_answer + "▌")
+                        else:
+                            result = {k: v for k, v in event.items() if k != "type"}
+                    stream_box.empty()
                     
                     # 작업 완료 직후 시간 측정 (답변 생성 완료 시점)
                     user_end_time = time.time()
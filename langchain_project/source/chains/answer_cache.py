@@ -0,0 +1,161 @@
+# chains/answer_cache.py
+"""
+의미 기반 답변 캐시 (프로세스 메모리)
+
+표현만 다른 같은 질문("실손 청구 서류가 뭐예요?" / "실손보험 청구할 때 필요한 서류")은
+질문 임베딩의 cosine 유사도가 threshold 이상이고 보험유형이 같으면 이전 답변을 그대로 쓴다.
+검색/생성(LLM)을 모두 건너뛰므로 인기 질문은 수 ms 안에 답한다.
+
+- 보험유형별로 저장하고 조회도 보험유형 범위 안에서만 한다
+  (같은 질문이라도 유형이 다르면 다른 답변, 조회 범위는 insurance_classifier.answer_cache_types)
+- TTL이 지난 항목은 쓰지 않고, max_entries를 넘으면 가장 오래 안 쓰인 항목부터 삭제
+- 컬렉션 버전(적재 상태)이 바뀌면 전체 삭제
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL_SECONDS
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    insurance_type: str
+    vector: np.ndarray  # 정규화된 질문 임베딩
+    result: Dict[str, Any]  # answer / docs / context / level_* ...
+    created_at: float
+    last_used: float
+
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+
+class SemanticAnswerCache:
+    """
+    (보험유형, 질문 임베딩) → 이전 답변
+
+    Args:
+        max_entries: 최대 저장 답변 수
+        ttl_seconds: 저장 후 유효 시간
+        threshold: 같은 질문으로 볼 최소 cosine 유사도
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self.version: Optional[str] = None
+        self._entries: Dict[str, List[CachedAnswer]] = {}
+        self._matrices: Dict[str, np.ndarray] = {}  # 보험유형별 (n, dim) 행렬 (변경 시 다시 쌓음)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _check_version(self, version: Optional[str]):
+        if version != self.version:
+            self._entries.clear()
+            self._matrices.clear()
+            self.version = version
+
+    def get(
+        self, query_vector: Sequence[float], insurance_types: Sequence[str], version: Optional[str] = None
+    ) -> Optional[Tuple[CachedAnswer, float]]:
+        """
+        insurance_types 안에서 가장 비슷한 이전 질문의 답변 (threshold 미만이거나 만료되었으면 None)
+        → (항목, 유사도), 유형은 항목의 insurance_type
+        """
+        now = time.time()
+        vector = _normalize(query_vector)
+        with self._lock:
+            self._check_version(version)
+            best: Optional[Tuple[CachedAnswer, float]] = None
+            for t in insurance_types:
+                found = self._best_match(t, vector, now)
+                if found is not None and (best is None or found[1] > best[1]):
+                    best = found
+
+            if best is None:
+                self.misses += 1
+                return None
+            best[0].last_used = now
+            self.hits += 1
+            return best
+
+    def _best_match(
+        self, insurance_type: str, vector: np.ndarray, now: float
+    ) -> Optional[Tuple[CachedAnswer, float]]:
+        """한 보험유형 안에서 threshold 이상이고 만료되지 않은 가장 비슷한 항목"""
+        entries = self._entries.get(insurance_type)
+        if not entries:
+            return None
+
+        matrix = self._matrices.get(insurance_type)
+        if matrix is None:
+            matrix = np.stack([e.vector for e in entries])
+            self._matrices[insurance_type] = matrix
+
+        similarities = matrix @ vector
+        for i in np.argsort(-similarities):
+            if similarities[i] < self.threshold:
+                break
+            entry = entries[int(i)]
+            if now - entry.created_at <= self.ttl_seconds:
+                return entry, float(similarities[i])
+        return None
+
+    def put(
+        self,
+        question: str,
+        query_vector: Sequence[float],
+        insurance_type: str,
+        result: Dict[str, Any],
+        version: Optional[str] = None,
+    ):
+        now = time.time()
+        with self._lock:
+            self._check_version(version)
+            entries = self._entries.setdefault(insurance_type, [])
+            entries[:] = [e for e in entries if now - e.created_at <= self.ttl_seconds]
+            entries.append(CachedAnswer(question, insurance_type, _normalize(query_vector), result, now, now))
+            self._matrices.pop(insurance_type, None)
+            while len(self) > self.max_entries:
+                self._evict_one()
+
+    def _evict_one(self):
+        """전체 보험유형 중 가장 오래 안 쓰인 항목 하나 삭제"""
+        insurance_type, index = min(
+            (
+                (t, i)
+                for t, entries in self._entries.items()
+                for i in range(len(entries))
+            ),
+            key=lambda item: self._entries[item[0]][item[1]].last_used,
+        )
+        del self._entries[insurance_type][index]
+        self._matrices.pop(insurance_type, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+
+# 프로세스 전역 (모든 chain 인스턴스가 공유)
+_answer_cache = SemanticAnswerCache(ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_THRESHOLD)
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    return _answer_cache
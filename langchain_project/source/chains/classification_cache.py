@@ -0,0 +1,77 @@
+# chains/classification_cache.py
+"""
+보험유형 분류 결과 캐시 (프로세스 메모리, LRU + TTL)
+
+사이드바 예시 질문처럼 같은 질문(또는 공백/문장부호만 다른 질문)이 반복되면
+LLM 분류를 다시 호출하지 않고 이전 결과를 그대로 쓴다.
+키는 NFKC 정규화 + 소문자화 후 공백/문장부호/제어문자를 모두 뺀 질문이다.
+"""
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# 키에서 제외하는 유니코드 범주: 문장부호(P*), 공백/구분자(Z*), 제어/서식 문자(C*)
+_IGNORED_CATEGORIES = ("P", "Z", "C")
+
+
+def normalize_question(question: str) -> str:
+    """'자동차 사고 보상은?' / '자동차사고 보상은' → 같은 키"""
+    text = unicodedata.normalize("NFKC", question or "").casefold()
+    return "".join(ch for ch in text if unicodedata.category(ch)[0] not in _IGNORED_CATEGORIES)
+
+
+class ClassificationCache(Generic[T]):
+    """
+    정규화된 질문 → 분류 결과
+
+    Args:
+        max_entries: 최대 저장 개수 (초과 시 가장 오래 안 쓰인 것부터 삭제)
+        ttl_seconds: 저장 후 유효 시간 (분류기/컬렉션이 바뀌어도 이 시간이 지나면 다시 분류)
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, question: str) -> Optional[T]:
+        key = normalize_question(question)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, question: str, value: T):
+        key = normalize_question(question)
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -1,7 +1,22 @@
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
 from langchain_core.prompts import PromptTemplate
 
-from llm.llm import get_llm
-from config.settings import ALLOWED_INSURANCE_TYPES
+from chains.classification_cache import ClassificationCache, normalize_question
+from chains.keyword_matcher import KeywordMatcher
+from llm.llm import get_llm, hedged_invoke
+from vectorstore.article_index import mentioned_insurance_types
+from vectorstore.registry import get_registry
+from config.settings import (
+    ALLOWED_INSURANCE_TYPES,
+    CLASSIFICATION_BATCH_CONCURRENCY,
+    CLASSIFICATION_CACHE_ENABLED,
+    CLASSIFICATION_CACHE_MAX_ENTRIES,
+    CLASSIFICATION_CACHE_TTL_SECONDS,
+    LLM_HEDGE_CLASSIFICATION,
+    TYPE_CLASSIFIER_MIN_CONFIDENCE,
+)
 
 INSURANCE_CLASSIFY_PROMPT = PromptTemplate.from_template("""
 다음 질문이 어떤 보험유형에 해당하는지 하나만 골라라.
@@ -24,72 +39,302 @@ INSURANCE_CLASSIFY_PROMPT = PromptTemplate.from_template("""
 """)
 
 
-def classify_insurance_type(question: str) -> str:
+# LLM 분류 실패 시 사용하는 키워드 규칙 (위에 있을수록 우선, 가중치를 생략하면 1.0)
+INSURANCE_KEYWORD_RULES = [
+    # 사고 / 상해
+    ("상해보험", ["사고", "다쳤", "부상", "골절", "상해", "넘어", "충돌", "추락"]),
+    # 질병 / 진단 / 의료
+    ("질병보험", [
+        "질병", "진단", "암", "뇌출혈", "뇌경색",
+        "입원", "수술", "치료", "병원", "의사",
+    ]),
+    # 자동차
+    ("자동차보험", ["자동차", "차량", "교통사고", "운전", "추돌", "렌트카"]),
+    # 화재
+    ("화재보험", ["화재", "불", "전소", "연기", "폭발", "누전"]),
+    # 책임보험 (손해배상 성격)
+    ("책임보험", ["배상", "손해배상", "책임", "과실", "법적책임", "배상책임"]),
+    # 손해보험 (재산 피해)
+    ("손해보험", [
+        "도난", "침수", "파손", "망가", "훼손",
+        "재산", "시설", "기계", "건물", "누수",
+    ]),
+    # 연금보험
+    ("연금보험", [
+        "연금", "노후", "은퇴", "퇴직", "연금수령",
+        "연금개시", "연금액", "노령",
+    ]),
+]
+
+# 모듈 로드 시 한 번만 컴파일 (질문당 한 번 훑어서 모든 카테고리/가중치를 구함)
+KEYWORD_MATCHER = KeywordMatcher(INSURANCE_KEYWORD_RULES)
+
+
+@dataclass(frozen=True)
+class InsuranceTypePrediction:
+    """보험유형 분류 결과 (캐시와 여러 호출자가 같은 객체를 공유하므로 불변, 바꿀 때는 replace)"""
+    insurance_type: str
+    confidence: Optional[float] = None  # 로컬 분류기 confidence (LLM만 쓴 경우 None)
+    # "local" | "llm" | "fallback"(LLM 실패 → 키워드 규칙/기본값) | "cache" | "default" | "pending"(LLM 분류 전)
+    source: str = "llm"
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+# 반복 질문 분류 결과 캐시 (프로세스 전역)
+classification_cache: ClassificationCache[InsuranceTypePrediction] = ClassificationCache(
+    CLASSIFICATION_CACHE_MAX_ENTRIES, CLASSIFICATION_CACHE_TTL_SECONDS
+)
+
+
+def predict_insurance_type(
+    question: str,
+    query_vector: Optional[List[float]] = None,
+    on_llm_fallback: Optional[Callable[[], None]] = None,
+) -> InsuranceTypePrediction:
+    """
+    보험유형 분류: 캐시 → 로컬 centroid 분류기 → (confidence가 낮으면) LLM 분류
+
+    Args:
+        question: 사용자 질문
+        query_vector: 검색에 쓰는 질문 임베딩 (없으면 여기서 계산, 분류기가 없으면 계산하지 않음)
+        on_llm_fallback: LLM 호출 직전에 부르는 함수 (LLM을 기다리는 동안 검색을 미리 시작할 때 사용)
+    """
+    return finish_insurance_type(
+        question, predict_insurance_type_locally(question, query_vector), on_llm_fallback
+    )
+
+
+def predict_insurance_type_locally(
+    question: str,
+    query_vector: Optional[List[float]] = None,
+) -> InsuranceTypePrediction:
+    """
+    LLM 없이 분류: 캐시 → 로컬 centroid 분류기
+    confidence가 낮거나 분류기가 없으면 source "pending" (finish_insurance_type에서 LLM 분류)
+    """
+    if not question or not question.strip():
+        return InsuranceTypePrediction("질병보험", source="default")  # 기본값 반환
+
+    if CLASSIFICATION_CACHE_ENABLED:
+        cached = classification_cache.get(question)
+        if cached is not None:
+            print(f"[DEBUG] cached classification: {cached.insurance_type} ({cached.source})")
+            return replace(cached, source="cache")
+
+    registry = get_registry()
+    classifier = registry.type_classifier
+    if classifier is None:
+        return InsuranceTypePrediction("", source="pending")
+
+    if query_vector is None:
+        query_vector = registry.embed_query(question)
+    insurance_type, confidence, scores = classifier.predict(query_vector)
+    print(f"[DEBUG] local classification: {insurance_type} (confidence {confidence:.2f})")
+    if confidence < TYPE_CLASSIFIER_MIN_CONFIDENCE or insurance_type not in ALLOWED_INSURANCE_TYPES:
+        return InsuranceTypePrediction(insurance_type, confidence, "pending", scores)
+
+    prediction = InsuranceTypePrediction(insurance_type, confidence, "local", scores)
+    if CLASSIFICATION_CACHE_ENABLED:
+        classification_cache.put(question, prediction)
+    return prediction
+
+
+def finish_insurance_type(
+    question: str,
+    prediction: InsuranceTypePrediction,
+    on_llm_fallback: Optional[Callable[[], None]] = None,
+) -> InsuranceTypePrediction:
+    """predict_insurance_type_locally 결과가 "pending"이면 LLM 분류, 아니면 그대로"""
+    if prediction.source != "pending":
+        return prediction
+
+    if on_llm_fallback is not None:
+        on_llm_fallback()
+    insurance_type, ok = _classify_with_llm(question)
+    prediction = replace(prediction, insurance_type=insurance_type, source="llm" if ok else "fallback")
+    # LLM 실패로 대체한 결과는 다음 요청에서 다시 분류
+    if CLASSIFICATION_CACHE_ENABLED and ok:
+        classification_cache.put(question, prediction)
+    return prediction
+
+
+def answer_cache_types(question: str, prediction: InsuranceTypePrediction) -> List[str]:
+    """
+    LLM 분류 전에 답변 캐시를 조회할 보험유형 범위
+    - 캐시 / 로컬 분류기로 유형이 정해졌으면 그 유형만
+    - 아니면 질문에 적힌 보험유형 이름, 없으면 키워드 규칙에 걸린 유형들
+      ("화재보험 청구 서류" → 화재보험의 답변만)
+    - 둘 다 없으면 빈 목록 (조회하지 않음, 다른 유형의 답변을 쓰지 않도록)
+    """
+    if prediction.source in ("cache", "local"):
+        return [prediction.insurance_type]
+    if prediction.source != "pending":
+        return []
+    named = mentioned_insurance_types(question, ALLOWED_INSURANCE_TYPES)
+    if named:
+        return sorted(named)
+    return [t for t in KEYWORD_MATCHER.match(question.replace(" ", "")) if t in ALLOWED_INSURANCE_TYPES]
+
+
+def classify_insurance_type(question: str, query_vector: Optional[List[float]] = None) -> str:
+    return predict_insurance_type(question, query_vector).insurance_type
+
+
+def predict_insurance_types(
+    questions: Sequence[str],
+    query_vectors: Optional[Sequence[List[float]]] = None,
+    max_concurrency: int = CLASSIFICATION_BATCH_CONCURRENCY,
+) -> List[InsuranceTypePrediction]:
+    """
+    여러 질문 일괄 분류 (오프라인 평가/backfill용)
+    캐시 → 로컬 분류기(질문 임베딩을 한 번에 배치 계산) → 남은 질문만 LLM batch
+
+    Args:
+        questions: 질문 목록 (같은 질문은 정규화 기준으로 한 번만 분류)
+        query_vectors: questions와 같은 순서의 질문 임베딩 (없으면 필요할 때 배치 계산)
+        max_concurrency: LLM 동시 요청 수
+    """
+    questions = list(questions)
+    results: List[Optional[InsuranceTypePrediction]] = [None] * len(questions)
+
+    # 같은 질문(공백/문장부호만 다른 질문 포함)은 대표 질문 하나만 분류
+    members: Dict[str, List[int]] = {}
+    for i, question in enumerate(questions):
+        if not question or not question.strip():
+            results[i] = InsuranceTypePrediction("질병보험", source="default")  # 기본값
+            continue
+        members.setdefault(normalize_question(question), []).append(i)
+
+    # 1. 캐시
+    pending: List[int] = []
+    for indexes in members.values():
+        cached = classification_cache.get(questions[indexes[0]]) if CLASSIFICATION_CACHE_ENABLED else None
+        if cached is not None:
+            for i in indexes:
+                results[i] = replace(cached, source="cache")
+        else:
+            pending.append(indexes[0])
+    cache_hits = len(members) - len(pending)
+
+    # 2. 로컬 분류기
+    predictions: Dict[int, InsuranceTypePrediction] = {}
+    classifier = get_registry().type_classifier if pending else None
+    if classifier is not None:
+        if query_vectors is not None:
+            vectors = [query_vectors[i] for i in pending]
+        else:
+            vectors = get_registry().embed_queries([questions[i] for i in pending])
+        for i, vector in zip(pending, vectors):
+            insurance_type, confidence, scores = classifier.predict(vector)
+            source = (
+                "local"
+                if confidence >= TYPE_CLASSIFIER_MIN_CONFIDENCE and insurance_type in ALLOWED_INSURANCE_TYPES
+                else "pending"
+            )
+            predictions[i] = InsuranceTypePrediction(insurance_type, confidence, source, scores)
+    else:
+        for i in pending:
+            predictions[i] = InsuranceTypePrediction("", source="pending")
+
+    # 3. LLM batch (confidence가 낮거나 분류기가 없는 질문만)
+    llm_indexes = [i for i in pending if predictions[i].source == "pending"]
+    if llm_indexes:
+        classified = _classify_batch_with_llm(
+            [questions[i] for i in llm_indexes], max_concurrency=max_concurrency
+        )
+        for i, (insurance_type, ok) in zip(llm_indexes, classified):
+            predictions[i] = replace(
+                predictions[i], insurance_type=insurance_type, source="llm" if ok else "fallback"
+            )
+
+    for i in pending:
+        if CLASSIFICATION_CACHE_ENABLED and predictions[i].source != "fallback":
+            classification_cache.put(questions[i], predictions[i])
+        for j in members[normalize_question(questions[i])]:
+            results[j] = predictions[i]
+
+    print(
+        f"[DEBUG] batch classification: {len(questions)}개 질문 "
+        f"(캐시 {cache_hits} / 로컬 {len(pending) - len(llm_indexes)} / LLM {len(llm_indexes)})"
+    )
+    return results  # type: ignore[return-value]
+
+
+def classify_insurance_types(
+    questions: Sequence[str], max_concurrency: int = CLASSIFICATION_BATCH_CONCURRENCY
+) -> List[str]:
+    return [p.insurance_type for p in predict_insurance_types(questions, max_concurrency=max_concurrency)]
+
+
+def _first_line(response) -> str:
+    content = getattr(response, "content", "") or ""
+    return content.strip().splitlines()[0] if content.strip() else ""
+
+
+def _resolve_insurance_type(question: str, raw: str) -> Tuple[str, bool]:
+    """
+    LLM 응답 → (보험유형, LLM 응답을 그대로 썼는지)
+    목록에 없는 응답이면 키워드 규칙 → 기본값으로 대체하고 False
+    """
+    q = question.replace(" ", "")
+
+    # 1️⃣ LLM이 정확히 맞춘 경우
+    if raw in ALLOWED_INSURANCE_TYPES:
+        return raw, True
+
+    # 2️⃣~8️⃣ 키워드 규칙 (INSURANCE_KEYWORD_RULES 순서가 우선순위)
+    matched = KEYWORD_MATCHER.match(q)
+    if matched:
+        print(f"[DEBUG] keyword classification: {matched}")
+        return next(iter(matched)), False
+
+    # 9️⃣ 최후 기본값 (가장 많이 쓰이는 영역)
+    return "질병보험", False
+
+
+def _classify_with_llm(question: str) -> Tuple[str, bool]:
+    """(보험유형, LLM 분류 성공 여부) - 호출 실패/목록에 없는 응답이면 키워드 규칙 → 기본값, False"""
     if not question or not question.strip():
-        return "질병보험"  # 기본값 반환
+        return "질병보험", False  # 기본값 반환
     
-    llm = get_llm()
+    llm = get_llm("classification")
     try:
-        response = llm.invoke(
-            INSURANCE_CLASSIFY_PROMPT.format(question=question)
-        )
-        raw = response.content.strip().splitlines()[0] if response.content else ""  # type: ignore
+        prompt = INSURANCE_CLASSIFY_PROMPT.format(question=question)
+        # 짧은 호출이라 응답이 늦으면 같은 요청을 하나 더 보내서 먼저 온 응답 사용
+        response = hedged_invoke(llm, prompt) if LLM_HEDGE_CLASSIFICATION else llm.invoke(prompt)
+        raw = _first_line(response)
     except Exception as e:
         print(f"[WARN] LLM classification failed: {e}")
         raw = ""
     
     print(f"[DEBUG] raw classification: {raw}")
+    return _resolve_insurance_type(question, raw)
 
-    q = question.replace(" ", "")
 
-    # 1️⃣ LLM이 정확히 맞춘 경우
-    if raw in ALLOWED_INSURANCE_TYPES:
-        return raw
+def _classify_batch_with_llm(
+    questions: Sequence[str], max_concurrency: int = CLASSIFICATION_BATCH_CONCURRENCY
+) -> List[Tuple[str, bool]]:
+    """
+    LLM 일괄 분류: 클라이언트 하나로 batch 요청 (max_concurrency개씩 동시 실행)
+    질문마다 (보험유형, LLM 분류 성공 여부) - 실패한 질문만 키워드 규칙 → 기본값으로 처리
+    """
+    if not questions:
+        return []
 
-    # 2️⃣ 사고 / 상해
-    if any(k in q for k in [
-        "사고", "다쳤", "부상", "골절", "상해", "넘어", "충돌", "추락"
-    ]):
-        return "상해보험"
+    llm = get_llm("classification")
+    prompts = [INSURANCE_CLASSIFY_PROMPT.format(question=q) for q in questions]
+    responses = llm.batch(prompts, config={"max_concurrency": max_concurrency}, return_exceptions=True)
 
-    # 3️⃣ 질병 / 진단 / 의료
-    if any(k in q for k in [
-        "질병", "진단", "암", "뇌출혈", "뇌경색",
-        "입원", "수술", "치료", "병원", "의사"
-    ]):
-        return "질병보험"
-
-    # 4️⃣ 자동차
-    if any(k in q for k in [
-        "자동차", "차량", "교통사고", "운전", "추돌", "렌트카"
-    ]):
-        return "자동차보험"
-
-    # 5️⃣ 화재
-    if any(k in q for k in [
-        "화재", "불", "전소", "연기", "폭발", "누전"
-    ]):
-        return "화재보험"
-
-    # 6️⃣ 책임보험 (손해배상 성격)
-    if any(k in q for k in [
-        "배상", "손해배상", "책임", "과실", "법적책임", "배상책임"
-    ]):
-        return "책임보험"
-
-    # 7️⃣ 손해보험 (재산 피해)
-    if any(k in q for k in [
-        "도난", "침수", "파손", "망가", "훼손",
-        "재산", "시설", "기계", "건물", "누수"
-    ]):
-        return "손해보험"
+    results = []
+    failures = 0
+    for question, response in zip(questions, responses):
+        if isinstance(response, Exception):
+            failures += 1
+            raw = ""
+        else:
+            raw = _first_line(response)
+        results.append(_resolve_insurance_type(question, raw))
 
-    # 8️⃣ 연금보험
-    if any(k in q for k in [
-        "연금", "노후", "은퇴", "퇴직", "연금수령",
-        "연금개시", "연금액", "노령"
-    ]):
-        return "연금보험"
-
-    # 9️⃣ 최후 기본값 (가장 많이 쓰이는 영역)
-    return "질병보험"
\ No newline at end of file
+    if failures:
+        print(f"[WARN] LLM batch classification failed: {failures}/{len(questions)}개 질문 (키워드 규칙으로 대체)")
+    return results
@@ -0,0 +1,105 @@
+# chains/keyword_matcher.py
+"""
+키워드 규칙 → 단일 Aho-Corasick 오토마톤
+
+카테고리별 키워드 목록을 한 번만 컴파일해 두고, 질문을 한 번 훑으면서
+매칭된 모든 카테고리와 가중치를 돌려준다. 키워드가 수백 개로 늘어나도
+검사 비용은 질문 길이(+ 매칭 수)에만 비례한다.
+
+규칙 형식:
+    [
+        ("상해보험", ["사고", "부상", ("골절", 2.0)]),   # 문자열은 가중치 1.0
+        ...
+    ]
+목록 순서가 우선순위다 (best()에서 점수가 같으면 앞 카테고리).
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+Keyword = Union[str, Tuple[str, float]]
+
+
+class KeywordMatcher:
+    """카테고리별 키워드 규칙을 컴파일한 Aho-Corasick 매처"""
+
+    def __init__(self, rules: Iterable[Tuple[str, Sequence[Keyword]]]):
+        self.categories: List[str] = []
+        # 패턴 번호 → (카테고리 번호, 가중치)
+        self._patterns: List[Tuple[int, float]] = []
+        self._children: List[Dict[str, int]] = [{}]  # trie
+        self._output: List[List[int]] = [[]]
+
+        for category, keywords in rules:
+            if category not in self.categories:
+                self.categories.append(category)
+            category_id = self.categories.index(category)
+            for keyword in keywords:
+                text, weight = (keyword, 1.0) if isinstance(keyword, str) else keyword
+                if not text:
+                    continue
+                self._add(text, len(self._patterns))
+                self._patterns.append((category_id, float(weight)))
+
+        self._goto = self._build_automaton()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    # ---------- Compile ----------
+    def _add(self, text: str, pattern_id: int):
+        node = 0
+        for ch in text:
+            nxt = self._children[node].get(ch)
+            if nxt is None:
+                nxt = len(self._children)
+                self._children[node][ch] = nxt
+                self._children.append({})
+                self._output.append([])
+            node = nxt
+        self._output[node].append(pattern_id)
+
+    def _build_automaton(self) -> List[Dict[str, int]]:
+        """
+        trie → DFA: BFS로 fail 링크를 구하면서 fail 대상의 전이와 출력을 미리 합쳐 둔다.
+        매칭할 때는 글자마다 dict 조회 한 번뿐이고 fail 링크를 따라가지 않는다.
+        """
+        goto = [dict(children) for children in self._children]
+        fail = [0] * len(self._children)
+        queue = [0]
+        for node in queue:
+            for ch, child in self._children[node].items():
+                fail[child] = goto[fail[node]].get(ch, 0) if node else 0
+                self._output[child] = self._output[child] + self._output[fail[child]]
+                queue.append(child)
+            if node:
+                for ch, nxt in goto[fail[node]].items():
+                    goto[node].setdefault(ch, nxt)
+        return goto
+
+    # ---------- Match ----------
+    def _matched_patterns(self, text: str) -> List[int]:
+        goto, output = self._goto, self._output
+        node = 0
+        matched: List[int] = []
+        for ch in text:
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                matched.extend(output[node])
+        return matched
+
+    def match(self, text: str) -> Dict[str, float]:
+        """
+        매칭된 카테고리 → 가중치 합 (같은 키워드는 여러 번 나와도 한 번만 센다)
+        반환 dict는 규칙 우선순위 순서
+        """
+        scores: Dict[int, float] = {}
+        for pattern_id in set(self._matched_patterns(text)):
+            category_id, weight = self._patterns[pattern_id]
+            scores[category_id] = scores.get(category_id, 0.0) + weight
+        return {self.categories[c]: scores[c] for c in sorted(scores)}
+
+    def best(self, text: str) -> Optional[str]:
+        """가중치 합이 가장 큰 카테고리 (동점이면 우선순위가 높은 것, 없으면 None)"""
+        matched = self.match(text)
+        if not matched:
+            return None
+        return max(matched, key=lambda category: (matched[category], -self.categories.index(category)))
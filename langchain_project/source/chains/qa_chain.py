@@ -5,30 +5,37 @@ from langchain_core.output_parsers import StrOutputParser
 
 from llm.llm import get_llm
 from llm.prompt import INSURANCE_PROMPT
-from vectorstore.retriever import get_retriever
-from chains.insurance_classifier import classify_insurance_type
+from vectorstore.registry import get_registry
+from chains.answer_cache import get_answer_cache
+from chains.insurance_classifier import (
+    answer_cache_types,
+    finish_insurance_type,
+    predict_insurance_type_locally,
+)
 from chains.utils import format_insurance_docs
+from vectorstore.article_index import extract_article_refs
+from config.settings import ANSWER_CACHE_ENABLED, TOP_K, SPECULATIVE_RETRIEVAL
 
 
 def get_qa_chain() -> RunnableLambda:
     llm = get_llm()
+    registry = get_registry()
 
-    def retrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
-        question = inputs.get("question", "")
-        insurance_type = classify_insurance_type(question)
-        print(f"\n[STEP 1] 분류된 보험유형: {insurance_type}")
+    def search_documents(question: str, insurance_type: str, query_vector):
+        """보험유형 필터 검색 + fallback (조항 색인으로 찾지 못한 질문)"""
+        # 질문 임베딩은 요청당 한 번만 (분류/필터/디버깅/fallback 검색 모두 같은 벡터 사용)
+        query_vector = query_vector or registry.embed_query(question)
 
         # 보험유형 필터 검색
         print(f"[STEP 2] '{insurance_type}' 필터로 검색 시도...")
-        retriever = get_retriever(insurance_type)
-        docs = retriever.invoke(question)
+        docs = registry.search_by_vector(query_vector, insurance_type, question=question)
         print(f"[STEP 2 결과] 필터 검색 결과: {len(docs)}개 문서 발견")
         
         # 디버깅: 실제 저장된 insurance_type 값 확인
+        debug_docs = None
         if not docs:
             print(f"[디버깅] 필터 검색 실패 - 실제 DB에 저장된 insurance_type 값 확인 중...")
-            debug_retriever = get_retriever(None)  # 필터 없이 전체 검색
-            debug_docs = debug_retriever.invoke(question)
+            debug_docs = registry.search_by_vector(query_vector, None, question=question)  # 필터 없이 전체 검색
             if debug_docs:
                 unique_types = set(doc.metadata.get("insurance_type") for doc in debug_docs[:20])
                 print(f"[디버깅] 전체 검색 상위 20개 문서의 insurance_type 값들: {unique_types}")
@@ -36,38 +43,108 @@ def get_qa_chain() -> RunnableLambda:
                 print(f"[디버깅] 값 일치 여부: {insurance_type in unique_types}")
                 
                 # 각 insurance_type별로 실제 몇 개가 있는지 확인
-                from qdrant_client import QdrantClient
                 from qdrant_client.http import models
-                from config.settings import QDRANT_HOST, QDRANT_PORT, COLLECTION_NAME
+                from config.settings import COLLECTION_NAME
                 
-                try:
-                    debug_client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
-                    filter_condition = models.Filter(
-                        must=[
-                            models.FieldCondition(
-                                key="metadata.insurance_type",  # 수정: metadata. 경로 추가
-                                match=models.MatchValue(value=insurance_type),
-                            )
-                        ]
-                    )
-                    # count를 사용하여 필터 조건에 맞는 포인트 개수만 확인
-                    result = debug_client.count(
-                        collection_name=COLLECTION_NAME,
-                        count_filter=filter_condition
-                    )
-                    print(f"[디버깅] Qdrant count API로 확인한 '{insurance_type}' 문서 수: {result.count:,}개")
-                except Exception as e:
-                    print(f"[디버깅] Qdrant count 확인 실패: {e}")
+                if registry.is_local:
+                    start, end = registry.local_index.type_ranges.get(insurance_type, (0, 0))
+                    print(f"[디버깅] 로컬 인덱스의 '{insurance_type}' 문서 수: {end - start:,}개")
+                else:
+                    try:
+                        debug_client = registry.client  # 전역 client 재사용
+                        filter_condition = models.Filter(
+                            must=[
+                                models.FieldCondition(
+                                    key="metadata.insurance_type",  # 수정: metadata. 경로 추가
+                                    match=models.MatchValue(value=insurance_type),
+                                )
+                            ]
+                        )
+                        # count를 사용하여 필터 조건에 맞는 포인트 개수만 확인
+                        result = debug_client.count(
+                            collection_name=COLLECTION_NAME,
+                            count_filter=filter_condition
+                        )
+                        print(f"[디버깅] Qdrant count API로 확인한 '{insurance_type}' 문서 수: {result.count:,}개")
+                    except Exception as e:
+                        print(f"[디버깅] Qdrant count 확인 실패: {e}")
 
         # fallback 검색
         if not docs:
             print(f"[STEP 3] 필터 검색 결과가 0개 → 필터 없이 전체 검색으로 fallback")
-            retriever = get_retriever(None)  # None = 필터 없음
-            docs = retriever.invoke(question)
+            # 디버깅 단계의 전체 검색 결과와 같은 질의이므로 재사용
+            if debug_docs is None:
+                debug_docs = registry.search_by_vector(query_vector, None, question=question)
+            docs = debug_docs
             print(f"[STEP 3 결과] 전체 검색 결과: {len(docs)}개 문서 발견")
         else:
             print(f"[STEP 3] 건너뜀 (이미 {len(docs)}개 문서 찾음)")
 
+        return docs, query_vector
+
+    def retrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        question = inputs.get("question", "")
+
+        # 질문에 조항 번호(제N조 / 제N관 ...)가 있으면 조항 색인에서 바로 조회
+        article_docs, article_type = registry.lookup_articles(question)
+        query_vector = inputs.get("query_vector")
+        speculative = None
+
+        # 의미 기반 답변 캐시 (qa_chain_with_metrics와 공유, 조항 번호 질문은 제외)
+        answer_cache = get_answer_cache()
+        use_answer_cache = ANSWER_CACHE_ENABLED and not extract_article_refs(question)
+
+        def start_speculative():
+            # LLM 분류를 기다리는 동안 필터 없는 전체 검색을 먼저 시작
+            nonlocal speculative
+            if SPECULATIVE_RETRIEVAL and not article_docs:
+                speculative = registry.start_speculative_search(query_vector)
+
+        if article_type:
+            insurance_type = article_type
+            print(f"\n[STEP 1] 조항 색인으로 보험유형 확정: {insurance_type} (분류 생략)")
+        else:
+            # 로컬 분류기는 검색에 쓸 질문 임베딩으로 분류 (confidence가 낮을 때만 LLM 호출)
+            query_vector = query_vector or registry.embed_query(question)
+            prediction = predict_insurance_type_locally(question, query_vector)
+
+            # LLM 분류 전에 답변 캐시 조회 (로컬 분류 유형 / 질문에 적힌 유형 범위 안에서만)
+            cache_types = answer_cache_types(question, prediction) if use_answer_cache else []
+            if cache_types:
+                cached = answer_cache.get(query_vector, cache_types, registry.collection_version())
+                if cached is not None:
+                    entry, similarity = cached
+                    print(f"[STEP 1] 답변 캐시 사용 (유사도 {similarity:.3f}, {entry.insurance_type}): {entry.question}")
+                    return {**entry.result, "question": question, "query_vector": query_vector}
+
+            prediction = finish_insurance_type(question, prediction, on_llm_fallback=start_speculative)
+            insurance_type = prediction.insurance_type
+            print(f"\n[STEP 1] 분류된 보험유형: {insurance_type} ({prediction.source})")
+            if article_docs:
+                article_docs, _ = registry.lookup_articles(question, insurance_type)
+
+        if article_docs:
+            print(f"[STEP 2] 조항 색인 직접 조회: {len(article_docs)}개 조항 발견")
+            docs = article_docs
+            if len(docs) < TOP_K:
+                # 부족한 만큼만 벡터 검색으로 채움
+                query_vector = query_vector or registry.embed_query(question)
+                docs = registry.fill_with_search(docs, query_vector, insurance_type, question=question)
+            print(f"[STEP 3] 검색 결과로 보충: {len(docs) - len(article_docs)}개 문서 추가")
+        elif speculative is not None:
+            print(f"[STEP 2] 분류 중에 받은 전체 검색 후보를 '{insurance_type}'로 필터링...")
+            docs, fallback_activated, requeried = registry.resolve_speculative(
+                speculative.result(), query_vector, insurance_type, question=question
+            )
+            if requeried:
+                print(f"[STEP 2] 후보 중 '{insurance_type}' 문서가 부족해 필터 검색 재요청")
+            if fallback_activated:
+                print(f"[STEP 3] 필터 결과가 0개 → 전체 검색 결과 사용: {len(docs)}개 문서 발견")
+            else:
+                print(f"[STEP 2 결과] 필터 결과: {len(docs)}개 문서 발견")
+        else:
+            docs, query_vector = search_documents(question, insurance_type, query_vector)
+
         print(f"[최종 결과] 총 {len(docs)}개 문서를 사용합니다\n")
 
         # format context
@@ -93,7 +170,7 @@ def get_qa_chain() -> RunnableLambda:
             level_4=level_4
         )).content
 
-        return {
+        result = {
             "answer": answer,
             "question": question,
             "insurance_type": insurance_type_from_doc,
@@ -103,8 +180,16 @@ def get_qa_chain() -> RunnableLambda:
             "level_4": level_4,
             "context": context,
             "docs": docs,  # Streamlit 참고용
+            "query_vector": query_vector,  # 다른 단계에서 재사용
         }
 
+        if use_answer_cache:
+            # 분류된 보험유형으로 저장 (질문 벡터는 요청마다 다르므로 제외)
+            stored = {k: v for k, v in result.items() if k not in ("question", "query_vector")}
+            answer_cache.put(question, query_vector, insurance_type, stored, registry.collection_version())
+
+        return result
+
     chain = RunnableLambda(retrieve_with_classification)
     
     return chain
@@ -2,30 +2,123 @@
 메트릭 수집 기능이 통합된 QA Chain
 기존 qa_chain.py를 기반으로 메트릭 수집 기능 추가
 """
-from typing import Dict, Any, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from langchain_core.runnables import RunnableLambda
 
 from llm.llm import get_llm
 from llm.prompt import INSURANCE_PROMPT
-from vectorstore.retriever import get_retriever
-from chains.insurance_classifier import classify_insurance_type
-from chains.utils import format_insurance_docs
+from vectorstore.registry import get_registry
+from chains.answer_cache import get_answer_cache
+from chains.insurance_classifier import (
+    answer_cache_types,
+    classification_cache,
+    finish_insurance_type,
+    predict_insurance_type_locally,
+)
+from chains.utils import pack_insurance_docs
 from evaluation.metrics import MetricsCollector
+from vectorstore.article_index import extract_article_refs
+from config.settings import (
+    ANSWER_CACHE_ENABLED,
+    RETRIEVAL_BATCH_FALLBACK,
+    SPECULATIVE_RETRIEVAL,
+    TOP_K,
+)
 
-
-def get_qa_chain_with_metrics(enable_metrics: bool = True) -> RunnableLambda:
+def get_qa_chain_with_metrics(enable_metrics: bool = True, streaming: bool = False) -> RunnableLambda:
     """
     메트릭 수집 기능이 통합된 QA Chain
     
     Args:
         enable_metrics: 메트릭 수집 활성화 여부
+        streaming: True면 chain.stream()으로 검색 결과(metadata) → 답변 토큰 → 완료 이벤트를 차례로 반환
         
     Returns:
         QA Chain with metrics in result dict
     """
     llm = get_llm()
+    registry = get_registry()
 
-    def retrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    def embed_question(question: str, collector: Optional[MetricsCollector]) -> List[float]:
+        # 질문 임베딩은 요청당 한 번만 (분류/필터/fallback 검색 모두 같은 벡터 사용)
+        if collector:
+            collector.start_timer("embedding")
+
+        query_vector = registry.embed_query(question)
+
+        if collector:
+            collector.end_timer("embedding")
+        return query_vector
+
+    def search_documents(
+        question: str,
+        insurance_type: str,
+        query_vector: Optional[List[float]],
+        collector: Optional[MetricsCollector],
+    ):
+        """보험유형 필터 검색 + fallback (조항 색인으로 찾지 못한 질문)"""
+        query_vector = query_vector or embed_question(question, collector)
+
+        if RETRIEVAL_BATCH_FALLBACK:
+            # STEP 2+3: 필터 검색과 전체 검색을 한 번의 batch 요청으로 보내고 로컬에서 선택
+            print(f"[STEP 2] '{insurance_type}' 필터 검색 + 전체 검색 batch 요청...")
+
+            if collector:
+                collector.start_timer("retrieval")
+
+            docs, fallback_activated = registry.search_with_fallback(
+                query_vector, insurance_type, question=question
+            )
+
+            if collector:
+                collector.end_timer("retrieval")
+
+            if fallback_activated:
+                print(f"[STEP 3] 필터 검색 결과가 0개 → 전체 검색 결과 사용: {len(docs)}개 문서 발견")
+            else:
+                print(f"[STEP 2 결과] 필터 검색 결과: {len(docs)}개 문서 발견")
+        else:
+            # STEP 2: 보험유형 필터 검색
+            print(f"[STEP 2] '{insurance_type}' 필터로 검색 시도...")
+        
+            if collector:
+                collector.start_timer("retrieval")
+        
+            docs = registry.search_by_vector(query_vector, insurance_type, question=question)
+        
+            if collector:
+                collector.end_timer("retrieval")
+        
+            print(f"[STEP 2 결과] 필터 검색 결과: {len(docs)}개 문서 발견")
+
+            # STEP 3: Fallback 검색
+            fallback_activated = False
+            if not docs:
+                print(f"[STEP 3] 필터 검색 결과가 0개 → 필터 없이 전체 검색으로 fallback")
+                fallback_activated = True
+            
+                if collector:
+                    collector.start_timer("retrieval")
+            
+                docs = registry.search_by_vector(query_vector, None, question=question)
+            
+                if collector:
+                    collector.end_timer("retrieval")
+            
+                print(f"[STEP 3 결과] 전체 검색 결과: {len(docs)}개 문서 발견")
+            else:
+                print(f"[STEP 3] 건너뜀 (이미 {len(docs)}개 문서 찾음)")
+
+        return docs, query_vector, fallback_activated
+
+    def prepare_generation(
+        inputs: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], Optional[str], Optional[MetricsCollector], Optional[str]]:
+        """
+        STEP 0~4: 분류 + 검색 + 프롬프트 구성
+        → (답변을 제외한 결과, 프롬프트, 메트릭 수집기, 답변 캐시에 저장할 보험유형)
+        답변 캐시 hit이면 결과에 answer가 들어 있고 프롬프트는 None (LLM 호출 불필요)
+        """
         question = inputs.get("question", "")
         enable_eval = inputs.get("enable_metrics", enable_metrics)
         
@@ -35,52 +128,129 @@ def get_qa_chain_with_metrics(enable_metrics: bool = True) -> RunnableLambda:
         # total_time은 실제 사용자 체감 시간과 다를 수 있으므로
         # Streamlit 레벨에서 측정하는 것이 더 정확함
         # 여기서는 내부 처리 시간만 측정
+
+        # STEP 0: 질문에 조항 번호(제N조 / 제N관 ...)가 있으면 조항 색인에서 바로 조회
         if collector:
-            collector.start_timer("classification")
-        
-        # STEP 1: 보험유형 분류
-        insurance_type = classify_insurance_type(question)
-        
-        if collector:
-            collector.end_timer("classification")
-            # 분류 응답 토큰 추정 (실제로는 LLM 호출 결과 필요하지만 추정)
-            collector.record_classification_tokens(question, insurance_type)
-            collector.record_search_stats(0, False, False, insurance_type)
-        
-        print(f"\n[STEP 1] 분류된 보험유형: {insurance_type}")
+            collector.start_timer("article_lookup")
+
+        article_docs, article_type = registry.lookup_articles(question)
 
-        # STEP 2: 보험유형 필터 검색
-        print(f"[STEP 2] '{insurance_type}' 필터로 검색 시도...")
-        
         if collector:
-            collector.start_timer("retrieval")
-        
-        retriever = get_retriever(insurance_type)
-        docs = retriever.invoke(question)
-        
+            collector.end_timer("article_lookup")
+
+        query_vector = inputs.get("query_vector")
+        speculative = None
+
+        # 의미 기반 답변 캐시 (조항 번호 질문은 번호만 달라도 임베딩이 비슷하므로 제외)
+        answer_cache = get_answer_cache()
+        use_answer_cache = ANSWER_CACHE_ENABLED and not extract_article_refs(question)
+
+        def start_speculative():
+            # LLM 분류를 기다리는 동안 필터 없는 전체 검색을 먼저 시작 (조항 색인 결과가 있으면 불필요)
+            nonlocal speculative
+            if SPECULATIVE_RETRIEVAL and not article_docs:
+                speculative = registry.start_speculative_search(query_vector)
+
+        # STEP 1: 보험유형 분류 (조항 색인으로 유형이 하나로 정해지면 생략)
+        if article_type:
+            insurance_type = article_type
+            print(f"\n[STEP 1] 조항 색인으로 보험유형 확정: {insurance_type} (분류 생략)")
+        else:
+            # 로컬 분류기는 검색에 쓸 질문 임베딩으로 분류 (confidence가 낮을 때만 LLM 호출)
+            query_vector = query_vector or embed_question(question, collector)
+
+            if collector:
+                collector.start_timer("classification")
+
+            prediction = predict_insurance_type_locally(question, query_vector)
+
+            # STEP 1.5: LLM 분류 전에 답변 캐시 조회 (로컬 분류 유형 / 질문에 적힌 유형 범위 안에서만)
+            # hit이면 LLM 분류/검색/생성을 모두 건너뛰고 투기적 검색도 시작하지 않음
+            if use_answer_cache:
+                cache_types = answer_cache_types(question, prediction)
+                cached = (
+                    answer_cache.get(query_vector, cache_types, registry.collection_version())
+                    if cache_types else None
+                )
+                if collector:
+                    collector.record_answer_cache(cached[1] if cached else None, answer_cache.stats())
+                if cached is not None:
+                    entry, similarity = cached
+                    print(f"[STEP 1] 답변 캐시 사용 (유사도 {similarity:.3f}, {entry.insurance_type}): {entry.question}")
+                    if collector:
+                        collector.end_timer("classification")
+                        collector.record_classification(prediction.source, prediction.confidence)
+                        collector.record_search_stats(len(entry.result["docs"]), True, False, entry.insurance_type)
+                    result = {**entry.result, "question": question, "query_vector": query_vector}
+                    return result, None, collector, None
+
+            prediction = finish_insurance_type(question, prediction, on_llm_fallback=start_speculative)
+            insurance_type = prediction.insurance_type
+
+            if collector:
+                collector.end_timer("classification")
+                if prediction.source in ("llm", "fallback"):
+                    # 분류 응답 토큰 추정 (실제로는 LLM 호출 결과 필요하지만 추정)
+                    collector.record_classification_tokens(question, insurance_type)
+                collector.record_classification(prediction.source, prediction.confidence)
+                collector.record_classification_cache(classification_cache.stats())
+
+            print(f"\n[STEP 1] 분류된 보험유형: {insurance_type} ({prediction.source})")
+
+            if article_docs:
+                article_docs, _ = registry.lookup_articles(question, insurance_type)
+
         if collector:
-            collector.end_timer("retrieval")
-        
-        print(f"[STEP 2 결과] 필터 검색 결과: {len(docs)}개 문서 발견")
+            collector.record_search_stats(0, False, False, insurance_type)
+            collector.record_article_lookup(len(article_docs), bool(article_type))
+
+        # 답변 캐시 miss → 생성 후 분류된 보험유형으로 저장
+        cache_type = insurance_type if use_answer_cache else None
+
+        if article_docs:
+            # STEP 2: 조항 색인 결과 사용, 부족한 만큼만 벡터 검색으로 채움
+            print(f"[STEP 2] 조항 색인 직접 조회: {len(article_docs)}개 조항 발견")
+            docs = article_docs
+            fallback_activated = False
+
+            if len(docs) < TOP_K:
+                query_vector = query_vector or embed_question(question, collector)
+
+                if collector:
+                    collector.start_timer("retrieval")
+
+                docs = registry.fill_with_search(docs, query_vector, insurance_type, question=question)
+
+                if collector:
+                    collector.end_timer("retrieval")
+
+            print(f"[STEP 3] 검색 결과로 보충: {len(docs) - len(article_docs)}개 문서 추가")
+        elif speculative is not None:
+            # STEP 2+3: 분류 중에 받은 전체 검색 후보를 보험유형으로 로컬 필터링 (부족할 때만 필터 검색 재요청)
+            print(f"[STEP 2] 분류 중에 받은 전체 검색 후보를 '{insurance_type}'로 필터링...")
 
-        # STEP 3: Fallback 검색
-        fallback_activated = False
-        if not docs:
-            print(f"[STEP 3] 필터 검색 결과가 0개 → 필터 없이 전체 검색으로 fallback")
-            fallback_activated = True
-            
             if collector:
                 collector.start_timer("retrieval")
-            
-            retriever = get_retriever(None)
-            docs = retriever.invoke(question)
-            
+
+            result = speculative.result()
+            docs, fallback_activated, requeried = registry.resolve_speculative(
+                result, query_vector, insurance_type, question=question
+            )
+
             if collector:
                 collector.end_timer("retrieval")
-            
-            print(f"[STEP 3 결과] 전체 검색 결과: {len(docs)}개 문서 발견")
+                collector.record_speculative_retrieval(result.started_at, result.finished_at, requeried)
+
+            if requeried:
+                print(f"[STEP 2] 후보 중 '{insurance_type}' 문서가 부족해 필터 검색 재요청")
+            if fallback_activated:
+                print(f"[STEP 3] 필터 결과가 0개 → 전체 검색 결과 사용: {len(docs)}개 문서 발견")
+            else:
+                print(f"[STEP 2 결과] 필터 결과: {len(docs)}개 문서 발견")
         else:
-            print(f"[STEP 3] 건너뜀 (이미 {len(docs)}개 문서 찾음)")
+            docs, query_vector, fallback_activated = search_documents(
+                question, insurance_type, query_vector, collector
+            )
 
         print(f"[최종 결과] 총 {len(docs)}개 문서를 사용합니다\n")
 
@@ -94,7 +264,14 @@ def get_qa_chain_with_metrics(enable_metrics: bool = True) -> RunnableLambda:
             )
 
         # STEP 4: 컨텍스트 포맷팅
-        context = format_insurance_docs(docs)
+        # 검색 순위대로 CONTEXT_TOKEN_BUDGET 토큰까지만 (넘치는 조항은 문장 단위로 자르거나 뺌)
+        packed = pack_insurance_docs(docs)
+        context = packed.context
+        if collector:
+            collector.record_context(
+                packed.tokens, packed.budget, packed.docs_used, packed.docs_truncated, packed.docs_dropped,
+                packed.flat_tokens,
+            )
         first_doc = docs[0] if docs else None
         md = first_doc.metadata if first_doc else {}
 
@@ -105,10 +282,7 @@ def get_qa_chain_with_metrics(enable_metrics: bool = True) -> RunnableLambda:
         level_3 = md.get("level_3", "")
         level_4 = md.get("level_4", "")
 
-        # STEP 5: LLM 답변 생성
-        if collector:
-            collector.start_timer("generation")
-        
+        # STEP 5: LLM 프롬프트 구성
         prompt_text = INSURANCE_PROMPT.format(
             question=question,
             context=context,
@@ -118,21 +292,8 @@ def get_qa_chain_with_metrics(enable_metrics: bool = True) -> RunnableLambda:
             level_3=level_3,
             level_4=level_4
         )
-        
-        answer = llm.invoke(prompt_text).content
-        
-        if collector:
-            collector.end_timer("generation")
-            collector.record_generation_tokens(prompt_text, str(answer))
-            # total_time 계산 (내부 처리 시간 합산)
-            collector.metrics["total_time"] = (
-                collector.metrics.get("classification_time", 0) +
-                collector.metrics.get("retrieval_time", 0) +
-                collector.metrics.get("generation_time", 0)
-            )
 
         result = {
-            "answer": answer,
             "question": question,
             "insurance_type": insurance_type_from_doc,
             "level_1": level_1,
@@ -141,14 +302,97 @@ def get_qa_chain_with_metrics(enable_metrics: bool = True) -> RunnableLambda:
             "level_4": level_4,
             "context": context,
             "docs": docs,
+            "query_vector": query_vector,  # 다른 단계에서 재사용
         }
-        
-        # 메트릭 추가
+        return result, prompt_text, collector, cache_type
+
+    def finish_generation(
+        result: Dict[str, Any],
+        prompt_text: Optional[str],
+        answer: str,
+        collector: Optional[MetricsCollector],
+        cache_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        result = {**result, "answer": answer}
+
+        if cache_type is not None:
+            # 다음에 비슷한 질문이 오면 검색/생성 없이 사용 (질문 벡터/메트릭은 요청마다 다르므로 제외)
+            stored = {k: v for k, v in result.items() if k not in ("question", "query_vector", "metrics")}
+            get_answer_cache().put(
+                result["question"], result["query_vector"], cache_type, stored, registry.collection_version()
+            )
+
         if collector:
+            collector.end_timer("generation")
+            if prompt_text is not None:
+                collector.record_generation_tokens(prompt_text, str(answer))
+                collector.record_generation_rate()
+            # total_time 계산 (내부 처리 시간 합산)
+            collector.metrics["total_time"] = (
+                collector.metrics.get("article_lookup_time", 0) +
+                collector.metrics.get("classification_time", 0) +
+                collector.metrics.get("embedding_time", 0) +
+                collector.metrics.get("retrieval_time", 0) +
+                collector.metrics.get("generation_time", 0)
+            )
+            # 메트릭 추가
             result["metrics"] = collector.get_metrics()
-        
+
         return result
 
+    def retrieve_with_classification(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        result, prompt_text, collector, cache_type = prepare_generation(inputs)
+        if prompt_text is None:
+            return finish_generation(result, None, result["answer"], collector)
+
+        # STEP 6: LLM 답변 생성
+        if collector:
+            collector.start_timer("generation")
+
+        answer = llm.invoke(prompt_text).content
+
+        return finish_generation(result, prompt_text, str(answer), collector, cache_type)
+
+    def stream_with_classification(inputs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        스트리밍 모드 이벤트 순서:
+            {"type": "metadata", ...검색 결과}      # 검색이 끝나면 바로 (답변 전에 보험유형/조항 표시)
+            {"type": "token", "content": "..."}     # LLM 토큰이 도착할 때마다
+            {"type": "done", "answer": ..., "metrics": ...}  # invoke 결과와 같은 형태
+        """
+        result, prompt_text, collector, cache_type = prepare_generation(inputs)
+        if prompt_text is None:
+            # 답변 캐시 hit: 저장된 답변을 토큰 하나로 바로 보냄
+            answer = result.pop("answer")
+            yield {"type": "metadata", **result}
+            if collector:
+                collector.record_first_token()
+            yield {"type": "token", "content": answer}
+            yield {"type": "done", **finish_generation(result, None, answer, collector)}
+            return
+
+        yield {"type": "metadata", **result}
+
+        # STEP 6: LLM 답변 스트리밍
+        if collector:
+            collector.start_timer("generation")
+
+        chunks: List[str] = []
+        for chunk in llm.stream(prompt_text):
+            content = str(chunk.content)
+            if not content:
+                continue
+            if collector and not chunks:
+                collector.record_first_token()
+            chunks.append(content)
+            yield {"type": "token", "content": content}
+
+        yield {"type": "done", **finish_generation(result, prompt_text, "".join(chunks), collector, cache_type)}
+
+    if streaming:
+        # chain.stream(inputs)로 이벤트를 하나씩 받음
+        return RunnableLambda(stream_with_classification)
+
     chain = RunnableLambda(retrieve_with_classification)
     
     return chain
@@ -0,0 +1,103 @@
+# chains/token_counter.py
+"""
+프롬프트 토큰 수 계산
+
+생성 모델(Solar)의 HuggingFace tokenizer로 센다. tokenizer를 받을 수 없으면
+(오프라인 등) 한 번 경고하고 문자 수 기반 추정(한국어 1.5자/토큰, 그 외 4자/토큰)으로 대신한다.
+추정치는 실제보다 적게 나올 수 있으므로 예산에 여유를 두는 게 안전하다.
+
+tokenizer.json 찾는 순서: 로컬 경로 → HF 캐시 → (HF_HUB_OFFLINE이 아니면) Hub 다운로드
+Hub에 연결할 수 없으면 huggingface_hub가 수십 초 재시도하므로 다운로드는 timeout까지만 기다린다.
+"""
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+from config.settings import (
+    CONTEXT_TOKENIZER,
+    CONTEXT_TOKENIZER_DOWNLOAD_TIMEOUT,
+    CONTEXT_TOKENIZER_PATH,
+)
+
+TokenCounter = Callable[[str], int]
+
+_lock = threading.Lock()
+_counters: Dict[str, TokenCounter] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """문자 수 기반 토큰 수 추정 (MetricsCollector.count_tokens와 같은 기준)"""
+    if not text:
+        return 0
+    korean_chars = sum(1 for c in text if 0xAC00 <= ord(c) <= 0xD7A3)
+    other_chars = len(text) - korean_chars
+    return int(korean_chars / 1.5 + other_chars / 4)
+
+
+def _tokenizer_file(name: str, local_path: Optional[Union[str, Path]], timeout: float) -> Path:
+    """tokenizer.json 위치 (찾지 못하면 예외)"""
+    if local_path is not None and Path(local_path).exists():
+        return Path(local_path)
+
+    from huggingface_hub import constants, hf_hub_download
+    from huggingface_hub.utils import LocalEntryNotFoundError
+
+    try:
+        return Path(hf_hub_download(name, "tokenizer.json", local_files_only=True))
+    except LocalEntryNotFoundError:
+        if constants.HF_HUB_OFFLINE:
+            raise
+
+    # 캐시에 없으면 백그라운드에서 받고 timeout까지만 기다림 (늦게 끝나면 다음 실행부터 캐시 사용)
+    result: Dict[str, object] = {}
+
+    def download():
+        try:
+            result["path"] = hf_hub_download(name, "tokenizer.json")
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=download, name="tokenizer-download", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if "path" in result:
+        return Path(result["path"])  # type: ignore[arg-type]
+    raise result.get("error") or TimeoutError(f"{timeout:.0f}초 안에 받지 못함")  # type: ignore[misc]
+
+
+def _load_tokenizer_counter(
+    name: str,
+    local_path: Optional[Union[str, Path]] = None,
+    timeout: float = CONTEXT_TOKENIZER_DOWNLOAD_TIMEOUT,
+) -> Optional[TokenCounter]:
+    try:
+        from tokenizers import Tokenizer
+
+        tokenizer = Tokenizer.from_file(str(_tokenizer_file(name, local_path, timeout)))
+    except Exception as e:
+        print(f"⚠️ tokenizer를 불러오지 못했습니다: {name} ({e}) → 문자 수 기반 추정을 사용합니다.")
+        return None
+
+    def count(text: str) -> int:
+        if not text:
+            return 0
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+    return count
+
+
+def get_token_counter(name: str, local_path: Optional[Union[str, Path]] = None) -> TokenCounter:
+    """tokenizer 이름별 토큰 카운터 (프로세스에서 한 번만 로딩)"""
+    counter = _counters.get(name)
+    if counter is None:
+        with _lock:
+            counter = _counters.get(name)
+            if counter is None:
+                counter = _load_tokenizer_counter(name, local_path) or estimate_tokens
+                _counters[name] = counter
+    return counter
+
+
+def get_context_token_counter() -> TokenCounter:
+    """컨텍스트 토큰 예산용 카운터 (CONTEXT_TOKENIZER / CONTEXT_TOKENIZER_PATH)"""
+    return get_token_counter(CONTEXT_TOKENIZER, CONTEXT_TOKENIZER_PATH)
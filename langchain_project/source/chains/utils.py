@@ -1,29 +1,192 @@
 import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
-def format_insurance_docs(docs):
-    if not docs:
-        return "관련 약관 문서를 찾을 수 없습니다."
-    
-    blocks = []
+from chains.token_counter import TokenCounter, get_context_token_counter
+from config.settings import (
+    CONTEXT_MIN_CLAUSE_TOKENS,
+    CONTEXT_RENDER_TREE,
+    CONTEXT_TOKEN_BUDGET,
+)
+
+_BLOCK_SEPARATOR = "\n\n"
+_TRUNCATED_MARK = "(이하 생략)"
+# 문장 끝: 마침표/물음표 뒤 공백 (항 번호 "1." 같은 숫자 뒤 마침표는 제외), 줄바꿈 뒤
+_SENTENCE_END = re.compile(r"(?<=[^\d\s][.!?。])(?=\s)|(?<=\n)")
+
+
+@dataclass
+class PackedContext:
+    """토큰 예산 안에 채운 컨텍스트"""
+    context: str
+    tokens: int
+    budget: int
+    docs_used: int = 0       # 본문 전체가 들어간 조항
+    docs_truncated: int = 0  # 문장 단위로 잘라서 넣은 조항
+    docs_dropped: int = 0    # 예산이 모자라 뺀 조항
+    flat_tokens: int = 0     # 같은 조항을 조항마다 헤더를 붙이는 평면 형식으로 넣었을 때 토큰
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.flat_tokens - self.tokens
 
-    for d in docs:
-        md = d.metadata
 
-        clause_levels = []
-        for k in ["level_1", "level_2", "level_3", "level_4"]:
-            if md.get(k):
-                clause_levels.append(md[k])
+def _clause_levels(md: Dict[str, Any]) -> List[str]:
+    return [md[k] for k in ["level_1", "level_2", "level_3", "level_4"] if md.get(k)] or ["조항 정보 없음"]
 
-        clause_text = " > ".join(clause_levels) if clause_levels else "조항 정보 없음"
 
-        blocks.append(f"""
-[보험유형] {md.get("insurance_type", "UNKNOWN")}
-[조항분류] {clause_text}
+def _insurance_types_label(md: Dict[str, Any]) -> str:
+    # 중복 제거 적재된 조항은 같은 내용이 나온 보험유형 전체를 표시
+    return ", ".join(md.get("insurance_types") or []) or md.get("insurance_type", "UNKNOWN")
+
+
+def _format_block(doc, body: str) -> str:
+    md = doc.metadata
+    return f"""
+[보험유형] {_insurance_types_label(md)}
+[조항분류] {" > ".join(_clause_levels(md))}
 [약관본문]
-{d.page_content}
-""")
+{body}
+"""
+
+
+@dataclass
+class _ClauseNode:
+    bodies: List[str] = field(default_factory=list)
+    children: Dict[str, "_ClauseNode"] = field(default_factory=dict)
+
+
+def render_insurance_tree(items: List[Tuple[Any, str]]) -> str:
+    """
+    (문서, 본문) 목록 → 보험유형 / level 경로 트리 (같은 헤더는 한 번만)
+
+        [보험유형] 자동차보험
+        [조항분류] 제2관 보통약관
+          > 제3조(보상하는 손해)
+        [약관본문]
+        ...
+        [약관본문]
+        ...
+          > 제4조(보상하지 않는 손해)
+        [약관본문]
+        ...
+
+    그룹 순서는 그룹에 속한 첫 문서의 순서(검색 순위)를 따르고, 그룹 안에서는 원래 순서를 유지한다.
+    """
+    roots: Dict[str, _ClauseNode] = {}
+    for doc, body in items:
+        node = roots.setdefault(_insurance_types_label(doc.metadata), _ClauseNode())
+        for level in _clause_levels(doc.metadata):
+            node = node.children.setdefault(level, _ClauseNode())
+        node.bodies.append(body)
+
+    lines: List[str] = []
+
+    def render(node: _ClauseNode, depth: int):
+        for name, child in node.children.items():
+            lines.append(f"[조항분류] {name}" if depth == 1 else "  " * (depth - 1) + "> " + name)
+            for body in child.bodies:
+                lines.append("[약관본문]")
+                lines.append(body)
+            render(child, depth + 1)
+
+    for insurance_types, root in roots.items():
+        if lines:
+            lines.append("")
+        lines.append(f"[보험유형] {insurance_types}")
+        render(root, 1)
+    return "\n".join(lines)
+
+
+def split_sentences(text: str) -> List[str]:
+    """조항 본문 → 문장 (이어 붙이면 원문 그대로, 문장 사이 공백/줄바꿈은 뒤 문장에 붙음)"""
+    return [s for s in _SENTENCE_END.split(text) if s]
+
+
+def pack_insurance_docs(
+    docs,
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    count_tokens: Optional[TokenCounter] = None,
+    min_clause_tokens: int = CONTEXT_MIN_CLAUSE_TOKENS,
+    render_tree: bool = CONTEXT_RENDER_TREE,
+) -> PackedContext:
+    """
+    검색 순위(docs 순서) 대로 조항을 넣되 프롬프트 컨텍스트가 budget 토큰을 넘지 않게 채움
+
+    - 조항 전체가 들어가면 그대로
+    - 남은 예산이 min_clause_tokens 이상이면 앞에서부터 들어가는 문장까지만 (문장 중간에서 자르지 않음)
+    - 그보다 적게 남았으면 그 조항은 빼고 다음(더 짧은) 조항을 시도
+    render_tree이면 고른 조항을 보험유형 / level 경로 트리로 묶어 공통 헤더를 한 번만 쓴다.
+    """
+    count_tokens = count_tokens or get_context_token_counter()
+    if not docs:
+        text = "관련 약관 문서를 찾을 수 없습니다."
+        return PackedContext(text, count_tokens(text), budget)
 
-    return "\n\n".join(blocks)
+    separator_tokens = count_tokens(_BLOCK_SEPARATOR)
+    packed = PackedContext("", 0, budget)
+    blocks: List[str] = []
+    selected: List[Tuple[Any, str]] = []  # (문서, 들어간 본문)
+
+    for d in docs:
+        cost = separator_tokens if blocks else 0
+        block = _format_block(d, d.page_content)
+        block_tokens = count_tokens(block)
+        if packed.tokens + cost + block_tokens <= budget:
+            blocks.append(block)
+            selected.append((d, d.page_content))
+            packed.tokens += cost + block_tokens
+            packed.docs_used += 1
+            continue
+
+        # 문장 단위로 잘라서 남은 예산만큼만
+        remaining = budget - packed.tokens - cost - count_tokens(_format_block(d, _TRUNCATED_MARK))
+        sentences: List[str] = []
+        if remaining >= min_clause_tokens:
+            used = 0
+            for sentence in split_sentences(d.page_content):
+                sentence_tokens = count_tokens(sentence)
+                if used + sentence_tokens > remaining:
+                    break
+                sentences.append(sentence)
+                used += sentence_tokens
+
+        # 문장별 토큰 합은 이어 붙인 결과와 조금 다를 수 있으므로 넘치면 뒤 문장부터 뺌
+        while sentences:
+            body = "".join(sentences).rstrip() + "\n" + _TRUNCATED_MARK
+            block = _format_block(d, body)
+            block_tokens = count_tokens(block)
+            if packed.tokens + cost + block_tokens <= budget:
+                break
+            sentences.pop()
+
+        if sentences and sentences[0].strip():
+            blocks.append(block)
+            selected.append((d, body))
+            packed.tokens += cost + block_tokens
+            packed.docs_truncated += 1
+        else:
+            packed.docs_dropped += 1
+
+    if not blocks:
+        packed.context = "관련 약관 문서를 찾을 수 없습니다."
+        packed.tokens = packed.flat_tokens = count_tokens(packed.context)
+        return packed
+
+    # 조항 선택은 평면 형식 기준(트리 형식보다 길거나 같음)이라 트리로 바꿔도 예산을 넘지 않는다
+    packed.context = _BLOCK_SEPARATOR.join(blocks)
+    packed.tokens = packed.flat_tokens = count_tokens(packed.context)
+    if render_tree:
+        tree = render_insurance_tree(selected)
+        tree_tokens = count_tokens(tree)
+        if tree_tokens < packed.tokens:
+            packed.context, packed.tokens = tree, tree_tokens
+    return packed
+
+
+def format_insurance_docs(docs, budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    return pack_insurance_docs(docs, budget).context
 
 
 
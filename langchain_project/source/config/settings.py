@@ -9,6 +9,27 @@ load_dotenv()
 UPSTAGE_MODEL = "solar-1-mini-chat"  # 예시
 TEMPERATURE = 0.0
 
+# LLM 클라이언트 (stage별 1개씩 재사용, keep-alive 연결 풀 공유)
+LLM_TIMEOUTS = {              # stage별 요청 timeout(초)
+    "classification": 10.0,
+    "generation": 60.0,
+    "judge": 120.0,
+}
+LLM_MAX_RETRIES = 2                 # 연결 오류/timeout/429/5xx 재시도 횟수 (exponential backoff + jitter)
+LLM_MAX_CONNECTIONS = 20            # 연결 풀 최대 연결 수
+LLM_MAX_KEEPALIVE_CONNECTIONS = 10  # 유지할 idle 연결 수
+LLM_KEEPALIVE_EXPIRY = 60.0         # idle 연결 유지 시간(초)
+LLM_HEDGE_CLASSIFICATION = True     # 분류 호출이 LLM_HEDGE_DELAY_SECONDS 안에 안 끝나면 같은 요청을 하나 더 보냄
+LLM_HEDGE_DELAY_SECONDS = 1.5
+
+# 생성 프롬프트 컨텍스트 (검색 순위대로 토큰 예산까지만 채움)
+CONTEXT_TOKEN_BUDGET = 3000                          # 약관 컨텍스트 최대 토큰
+CONTEXT_MIN_CLAUSE_TOKENS = 60                       # 남은 예산이 이보다 적으면 조항을 자르지 않고 뺌
+CONTEXT_TOKENIZER = "upstage/solar-1-mini-tokenizer"  # 없으면 문자 수 기반 추정
+CONTEXT_TOKENIZER_PATH = None                        # 로컬 tokenizer.json 경로 (있으면 Hub를 거치지 않음)
+CONTEXT_TOKENIZER_DOWNLOAD_TIMEOUT = 5.0             # HF 캐시에 없을 때 Hub 다운로드 대기 시간(초), 넘으면 추정으로 대체
+CONTEXT_RENDER_TREE = True                           # 보험유형 / 조항 경로가 같은 조항은 헤더를 한 번만 (트리 형식)
+
 # ===== Embedding (적재 시 사용한 것과 동일해야 함) =====
 EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
@@ -16,11 +37,87 @@ EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 QDRANT_HOST = "localhost"
 QDRANT_PORT = 6333
 COLLECTION_NAME = "insurance_docs"
+QDRANT_POOL_SIZE = 16  # 프로세스 전역 client의 HTTP connection pool 크기
 
 # ===== Retriever =====
 TOP_K = 10
 SCORE_THRESHOLD = 0.3
+RETRIEVAL_BATCH_FALLBACK = True  # 필터 검색 + 전체(fallback) 검색을 한 번의 batch 요청으로
+SPECULATIVE_RETRIEVAL = True  # LLM 분류가 필요할 때 분류와 동시에 전체 검색을 먼저 시작
+SPECULATIVE_CANDIDATES = 50   # 전체 검색 후보 수 (보험유형으로 로컬 필터링 후 부족하면 필터 검색 재요청)
+SPECULATIVE_WORKERS = 4       # 동시 검색 스레드 수
+
+# ===== Vector Backend =====
+VECTOR_BACKEND = "qdrant"  # "qdrant" | "local" (Qdrant 없이 로컬 memmap 인덱스로 검색)
+
+# ===== Ingest (병렬 파이프라인) =====
+INGEST_PARSE_WORKERS = os.cpu_count() or 1  # XML 파싱/분할 프로세스 수
+INGEST_EMBED_BATCH_SIZE = 256               # 임베딩 배치 크기
+INGEST_UPSERT_WORKERS = 2                   # 동시 upsert 스레드 수
+INGEST_UPSERT_BATCH_SIZE = 256              # upsert 1회당 포인트 수
+INGEST_QUEUE_SIZE = 8                       # 단계 간 bounded queue 크기
+INGEST_UPLOAD_PARALLEL = 1                  # IngestSession upload 프로세스 수
+INGEST_UPLOAD_WAIT = True                   # upsert 반영 완료까지 대기 여부
+INGEST_DEDUP = False                        # 전체 재적재 시 중복 조항 family당 대표 조항 하나만 적재 (--dedup)
+INGEST_DEDUP_MAX_HAMMING = 6                # near-duplicate SimHash hamming 거리 (0이면 exact 중복만)
+INGEST_DEDUP_MIN_CHARS = 50                 # 이보다 짧은 조항은 exact 중복만 제거
+
+# ===== Ingest (증분 적재) =====
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+INGEST_MANIFEST_PATH = PROJECT_ROOT / "ingest_manifest.json"  # 파일/조항 해시 기록
+
+# ===== Embedding Cache =====
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = PROJECT_ROOT / "embeddings" / "embedding_cache.sqlite3"
+EMBEDDING_CACHE_MAX_ENTRIES = 500_000  # 384차원 float32 기준 약 0.8GB
+LOCAL_INDEX_DIR = PROJECT_ROOT / "embeddings" / "local_index"  # VECTOR_BACKEND="local"에서 사용
+
+# ===== Hybrid Search (BM25 + 벡터, Reciprocal Rank Fusion) =====
+HYBRID_SEARCH_ENABLED = True  # BM25 인덱스 파일이 없으면 자동으로 벡터 검색만
+LEXICAL_INDEX_PATH = PROJECT_ROOT / "embeddings" / "bm25_index.json"
+HYBRID_CANDIDATES = 20  # 벡터/BM25 각각에서 가져오는 후보 수 (RRF 후 TOP_K개)
+RRF_K = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_MIN_SCORE = 0.2  # 질의 점수 상한 대비 이 비율 이상인 BM25 후보만 RRF에 합침
+
+# ===== 보험유형 로컬 분류기 (nearest centroid, LLM 분류 대체) =====
+TYPE_CLASSIFIER_ENABLED = True  # 분류기 파일이 없으면 기존 LLM 분류
+TYPE_CLASSIFIER_PATH = PROJECT_ROOT / "embeddings" / "type_centroids.npz"
+TYPE_CLASSIFIER_MIN_CONFIDENCE = 0.6  # 이보다 낮으면 LLM 분류로 넘김
+TYPE_CLASSIFIER_TEMPERATURE = 20.0    # cosine 점수 → 확률 변환 배율 (클수록 confidence가 높게 나옴)
+
+# 보험유형 분류 결과 캐시 (공백/문장부호/유니코드 형태만 다른 반복 질문은 LLM 분류 생략)
+CLASSIFICATION_CACHE_ENABLED = True
+CLASSIFICATION_CACHE_MAX_ENTRIES = 1024
+CLASSIFICATION_CACHE_TTL_SECONDS = 3600
+CLASSIFICATION_BATCH_CONCURRENCY = 8  # classify_insurance_types의 LLM 동시 요청 수
+
+# 의미 기반 답변 캐시 (질문 임베딩이 비슷하고 보험유형이 같으면 검색/생성 없이 이전 답변 사용)
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_THRESHOLD = 0.95          # 같은 질문으로 볼 최소 cosine 유사도
+ANSWER_CACHE_TTL_SECONDS = 6 * 3600
+ANSWER_CACHE_MAX_ENTRIES = 2000
+COLLECTION_VERSION_CHECK_SECONDS = 30  # 적재 상태(컬렉션 버전) 재확인 간격 → 바뀌면 답변 캐시 전체 삭제
+
+# ===== Article Lookup (제N조 / 제N관 직접 조회) =====
+ARTICLE_LOOKUP_ENABLED = True  # 색인 파일이 없으면 자동으로 분류 + 벡터 검색
+ARTICLE_INDEX_PATH = PROJECT_ROOT / "embeddings" / "article_index.json"
+ARTICLE_LOOKUP_MAX_AMBIGUOUS = 3  # 같은 번호가 여러 약관에 있으면 이 개수만 쓰고 나머지는 벡터 검색으로 채움
+
+# ===== Qdrant Collection (양자화 / 저장 위치 / HNSW) =====
+# 컬렉션 생성 시 적용 → 바꾼 뒤에는 전체 재적재(ingest_all) 필요
+QDRANT_QUANTIZATION = None          # None | "scalar"(int8, 메모리 1/4) | "binary"(메모리 1/32)
+QDRANT_QUANTIZATION_ALWAYS_RAM = True  # 양자화 벡터는 RAM, 원본 float 벡터는 디스크에 둘 때 사용
+QDRANT_VECTORS_ON_DISK = False      # 원본 float32 벡터를 mmap(디스크)에 저장
+QDRANT_HNSW_M = 16
+QDRANT_HNSW_EF_CONSTRUCT = 100
+QDRANT_HNSW_ON_DISK = False
 
+# 검색 시 적용
+QDRANT_SEARCH_HNSW_EF = 128         # None이면 Qdrant 기본값
+QDRANT_SEARCH_RESCORE = True        # 양자화 후보를 원본 벡터로 다시 점수 계산
+QDRANT_SEARCH_OVERSAMPLING = 2.0    # 양자화 검색 후보 수 배율 (k * oversampling)
 
 
 # ===== Path =====
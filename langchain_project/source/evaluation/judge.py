@@ -76,7 +76,7 @@ class LLMJudge:
     """LLM을 사용한 답변 품질 평가"""
     
     def __init__(self, llm=None):
-        self.llm = llm or get_llm()
+        self.llm = llm or get_llm("judge")
     
     def evaluate_answer(
         self,
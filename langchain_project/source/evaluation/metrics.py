@@ -3,7 +3,7 @@
 응답 시간, 토큰 사용량, 검색 통계 등을 자동으로 측정
 """
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 
@@ -12,11 +12,18 @@ class MetricsCollector:
     
     def __init__(self):
         self.start_times: Dict[str, float] = {}
+        self.spans: Dict[str, Tuple[float, float]] = {}  # 단계별 (시작, 종료) 시각 (동시 실행 구간 계산용)
+        self.request_started_at = time.time()  # 첫 토큰까지 시간(TTFT) 기준
         self.metrics: Dict[str, Any] = {
             "total_time": 0.0,
+            "article_lookup_time": 0.0,
             "classification_time": 0.0,
+            "embedding_time": 0.0,
             "retrieval_time": 0.0,
             "generation_time": 0.0,
+            "time_to_first_token": None,          # 요청 시작 → 첫 답변 토큰 (스트리밍 모드만)
+            "generation_first_token_time": None,  # 생성 시작 → 첫 답변 토큰 (LLM 응답 지연)
+            "tokens_per_second": None,            # 답변 출력 속도 (스트리밍이면 첫 토큰 이후 구간 기준)
             "classification_tokens": 0,
             "generation_input_tokens": 0,
             "generation_output_tokens": 0,
@@ -25,6 +32,26 @@ class MetricsCollector:
             "used_filter": False,
             "fallback_activated": False,
             "classified_insurance_type": None,
+            "classification_source": None,
+            "classification_confidence": None,
+            "classification_cache_hits": 0,    # 프로세스 누적 분류 캐시 hit
+            "classification_cache_misses": 0,  # 프로세스 누적 분류 캐시 miss
+            "speculative_retrieval_time": 0.0,
+            "speculative_overlap_time": 0.0,
+            "speculative_requeried": False,
+            "context_tokens": 0,          # 생성 프롬프트에 넣은 약관 컨텍스트 토큰
+            "context_token_budget": 0,
+            "context_docs_used": 0,       # 전체가 들어간 조항 수
+            "context_docs_truncated": 0,  # 문장 단위로 잘린 조항 수
+            "context_docs_dropped": 0,    # 예산 초과로 빠진 조항 수
+            "context_flat_tokens": 0,     # 조항마다 헤더를 반복하는 평면 형식이었을 때 토큰
+            "context_tokens_saved": 0,    # 트리 형식으로 줄어든 토큰
+            "answer_cache_hit": False,
+            "answer_cache_similarity": None,
+            "answer_cache_hits": 0,    # 프로세스 누적 답변 캐시 hit
+            "answer_cache_misses": 0,  # 프로세스 누적 답변 캐시 miss
+            "article_lookup_hits": 0,
+            "classification_skipped": False,
             "timestamp": None,
         }
     
@@ -37,14 +64,19 @@ class MetricsCollector:
         if stage not in self.start_times:
             return 0.0
         
-        elapsed = time.time() - self.start_times[stage]
-        del self.start_times[stage]
+        end = time.time()
+        elapsed = end - self.start_times[stage]
+        self.spans[stage] = (self.start_times.pop(stage), end)
         
         # 메트릭에 저장
         if stage == "total":
             self.metrics["total_time"] = elapsed
+        elif stage == "article_lookup":
+            self.metrics["article_lookup_time"] = elapsed
         elif stage == "classification":
             self.metrics["classification_time"] = elapsed
+        elif stage == "embedding":
+            self.metrics["embedding_time"] = elapsed
         elif stage == "retrieval":
             self.metrics["retrieval_time"] = elapsed
         elif stage == "generation":
@@ -88,6 +120,19 @@ class MetricsCollector:
         self.metrics["generation_output_tokens"] = output_tokens
         self.metrics["total_tokens"] += (input_tokens + output_tokens)
     
+    def record_first_token(self):
+        """스트리밍 첫 답변 토큰 도착 시각 기록 (generation 타이머가 켜져 있는 동안 호출)"""
+        now = time.time()
+        self.metrics["time_to_first_token"] = now - self.request_started_at
+        if "generation" in self.start_times:
+            self.metrics["generation_first_token_time"] = now - self.start_times["generation"]
+    
+    def record_generation_rate(self):
+        """출력 토큰 / 생성 시간 (end_timer("generation")와 record_generation_tokens 이후 호출)"""
+        elapsed = self.metrics["generation_time"] - (self.metrics["generation_first_token_time"] or 0.0)
+        if elapsed > 0:
+            self.metrics["tokens_per_second"] = self.metrics["generation_output_tokens"] / elapsed
+    
     def record_search_stats(
         self, 
         docs_count: int, 
@@ -102,6 +147,53 @@ class MetricsCollector:
         if insurance_type:
             self.metrics["classified_insurance_type"] = insurance_type
     
+    def record_speculative_retrieval(self, started_at: float, finished_at: float, requeried: bool):
+        """
+        분류와 동시에 실행한 전체 검색 기록
+        retrieval_time은 분류 종료 후 남은 대기 + 로컬 필터링 시간이므로 stage 합계가 곧 실제 경과 시간이고,
+        speculative_overlap_time만큼 분류와 겹쳐서 절약된 시간이다.
+        """
+        self.metrics["speculative_retrieval_time"] = finished_at - started_at
+        self.metrics["speculative_requeried"] = requeried
+        span = self.spans.get("classification")
+        if span:
+            overlap = min(span[1], finished_at) - max(span[0], started_at)
+            self.metrics["speculative_overlap_time"] = max(0.0, overlap)
+    
+    def record_classification(self, source: str, confidence: Optional[float]):
+        """보험유형 분류 경로 기록 (local: centroid 분류기 / llm: LLM 호출)"""
+        self.metrics["classification_source"] = source
+        self.metrics["classification_confidence"] = confidence
+    
+    def record_classification_cache(self, stats: Dict[str, int]):
+        """분류 캐시 누적 hit/miss 기록 (이번 요청의 hit 여부는 classification_source == "cache")"""
+        self.metrics["classification_cache_hits"] = stats.get("hits", 0)
+        self.metrics["classification_cache_misses"] = stats.get("misses", 0)
+    
+    def record_context(
+        self, tokens: int, budget: int, used: int, truncated: int, dropped: int, flat_tokens: Optional[int] = None
+    ):
+        """컨텍스트 토큰 예산 사용량 기록 (flat_tokens: 헤더를 반복하는 평면 형식 기준 토큰)"""
+        self.metrics["context_tokens"] = tokens
+        self.metrics["context_flat_tokens"] = tokens if flat_tokens is None else flat_tokens
+        self.metrics["context_tokens_saved"] = self.metrics["context_flat_tokens"] - tokens
+        self.metrics["context_token_budget"] = budget
+        self.metrics["context_docs_used"] = used
+        self.metrics["context_docs_truncated"] = truncated
+        self.metrics["context_docs_dropped"] = dropped
+    
+    def record_answer_cache(self, similarity: Optional[float], stats: Dict[str, int]):
+        """의미 기반 답변 캐시 조회 결과 (similarity가 None이면 miss)"""
+        self.metrics["answer_cache_hit"] = similarity is not None
+        self.metrics["answer_cache_similarity"] = similarity
+        self.metrics["answer_cache_hits"] = stats.get("hits", 0)
+        self.metrics["answer_cache_misses"] = stats.get("misses", 0)
+    
+    def record_article_lookup(self, hits: int, classification_skipped: bool):
+        """조항 번호 색인 직접 조회 결과 기록"""
+        self.metrics["article_lookup_hits"] = hits
+        self.metrics["classification_skipped"] = classification_skipped
+    
     def get_metrics(self) -> Dict[str, Any]:
         """수집된 메트릭 반환"""
         self.metrics["timestamp"] = datetime.now().isoformat()
@@ -1,6 +1,20 @@
-from vectorstore.retriever import get_retriever
+from config.settings import TOP_K
+from vectorstore.registry import get_registry
 
 def retrieve(state):
-    retriever = get_retriever()
-    docs = retriever.get_relevant_documents(state["question"]) # type: ignore
-    return {"documents": docs}
+    registry = get_registry()
+    question = state["question"]
+    query_vector = state.get("query_vector")
+
+    # 조항 번호(제N조 ...)를 묻는 질문은 조항 색인 결과를 먼저 쓰고 부족한 만큼만 벡터 검색
+    article_docs, article_type = registry.lookup_articles(question)
+    if len(article_docs) >= TOP_K:
+        return {"documents": article_docs, "query_vector": query_vector}
+
+    # 질문 벡터를 state에 남겨 이후 노드에서 다시 임베딩하지 않도록 함
+    query_vector = query_vector or registry.embed_query(question)
+    if article_docs:
+        docs = registry.fill_with_search(article_docs, query_vector, article_type, question=question)
+    else:
+        docs = registry.search_by_vector(query_vector, question=question)
+    return {"documents": docs, "query_vector": query_vector}
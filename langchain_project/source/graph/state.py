@@ -3,5 +3,6 @@ from langchain_core.documents import Document
 
 class QAState(TypedDict):
     question: str
+    query_vector: List[float]
     documents: List[Document]
     answer: str
@@ -0,0 +1,230 @@
+# benchmark_quantization.py
+"""
+컬렉션 설정 벤치마크: float32 기준 vs 양자화(scalar / binary) / on-disk 벡터
+
+기존 insurance_docs 컬렉션에서 포인트(벡터 + payload)를 가져와
+설정별 임시 컬렉션을 만든 뒤, 같은 질의 벡터로
+- recall@k (float32 exact 검색 결과 대비)
+- 검색 latency (p50 / p95)
+- 벡터당 RAM 추정치
+를 비교한다.
+
+질의 벡터는 샘플링한 포인트를 쓰고, 해당 포인트는 임시 컬렉션에 넣지 않는다 (자기 자신 매칭 방지).
+Qdrant 서버가 필요하다 (local 모드는 양자화/HNSW 설정을 무시함).
+
+실행:
+    poetry run python -m source.ingest.benchmark_quantization --limit 20000 --queries 200 --k 10
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from qdrant_client import QdrantClient, models
+
+from source.ingest.vertorstore_ingest import COLLECTION_NAME, VECTOR_SIZE, get_qdrant_client
+from source.vectorstore.collection import build_collection_config, build_search_params
+from source.config.settings import (
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_SEARCH_HNSW_EF,
+    QDRANT_SEARCH_OVERSAMPLING,
+)
+
+# 이름 → (컬렉션 설정, 검색 설정)
+CONFIGS: Dict[str, Tuple[dict, dict]] = {
+    "float": ({}, {}),
+    "float_on_disk": ({"vectors_on_disk": True}, {}),
+    "scalar": ({"quantization": "scalar"}, {"rescore": True}),
+    "scalar_no_rescore": ({"quantization": "scalar"}, {"rescore": False}),
+    "scalar_on_disk": ({"quantization": "scalar", "vectors_on_disk": True}, {"rescore": True}),
+    "binary_on_disk": ({"quantization": "binary", "vectors_on_disk": True}, {"rescore": True}),
+    "binary_no_rescore": ({"quantization": "binary", "vectors_on_disk": True}, {"rescore": False}),
+}
+
+
+def ram_bytes_per_vector(quantization: Optional[str], vectors_on_disk: bool) -> int:
+    """벡터 1개가 RAM에 차지하는 크기 추정 (HNSW 그래프 / payload 제외)"""
+    size = 0 if vectors_on_disk else VECTOR_SIZE * 4
+    if quantization == "scalar":
+        size += VECTOR_SIZE
+    elif quantization == "binary":
+        size += VECTOR_SIZE // 8
+    return size
+
+
+def load_points(client: QdrantClient, collection_name: str, limit: int) -> List[models.Record]:
+    points: List[models.Record] = []
+    offset = None
+    while len(points) < limit:
+        batch, offset = client.scroll(
+            collection_name=collection_name,
+            limit=min(1000, limit - len(points)),
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        points.extend(batch)
+        if offset is None:
+            break
+    return points
+
+
+def wait_until_indexed(client: QdrantClient, collection_name: str, timeout: float = 600.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1.0)
+    print(f"⚠️ {collection_name}: 인덱싱이 {timeout:.0f}초 안에 끝나지 않았습니다")
+
+
+def type_filter(record: models.Record, by_type: bool) -> Optional[models.Filter]:
+    if not by_type:
+        return None
+    insurance_type = (record.payload or {}).get("metadata", {}).get("insurance_type")
+    return models.Filter(
+        must=[
+            models.FieldCondition(
+                key="metadata.insurance_type",
+                match=models.MatchValue(value=insurance_type),
+            )
+        ]
+    )
+
+
+def search_ids(
+    client: QdrantClient,
+    collection_name: str,
+    queries: List[models.Record],
+    k: int,
+    search_params: Optional[models.SearchParams],
+    by_type: bool,
+) -> Tuple[List[List[str]], List[float]]:
+    results: List[List[str]] = []
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        response = client.query_points(
+            collection_name=collection_name,
+            query=query.vector,
+            query_filter=type_filter(query, by_type),
+            search_params=search_params,
+            limit=k,
+            with_payload=False,
+        )
+        latencies.append(time.perf_counter() - start)
+        results.append([str(p.id) for p in response.points])
+    return results, latencies
+
+
+def recall_at_k(truth: List[List[str]], found: List[List[str]]) -> float:
+    scores = [
+        len(set(t) & set(f)) / len(t)
+        for t, f in zip(truth, found)
+        if t
+    ]
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant 양자화 / on-disk 설정 벤치마크")
+    parser.add_argument("--source", default=COLLECTION_NAME, help="포인트를 가져올 컬렉션")
+    parser.add_argument("--limit", type=int, default=20000, help="사용할 포인트 수")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, default=QDRANT_SEARCH_HNSW_EF)
+    parser.add_argument("--oversampling", type=float, default=QDRANT_SEARCH_OVERSAMPLING)
+    parser.add_argument("--by-type", action="store_true", help="질의 포인트의 보험유형으로 필터 검색")
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument("--keep", action="store_true", help="임시 컬렉션을 지우지 않음")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    points = load_points(client, args.source, args.limit + args.queries)
+    if len(points) <= args.queries:
+        raise SystemExit(f"❌ 포인트가 부족합니다: {len(points)}개")
+
+    random.Random(args.seed).shuffle(points)
+    queries, corpus = points[: args.queries], points[args.queries:]
+    print(f"포인트 {len(corpus)}개 / 질의 {len(queries)}개 / k={args.k}")
+
+    # 정답(float32 exact)은 항상 float 컬렉션에서 먼저 계산
+    configs = ["float"] + [name for name in args.configs if name != "float"]
+
+    truth: Optional[List[List[str]]] = None
+    rows = []
+    for name in configs:
+        collection_params, search_options = CONFIGS[name]
+        bench_collection = f"{args.source}_bench_{name}"
+        quantization = collection_params.get("quantization")
+
+        client.recreate_collection(
+            collection_name=bench_collection,
+            **build_collection_config(
+                VECTOR_SIZE,
+                hnsw_m=QDRANT_HNSW_M,
+                hnsw_ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+                **collection_params,
+            ),
+        )
+        try:
+            if args.by_type:
+                client.create_payload_index(
+                    bench_collection, "metadata.insurance_type", models.PayloadSchemaType.KEYWORD
+                )
+            client.upload_points(
+                bench_collection,
+                points=[
+                    models.PointStruct(id=p.id, vector=p.vector, payload=p.payload)
+                    for p in corpus
+                ],
+                batch_size=256,
+                wait=True,
+            )
+            wait_until_indexed(client, bench_collection)
+
+            # float32 exact 검색 = 정답
+            if truth is None:
+                truth, _ = search_ids(
+                    client, bench_collection, queries, args.k,
+                    build_search_params(exact=True), args.by_type,
+                )
+
+            search_params = build_search_params(
+                hnsw_ef=args.hnsw_ef,
+                quantization=quantization,
+                oversampling=args.oversampling,
+                **search_options,
+            )
+            found, latencies = search_ids(
+                client, bench_collection, queries, args.k, search_params, args.by_type
+            )
+            rows.append((
+                name,
+                recall_at_k(truth, found),
+                statistics.median(latencies) * 1000,
+                percentile(latencies, 0.95) * 1000,
+                ram_bytes_per_vector(quantization, collection_params.get("vectors_on_disk", False)),
+            ))
+            print(f"✅ {name} 완료")
+        finally:
+            if not args.keep:
+                client.delete_collection(bench_collection)
+
+    print(
+        f"\n{'config':<20}{'recall@' + str(args.k):>11}{'p50 ms':>10}{'p95 ms':>10}{'RAM B/vec':>12}"
+    )
+    for name, recall, p50, p95, ram in rows:
+        print(f"{name:<20}{recall:>11.4f}{p50:>10.2f}{p95:>10.2f}{ram:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# dedup.py
+"""
+적재 전 조항 중복 제거 (exact hash + SimHash near-duplicate)
+
+표준약관 조항은 여러 XML 파일에 거의 그대로 복사되어 있어서 같은 내용의 벡터가 수천 개 쌓이고,
+top-k 검색 결과가 같은 조항의 복사본으로 채워진다.
+조항 family마다 대표(canonical) 조항 하나만 적재하고, payload에 등장한 모든 source / 보험유형을 남긴다.
+
+- exact: 공백/유니코드 정규화 후 본문 해시가 같으면 같은 조항
+- near : 64bit SimHash(문자 n-gram)의 hamming 거리가 max_hamming 이하이면 같은 조항
+         (fingerprint를 max_hamming + 1개 band로 나눠 band가 하나라도 같은 대표 조항만 비교 → 비둘기집 원리로 누락 없음)
+
+대표 조항은 먼저 나온 조항(파일 정렬 순서)이고, 새 조항은 대표 조항들과만 비교한다(leader clustering).
+A~B, B~C라도 A와 C가 멀면 C는 따로 남으므로 family가 연쇄적으로 번지지 않는다.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .hashing import content_hash
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 4
+
+_WHITESPACE = re.compile(r"\s+")
+_SHINGLE_PRIME = np.uint64(1099511628211)  # FNV prime
+_BIT_SHIFTS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
+
+def normalize_text(text: str) -> str:
+    """NFKC + 공백 정리 (줄바꿈/들여쓰기 차이는 같은 조항으로 본다)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (n-gram 해시의 비트를 고르게 섞음)"""
+    with np.errstate(over="ignore"):
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """정규화된 본문의 문자 n-gram 집합으로 64bit SimHash 계산 (numpy 벡터화, 프로세스 간 결정적)"""
+    codes = np.frombuffer(text.replace(" ", "").encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) == 0:
+        return 0
+    n = min(shingle_size, len(codes))
+    count = len(codes) - n + 1
+
+    hashes = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for i in range(n):
+            hashes = hashes * _SHINGLE_PRIME + codes[i:i + count]
+    hashes = _mix64(np.unique(hashes))
+
+    bits = (hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)
+    weights = bits.sum(axis=0).astype(np.int64) * 2 - len(hashes)
+    fingerprint = 0
+    for i in np.flatnonzero(weights > 0):
+        fingerprint |= 1 << int(i)
+    return fingerprint
+
+
+def _bands(fingerprint: int, band_count: int) -> List[Tuple[int, int]]:
+    """fingerprint를 band_count개 구간으로 나눔 → [(band 번호, 구간 값)]"""
+    width = SIMHASH_BITS // band_count
+    bands = []
+    for band in range(band_count):
+        start = band * width
+        end = SIMHASH_BITS if band == band_count - 1 else start + width
+        bands.append((band, (fingerprint >> start) & ((1 << (end - start)) - 1)))
+    return bands
+
+
+@dataclass
+class DedupStats:
+    documents: int = 0
+    canonical: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+
+    @property
+    def removed(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+
+def deduplicate_documents(
+    docs: Iterable[Document],
+    max_hamming: int = 3,
+    min_chars: int = 50,
+) -> Tuple[List[Document], DedupStats]:
+    """
+    조항 family마다 대표 조항 하나만 남김
+
+    Args:
+        docs: build_documents_from_xml 결과 (여러 파일)
+        max_hamming: near-duplicate로 볼 SimHash hamming 거리 (0이면 exact 중복만 제거)
+        min_chars: 이보다 짧은 조항은 SimHash가 불안정하므로 exact 중복만 제거
+
+    Returns:
+        (대표 조항 목록, DedupStats)
+        대표 조항 metadata에는 sources / insurance_types (family 전체) / duplicate_count가 추가된다.
+        insurance_type / source / level_*은 대표 조항의 값 그대로 (point ID도 대표 조항 기준).
+    """
+    stats = DedupStats()
+    canonical: List[Document] = []
+    sources: List[List[str]] = []
+    insurance_types: List[List[str]] = []
+    counts: List[int] = []
+
+    by_hash: Dict[str, int] = {}
+    fingerprints: List[int] = []
+    band_count = max_hamming + 1
+    buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+    def add_member(family: int, doc: Document):
+        md = doc.metadata
+        if md.get("source") and md["source"] not in sources[family]:
+            sources[family].append(md["source"])
+        if md.get("insurance_type") and md["insurance_type"] not in insurance_types[family]:
+            insurance_types[family].append(md["insurance_type"])
+        counts[family] += 1
+
+    for doc in docs:
+        stats.documents += 1
+        text = normalize_text(doc.page_content)
+
+        # 1. exact 중복
+        key = content_hash(text)
+        family = by_hash.get(key)
+        if family is not None:
+            stats.exact_duplicates += 1
+            add_member(family, doc)
+            continue
+
+        # 2. near 중복 (band가 같은 대표 조항만 hamming 거리 확인)
+        fingerprint = None
+        if max_hamming > 0 and len(text) >= min_chars:
+            fingerprint = simhash(text)
+            candidates = sorted({
+                other for band in _bands(fingerprint, band_count) for other in buckets.get(band, ())
+            })
+            family = next(
+                (
+                    other for other in candidates
+                    if bin(fingerprint ^ fingerprints[other]).count("1") <= max_hamming
+                ),
+                None,
+            )
+            if family is not None:
+                stats.near_duplicates += 1
+                by_hash[key] = family
+                add_member(family, doc)
+                continue
+
+        # 3. 새 family의 대표 조항
+        family = len(canonical)
+        canonical.append(doc)
+        sources.append([])
+        insurance_types.append([])
+        counts.append(0)
+        fingerprints.append(fingerprint or 0)
+        by_hash[key] = family
+        if fingerprint is not None:
+            for band in _bands(fingerprint, band_count):
+                buckets[band].append(family)
+        add_member(family, doc)
+
+    results: List[Document] = []
+    for family, doc in enumerate(canonical):
+        metadata = dict(doc.metadata)
+        metadata["sources"] = [Path(s).name for s in sources[family]]
+        metadata["insurance_types"] = insurance_types[family]
+        metadata["duplicate_count"] = counts[family]
+        results.append(Document(page_content=doc.page_content, metadata=metadata))
+
+    stats.canonical = len(results)
+    return results, stats
@@ -0,0 +1,44 @@
+# hashing.py
+"""
+파일/조항 해시와 결정적(deterministic) Qdrant point ID
+같은 조항은 몇 번을 적재해도 같은 ID를 갖기 때문에 upsert가 멱등(idempotent)하다.
+"""
+import hashlib
+import uuid
+from pathlib import Path
+from typing import Any, Dict
+
+from langchain_core.documents import Document
+
+LEVEL_KEYS = ("level_1", "level_2", "level_3", "level_4")
+
+# point ID 네임스페이스 (값을 바꾸면 모든 ID가 바뀌므로 고정)
+POINT_ID_NAMESPACE = uuid.UUID("8f1d2c3e-5b7a-4e0f-9a61-2f4c8d9b7e10")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def level_path(metadata: Dict[str, Any]) -> str:
+    """level_1 ~ level_4 → 'a > b > > ' (None은 빈 문자열, 자리 고정)"""
+    return " > ".join(metadata.get(k) or "" for k in LEVEL_KEYS)
+
+
+def clause_point_id(doc: Document) -> str:
+    """
+    (source 파일명, level 경로, content 해시) → UUIDv5
+    source는 절대경로 대신 파일명을 사용해 적재 위치가 달라져도 ID가 유지된다.
+    """
+    md = doc.metadata
+    source = Path(md.get("source") or "").name
+    key = "\x1f".join([source, level_path(md), content_hash(doc.page_content)])
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
@@ -0,0 +1,209 @@
+# incremental.py
+"""
+증분(incremental) 적재
+- manifest: 파일별 해시 + 조항별 (point ID → content 해시)
+- 파일 해시가 같으면 건너뛰고, 바뀐 파일은 새로 생긴 조항만 임베딩/upsert,
+  사라진 조항(과 삭제된 파일의 조항)은 Qdrant에서 삭제
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointIdsList
+
+from .hashing import clause_point_id, content_hash, file_sha256
+from .pipeline import documents_to_points
+from .preprocessing import build_documents_from_xml
+
+MANIFEST_VERSION = 1
+
+
+class IngestManifest:
+    """적재 상태 manifest (JSON)"""
+
+    def __init__(self, path: Path, collection_name: str):
+        self.path = Path(path)
+        self.collection_name = collection_name
+        self.files: Dict[str, Dict] = {}
+        self.updated_at: Optional[str] = None
+        # 중복 제거(dedup) 적재는 여러 파일이 대표 포인트 하나를 공유하므로 증분 적재 불가
+        self.dedup = False
+
+    @classmethod
+    def load(cls, path: Path, collection_name: str) -> "IngestManifest":
+        manifest = cls(path, collection_name)
+        if not manifest.path.exists():
+            return manifest
+
+        with open(manifest.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        # 버전/컬렉션이 다르면 신뢰할 수 없으므로 빈 manifest로 시작
+        if (
+            data.get("version") != MANIFEST_VERSION
+            or data.get("collection") != collection_name
+        ):
+            print(f"[WARN] manifest 불일치 → 무시: {manifest.path}")
+            return manifest
+
+        manifest.files = data.get("files", {})
+        manifest.updated_at = data.get("updated_at")
+        manifest.dedup = data.get("dedup", False)
+        return manifest
+
+    def save(self):
+        """임시 파일에 쓰고 교체 (중간에 죽어도 manifest가 깨지지 않음)"""
+        self.updated_at = datetime.now().isoformat()
+        data = {
+            "version": MANIFEST_VERSION,
+            "collection": self.collection_name,
+            "updated_at": self.updated_at,
+            "dedup": self.dedup,
+            "files": self.files,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.files = {}
+        self.dedup = False
+
+    def get_file(self, name: str) -> Optional[Dict]:
+        return self.files.get(name)
+
+    def set_file(self, name: str, file_hash: str, points: Dict[str, str]):
+        self.files[name] = {"file_hash": file_hash, "points": points}
+
+    def remove_file(self, name: str):
+        self.files.pop(name, None)
+
+
+def clause_points(docs: Iterable[Document]) -> Dict[str, str]:
+    """Document들 → {point ID: content 해시}"""
+    return {clause_point_id(d): content_hash(d.page_content) for d in docs}
+
+
+@dataclass
+class IncrementalStats:
+    files_unchanged: int = 0
+    files_updated: int = 0
+    files_removed: int = 0
+    files_failed: List[str] = field(default_factory=list)
+    points_upserted: int = 0
+    points_deleted: int = 0
+
+
+def _delete_points(client: QdrantClient, collection_name: str, ids: List[str]):
+    if ids:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=ids),
+            wait=True,
+        )
+
+
+def _upsert_documents(
+    client: QdrantClient,
+    embeddings: Embeddings,
+    collection_name: str,
+    docs: List[Document],
+    batch_size: int,
+):
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start:start + batch_size]
+        vectors = embeddings.embed_documents([d.page_content for d in batch])
+        client.upsert(
+            collection_name=collection_name,
+            points=documents_to_points(batch, vectors),
+            wait=True,
+        )
+
+
+def ingest_incremental(
+    xml_files: Iterable[Path],
+    client: QdrantClient,
+    embeddings: Embeddings,
+    collection_name: str,
+    manifest: IngestManifest,
+    batch_size: int,
+) -> IncrementalStats:
+    """
+    manifest와 비교해 변경분만 반영
+
+    Args:
+        xml_files: 현재 적재 대상 XML 파일 전체 (여기 없는 파일은 삭제된 것으로 간주)
+        client: Qdrant 클라이언트
+        embeddings: 문서 임베딩 모델
+        collection_name: 대상 컬렉션
+        manifest: 이전 적재 상태 (처리한 파일마다 저장됨)
+        batch_size: 임베딩/upsert 배치 크기
+    """
+    if manifest.dedup:
+        raise ValueError(
+            "❌ 중복 제거(--dedup)로 적재된 컬렉션은 증분 적재할 수 없습니다. 전체 재적재하세요."
+        )
+
+    stats = IncrementalStats()
+
+    # 컬렉션이 새로 만들어졌다면 manifest의 기록은 의미가 없다
+    if manifest.files and client.count(collection_name=collection_name).count == 0:
+        print("[WARN] 컬렉션이 비어 있음 → manifest 초기화 후 전체 적재")
+        manifest.clear()
+
+    xml_files = list(xml_files)
+    current_names = {p.name for p in xml_files}
+
+    # 1. 삭제된 파일
+    for name in [n for n in manifest.files if n not in current_names]:
+        old_ids = list(manifest.files[name]["points"])
+        _delete_points(client, collection_name, old_ids)
+        manifest.remove_file(name)
+        manifest.save()
+        stats.files_removed += 1
+        stats.points_deleted += len(old_ids)
+        print(f"🗑️ {name}: 파일 삭제됨 → {len(old_ids)} points 삭제")
+
+    # 2. 신규/변경 파일
+    for xml_file in xml_files:
+        name = xml_file.name
+        try:
+            file_hash = file_sha256(str(xml_file))
+            entry = manifest.get_file(name)
+            if entry and entry["file_hash"] == file_hash:
+                stats.files_unchanged += 1
+                continue
+
+            docs = build_documents_from_xml(str(xml_file))
+            new_docs: Dict[str, Document] = {}
+            for doc in docs:
+                new_docs.setdefault(clause_point_id(doc), doc)
+            new_points = {pid: content_hash(d.page_content) for pid, d in new_docs.items()}
+
+            old_points = entry["points"] if entry else {}
+            added = [d for pid, d in new_docs.items() if pid not in old_points]
+            removed = [pid for pid in old_points if pid not in new_points]
+
+            _upsert_documents(client, embeddings, collection_name, added, batch_size)
+            _delete_points(client, collection_name, removed)
+
+            manifest.set_file(name, file_hash, new_points)
+            manifest.save()
+
+            stats.files_updated += 1
+            stats.points_upserted += len(added)
+            stats.points_deleted += len(removed)
+            print(f"✅ {name}: +{len(added)} / -{len(removed)} points")
+        except Exception as e:
+            print(f"❌ Error processing {name}: {e}")
+            stats.files_failed.append(name)
+
+    return stats
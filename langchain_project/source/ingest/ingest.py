@@ -1,30 +1,134 @@
 # ingest.py
-from typing import List
+from typing import Dict, List, Optional, Sequence
+
 from langchain_core.documents import Document
-from langchain_qdrant import QdrantVectorStore
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
 
 from .preprocessing import build_documents_from_xml
-from source.ingest.vertorstore_ingest import get_qdrant_client, get_embeddings
+from .pipeline import documents_to_points
+from source.ingest.vertorstore_ingest import (
+    COLLECTION_NAME,
+    ensure_collection,
+    get_qdrant_client,
+    get_embeddings,
+)
+from source.config.settings import (
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_UPSERT_BATCH_SIZE,
+    INGEST_UPLOAD_PARALLEL,
+    INGEST_UPLOAD_WAIT,
+)
+
+
+class IngestSession:
+    """
+    적재 세션: Qdrant client / 임베딩 모델 / 컬렉션을 한 번만 준비하고 재사용
+
+    파일마다 from_documents를 부르면 임베딩 모델과 client를 매번 새로 만들지만,
+    세션은 처음 한 번만 만들고 이후 upsert는 같은 객체로 처리한다.
+
+    Args:
+        collection_name: 적재 대상 컬렉션
+        client: Qdrant client (없으면 새로 생성)
+        embeddings: 문서 임베딩 모델 (없으면 새로 생성)
+        recreate: True면 컬렉션을 지우고 새로 만든다
+        batch_size: upsert 1회당 포인트 수
+        parallel: upload 프로세스 수
+        wait: upsert 반영 완료까지 대기할지 여부
+        embed_batch_size: 임베딩 1회당 문서 수
+    """
+
+    def __init__(
+        self,
+        collection_name: str = COLLECTION_NAME,
+        client: Optional[QdrantClient] = None,
+        embeddings: Optional[Embeddings] = None,
+        recreate: bool = False,
+        batch_size: int = INGEST_UPSERT_BATCH_SIZE,
+        parallel: int = INGEST_UPLOAD_PARALLEL,
+        wait: bool = INGEST_UPLOAD_WAIT,
+        embed_batch_size: int = INGEST_EMBED_BATCH_SIZE,
+    ):
+        self.collection_name = collection_name
+        self.client = client or get_qdrant_client()
+        self.embeddings = embeddings or get_embeddings()
+        self.batch_size = batch_size
+        self.parallel = parallel
+        self.wait = wait
+        self.embed_batch_size = embed_batch_size
+
+        ensure_collection(self.client, collection_name, recreate=recreate)
+
+    def embed_documents(self, docs: Sequence[Document]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(docs), self.embed_batch_size):
+            chunk = docs[start:start + self.embed_batch_size]
+            vectors.extend(self.embeddings.embed_documents([d.page_content for d in chunk]))
+        return vectors
+
+    def upsert_documents(
+        self,
+        docs: Sequence[Document],
+        vectors: Optional[Sequence[List[float]]] = None,
+        batch_size: Optional[int] = None,
+        parallel: Optional[int] = None,
+        wait: Optional[bool] = None,
+    ) -> int:
+        """
+        Document들을 bulk upsert (vectors가 없으면 세션의 임베딩 모델로 계산)
+        batch_size / parallel / wait는 호출마다 세션 기본값을 덮어쓸 수 있다.
+        """
+        if not docs:
+            return 0
+        if vectors is None:
+            vectors = self.embed_documents(docs)
+
+        self.client.upload_points(
+            collection_name=self.collection_name,
+            points=documents_to_points(docs, vectors),
+            batch_size=batch_size or self.batch_size,
+            parallel=parallel or self.parallel,
+            wait=self.wait if wait is None else wait,
+        )
+        return len(docs)
+
+    def ingest_file(self, xml_path: str) -> List[Document]:
+        """XML 1개 파싱 → 임베딩 → upsert, 적재한 Document 반환"""
+        documents = build_documents_from_xml(xml_path)
+        if not documents:
+            raise ValueError("❌ 생성된 Document가 없습니다.")
+        self.upsert_documents(documents)
+        return documents
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 컬렉션별 기본 세션 (ingest_xml_to_qdrant를 여러 번 불러도 한 번만 생성)
+_sessions: Dict[str, IngestSession] = {}
+
+
+def get_ingest_session(collection_name: str = COLLECTION_NAME) -> IngestSession:
+    if collection_name not in _sessions:
+        _sessions[collection_name] = IngestSession(collection_name)
+    return _sessions[collection_name]
 
 
 def ingest_xml_to_qdrant(
     xml_path: str,
-    collection_name: str = "insurance_docs"
+    collection_name: str = COLLECTION_NAME,
+    session: Optional[IngestSession] = None,
 ) -> int:
     """
     XML 약관 파일을 파싱 → level 단위 Document 생성 → Qdrant 적재
+    session을 넘기지 않으면 컬렉션별 기본 세션을 재사용한다.
     """
-    # 1. 문서 생성
-    documents: List[Document] = build_documents_from_xml(xml_path)
-
-    if not documents:
-        raise ValueError("❌ 생성된 Document가 없습니다.")
-
-    # 2. VectorStore 생성 + 적재 (🔥 핵심)
-    QdrantVectorStore.from_documents(
-        documents=documents,
-        embedding=get_embeddings(),
-        url="http://localhost:6333",
-        collection_name=collection_name,
-    )
-    return len(documents)
+    session = session or get_ingest_session(collection_name)
+    return len(session.ingest_file(xml_path))
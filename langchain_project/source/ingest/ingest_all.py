@@ -1,25 +1,222 @@
+import argparse
+from collections import defaultdict
 from pathlib import Path
-from .preprocessing import build_documents_from_xml
-from source.ingest.vertorstore_ingest import get_vectorstore, get_embeddings
+from .pipeline import parse_files, run_parallel_ingest
+from .dedup import deduplicate_documents
+from .hashing import file_sha256
+from .ingest import IngestSession
+from .incremental import IngestManifest, clause_points, ingest_incremental
+from .lexical_index_build import build_lexical_index
+from .type_classifier_build import build_type_classifier_from_qdrant
+from source.vectorstore.local_index import export_from_qdrant
+from source.ingest.vertorstore_ingest import COLLECTION_NAME
+from source.config.settings import (
+    INGEST_PARSE_WORKERS,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_UPSERT_WORKERS,
+    INGEST_UPSERT_BATCH_SIZE,
+    INGEST_QUEUE_SIZE,
+    INGEST_MANIFEST_PATH,
+    LOCAL_INDEX_DIR,
+    LEXICAL_INDEX_PATH,
+    ARTICLE_INDEX_PATH,
+    TYPE_CLASSIFIER_PATH,
+    INGEST_DEDUP,
+    INGEST_DEDUP_MAX_HAMMING,
+    INGEST_DEDUP_MIN_CHARS,
+)
 
 PROJECT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_DIR / "data_selected"
 
-# 🔥 Qdrant vectorstore 초기화
-vectorstore = get_vectorstore(
-    recreate=True  # 기존 데이터 싹 지우고 새로 만들기
-)
 
-total_docs = 0
+def ingest_serial(session: IngestSession, xml_files, manifest: IngestManifest) -> int:
+    total_docs = 0
+
+    for xml_file in xml_files:
+        print("Processing:", xml_file.name)
+        try:
+            docs = session.ingest_file(str(xml_file))
+            manifest.set_file(xml_file.name, file_sha256(str(xml_file)), clause_points(docs))
+            total_docs += len(docs)
+            print(f"✅ {len(docs)} documents added for {xml_file.name}")
+        except Exception as e:
+            print(f"❌ Error processing {xml_file.name}: {e}")
+
+    return total_docs
+
+
+def ingest_deduplicated(
+    session: IngestSession, xml_files, manifest: IngestManifest, parse_workers: int
+) -> int:
+    """전체 파일 파싱 → 중복 조항 제거 → 대표 조항만 임베딩/upsert, 적재한 포인트 수 반환"""
+    docs = []
+    file_hashes = {}
+    for xml_path, file_hash, file_docs in parse_files(xml_files, parse_workers):
+        if file_docs is None:
+            continue
+        print(f"✅ {len(file_docs)} documents parsed for {xml_path.name}")
+        docs.extend(file_docs)
+        file_hashes[xml_path.name] = file_hash
+
+    canonical, stats = deduplicate_documents(
+        docs, INGEST_DEDUP_MAX_HAMMING, INGEST_DEDUP_MIN_CHARS
+    )
+    print(
+        f"✅ 중복 제거: {stats.documents} → {stats.canonical} clauses "
+        f"(exact -{stats.exact_duplicates} / near -{stats.near_duplicates})"
+    )
+    session.upsert_documents(canonical)
+
+    # manifest에는 파일별로 그 파일이 대표인 포인트만 기록 (dedup 적재는 증분 적재 대상이 아님)
+    points = defaultdict(list)
+    for doc in canonical:
+        points[Path(doc.metadata.get("source") or "").name].append(doc)
+    for name, file_hash in file_hashes.items():
+        manifest.set_file(name, file_hash, clause_points(points.get(name, [])))
+    manifest.dedup = True
+    return len(canonical)
+
+
+def export_local_index(session: IngestSession):
+    count = export_from_qdrant(session.client, COLLECTION_NAME, LOCAL_INDEX_DIR)
+    print(f"✅ 로컬 인덱스 내보내기 완료: {count} points → {LOCAL_INDEX_DIR}")
+
+
+def rebuild_lexical_index(xml_files, dedup: bool = False):
+    count = build_lexical_index(xml_files, dedup=dedup)
+    print(f"✅ BM25 인덱스 생성 완료: {count} clauses → {LEXICAL_INDEX_PATH}")
+    print(f"✅ 조항 번호 색인 생성 완료 → {ARTICLE_INDEX_PATH}")
+
+
+def rebuild_type_classifier(session: IngestSession):
+    classifier = build_type_classifier_from_qdrant(session.client, COLLECTION_NAME)
+    print(f"✅ 보험유형 분류기 생성 완료: {len(classifier)} types → {TYPE_CLASSIFIER_PATH}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="data_selected/*.xml → Qdrant 적재")
+    parser.add_argument("--parallel", action="store_true", help="병렬 파이프라인 모드 사용")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="컬렉션을 지우지 않고 manifest 기준 변경분만 반영",
+    )
+    parser.add_argument(
+        "--local-index",
+        action="store_true",
+        help="적재 후 컬렉션을 로컬 벡터 인덱스(VECTOR_BACKEND=\"local\")로 내보내기",
+    )
+    parser.add_argument(
+        "--no-lexical-index",
+        action="store_true",
+        help="BM25 인덱스 / 조항 번호 색인을 다시 만들지 않음",
+    )
+    parser.add_argument(
+        "--no-type-classifier",
+        action="store_true",
+        help="보험유형 로컬 분류기(centroid)를 다시 만들지 않음",
+    )
+    parser.add_argument(
+        "--dedup",
+        action=argparse.BooleanOptionalAction,
+        default=INGEST_DEDUP,
+        help="전체 재적재 시 exact/near 중복 조항을 family당 대표 포인트 하나로 합쳐 적재",
+    )
+    parser.add_argument("--parse-workers", type=int, default=INGEST_PARSE_WORKERS)
+    parser.add_argument("--embed-batch-size", type=int, default=INGEST_EMBED_BATCH_SIZE)
+    parser.add_argument("--upsert-workers", type=int, default=INGEST_UPSERT_WORKERS)
+    parser.add_argument("--upsert-batch-size", type=int, default=INGEST_UPSERT_BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=INGEST_QUEUE_SIZE)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    xml_files = sorted(DATA_DIR.glob("*.xml"))
+    manifest = IngestManifest.load(INGEST_MANIFEST_PATH, COLLECTION_NAME)
+
+    # -----------------------------------------------------
+    # 증분 적재: 바뀐 파일/조항만
+    # -----------------------------------------------------
+    if args.incremental:
+        if manifest.dedup:
+            print("❌ 중복 제거(--dedup)로 적재된 컬렉션은 증분 적재할 수 없습니다. 전체 재적재하세요.")
+            return
+        session = IngestSession(COLLECTION_NAME, recreate=False)
+        stats = ingest_incremental(
+            xml_files,
+            client=session.client,
+            embeddings=session.embeddings,
+            collection_name=COLLECTION_NAME,
+            manifest=manifest,
+            batch_size=args.embed_batch_size,
+        )
+        print(
+            f"\n증분 적재 완료: 변경 {stats.files_updated}개 / 유지 {stats.files_unchanged}개 / "
+            f"삭제 {stats.files_removed}개 파일, "
+            f"+{stats.points_upserted} / -{stats.points_deleted} points"
+        )
+        if stats.files_failed:
+            print(f"❌ 실패한 파일 {len(stats.files_failed)}개: {stats.files_failed}")
+        if args.local_index:
+            export_local_index(session)
+        if not args.no_type_classifier:
+            rebuild_type_classifier(session)
+        if not args.no_lexical_index:
+            rebuild_lexical_index(xml_files)
+        return
+
+    # -----------------------------------------------------
+    # 전체 재적재
+    # -----------------------------------------------------
+    # 🔥 Qdrant 컬렉션 초기화 (client/임베딩 모델은 세션 하나로 재사용)
+    session = IngestSession(
+        COLLECTION_NAME,
+        recreate=True,  # 기존 데이터 싹 지우고 새로 만들기
+        batch_size=args.upsert_batch_size,
+    )
+    manifest.clear()
+
+    if args.dedup:
+        # 중복 판정에 전체 조항이 필요하므로 파싱을 모두 끝낸 뒤 대표 조항만 적재
+        total_docs = ingest_deduplicated(
+            session, xml_files, manifest, args.parse_workers if args.parallel else 1
+        )
+    elif args.parallel:
+        stats = run_parallel_ingest(
+            xml_files,
+            client=session.client,
+            embeddings=session.embeddings,
+            collection_name=COLLECTION_NAME,
+            parse_workers=args.parse_workers,
+            embed_batch_size=args.embed_batch_size,
+            upsert_workers=args.upsert_workers,
+            upsert_batch_size=args.upsert_batch_size,
+            queue_size=args.queue_size,
+        )
+        total_docs = stats.documents
+        for name, (file_hash, points) in stats.completed_files().items():
+            manifest.set_file(name, file_hash, points)
+        if stats.files_failed:
+            print(f"❌ 실패한 파일 {len(stats.files_failed)}개: {stats.files_failed}")
+        if stats.failed_documents:
+            print(f"❌ 적재 실패 documents: {stats.failed_documents}")
+    else:
+        total_docs = ingest_serial(session, xml_files, manifest)
+
+    # 다음 --incremental 실행의 기준점
+    manifest.save()
+
+    print(f"\n총 {total_docs} documents Qdrant에 적재 완료")
+
+    if args.local_index:
+        export_local_index(session)
+    if not args.no_type_classifier:
+        rebuild_type_classifier(session)
+    if not args.no_lexical_index:
+        rebuild_lexical_index(xml_files, dedup=args.dedup)
 
-for xml_file in DATA_DIR.glob("*.xml"):
-    print("Processing:", xml_file.name)
-    try:
-        docs = build_documents_from_xml(str(xml_file))
-        vectorstore.add_documents(docs)
-        total_docs += len(docs)
-        print(f"✅ {len(docs)} documents added for {xml_file.name}")
-    except Exception as e:
-        print(f"❌ Error processing {xml_file.name}: {e}")
 
-print(f"\n총 {total_docs} documents Qdrant에 적재 완료")
+if __name__ == "__main__":
+    main()
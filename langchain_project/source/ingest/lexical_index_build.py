@@ -0,0 +1,97 @@
+# lexical_index_build.py
+"""
+BM25 인덱스(하이브리드 검색용) + 조항 번호 색인(제N조 직접 조회용) 생성
+
+build_documents_from_xml 결과(조항 본문 + level 제목)를 색인한다.
+문서 ID는 Qdrant 적재와 같은 clause_point_id이므로 벡터 검색 결과와 RRF로 합치거나 중복 제거할 수 있다.
+
+중복 제거(--dedup)로 적재한 컬렉션이면 BM25 인덱스도 같은 대표 조항만 색인해야 RRF 결과에 복사본이 섞이지 않는다.
+조항 번호 색인은 파일별 조항 번호가 모두 필요하므로 항상 전체 조항으로 만든다.
+
+실행:
+    poetry run python -m source.ingest.lexical_index_build
+    poetry run python -m source.ingest.lexical_index_build --dedup
+"""
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from langchain_core.documents import Document
+
+from .dedup import deduplicate_documents
+from .hashing import clause_point_id
+from .preprocessing import build_documents_from_xml
+from source.ingest.vertorstore_ingest import COLLECTION_NAME
+from source.vectorstore.article_index import ArticleIndex
+from source.vectorstore.lexical_index import BM25Index
+from source.config.settings import (
+    ARTICLE_INDEX_PATH,
+    LEXICAL_INDEX_PATH,
+    INGEST_DEDUP,
+    INGEST_DEDUP_MAX_HAMMING,
+    INGEST_DEDUP_MIN_CHARS,
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data_selected"
+
+
+def _payloads(docs: Iterable[Document]) -> Dict[str, Dict[str, Any]]:
+    # 같은 ID는 Qdrant upsert처럼 마지막 것만 남김
+    return {
+        clause_point_id(doc): {"page_content": doc.page_content, "metadata": doc.metadata}
+        for doc in docs
+    }
+
+
+def build_lexical_index_from_documents(
+    docs: Iterable[Document],
+    path: Path = LEXICAL_INDEX_PATH,
+    article_path: Path = ARTICLE_INDEX_PATH,
+    dedup: bool = False,
+) -> int:
+    docs = list(docs)
+    articles = _payloads(docs)
+    ArticleIndex.build(article_path, list(articles), list(articles.values()), collection_name=COLLECTION_NAME)
+
+    if dedup:
+        docs, _ = deduplicate_documents(docs, INGEST_DEDUP_MAX_HAMMING, INGEST_DEDUP_MIN_CHARS)
+    payloads = _payloads(docs)
+    BM25Index.build(path, list(payloads), list(payloads.values()), collection_name=COLLECTION_NAME)
+    return len(payloads)
+
+
+def build_lexical_index(
+    xml_files: Iterable[Path],
+    path: Path = LEXICAL_INDEX_PATH,
+    article_path: Path = ARTICLE_INDEX_PATH,
+    dedup: bool = False,
+) -> int:
+    """XML 파싱 → BM25 인덱스 + 조항 번호 색인 파일, BM25에 색인한 조항 수 반환"""
+
+    def iter_docs():
+        for xml_file in xml_files:
+            try:
+                yield from build_documents_from_xml(str(xml_file))
+            except Exception as e:
+                print(f"❌ Error processing {xml_file.name}: {e}")
+
+    return build_lexical_index_from_documents(iter_docs(), path, article_path, dedup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 인덱스 + 조항 번호 색인 생성")
+    parser.add_argument(
+        "--dedup",
+        action=argparse.BooleanOptionalAction,
+        default=INGEST_DEDUP,
+        help="ingest_all --dedup으로 적재한 컬렉션과 같은 대표 조항만 BM25에 색인",
+    )
+    args = parser.parse_args()
+
+    count = build_lexical_index(sorted(DATA_DIR.glob("*.xml")), dedup=args.dedup)
+    print(f"\nBM25 인덱스 생성 완료: {count} clauses → {LEXICAL_INDEX_PATH}")
+    print(f"조항 번호 색인 생성 완료 → {ARTICLE_INDEX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# local_index_export.py
+"""
+로컬 벡터 인덱스(VECTOR_BACKEND="local") 생성
+
+- 기본: Qdrant insurance_docs 컬렉션을 그대로 내보내기 (벡터/ID/payload 동일)
+- --from-xml: Qdrant 없이 data_selected/*.xml을 직접 파싱/임베딩해서 생성 (--dedup이면 대표 조항만)
+
+실행:
+    poetry run python -m source.ingest.local_index_export
+    poetry run python -m source.ingest.local_index_export --from-xml
+"""
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from .dedup import deduplicate_documents
+from .hashing import clause_point_id
+from .preprocessing import build_documents_from_xml
+from source.ingest.vertorstore_ingest import COLLECTION_NAME, get_embeddings, get_qdrant_client
+from source.vectorstore.local_index import LocalVectorIndex, export_from_qdrant
+from source.config.settings import (
+    INGEST_EMBED_BATCH_SIZE,
+    LOCAL_INDEX_DIR,
+    INGEST_DEDUP,
+    INGEST_DEDUP_MAX_HAMMING,
+    INGEST_DEDUP_MIN_CHARS,
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data_selected"
+
+
+def build_local_index_from_xml(
+    xml_files: Iterable[Path],
+    embeddings: Embeddings,
+    path: Path = LOCAL_INDEX_DIR,
+    batch_size: int = INGEST_EMBED_BATCH_SIZE,
+    dedup: bool = False,
+) -> int:
+    """
+    XML 파싱 → (중복 제거) → 배치 임베딩 → 로컬 인덱스
+    point ID는 Qdrant 적재와 같은 clause_point_id
+    """
+    docs: List[Document] = []
+    for xml_file in xml_files:
+        try:
+            file_docs = build_documents_from_xml(str(xml_file))
+        except Exception as e:
+            print(f"❌ Error processing {xml_file.name}: {e}")
+            continue
+        docs.extend(file_docs)
+        print(f"✅ {len(file_docs)} documents parsed for {xml_file.name}")
+
+    if dedup:
+        docs, stats = deduplicate_documents(docs, INGEST_DEDUP_MAX_HAMMING, INGEST_DEDUP_MIN_CHARS)
+        print(f"✅ 중복 제거: {stats.documents} → {stats.canonical} clauses")
+
+    # 같은 ID는 Qdrant upsert처럼 마지막 것만 남김
+    points: Dict[str, Tuple[List[float], Dict[str, Any]]] = {}
+    for start in range(0, len(docs), batch_size):
+        chunk = docs[start:start + batch_size]
+        vectors = embeddings.embed_documents([d.page_content for d in chunk])
+        for doc, vector in zip(chunk, vectors):
+            points[clause_point_id(doc)] = (
+                vector,
+                {"page_content": doc.page_content, "metadata": doc.metadata},
+            )
+
+    ids = list(points)
+    LocalVectorIndex.build(
+        path,
+        ids,
+        [points[i][0] for i in ids],
+        [points[i][1] for i in ids],
+        collection_name=COLLECTION_NAME,
+    )
+    return len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 벡터 인덱스 생성")
+    parser.add_argument("--from-xml", action="store_true", help="Qdrant 없이 XML에서 직접 생성")
+    parser.add_argument("--output", type=Path, default=LOCAL_INDEX_DIR)
+    parser.add_argument(
+        "--dedup",
+        action=argparse.BooleanOptionalAction,
+        default=INGEST_DEDUP,
+        help="--from-xml에서 중복 조항을 대표 조항 하나로 합침",
+    )
+    args = parser.parse_args()
+
+    if args.from_xml:
+        count = build_local_index_from_xml(
+            sorted(DATA_DIR.glob("*.xml")), get_embeddings(), args.output, dedup=args.dedup
+        )
+    else:
+        count = export_from_qdrant(get_qdrant_client(), COLLECTION_NAME, args.output)
+
+    print(f"\n로컬 인덱스 생성 완료: {count} points → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
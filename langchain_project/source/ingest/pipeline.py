@@ -0,0 +1,239 @@
+# pipeline.py
+"""
+병렬 파이프라인 적재
+XML 파싱/분할(프로세스 풀) → 배치 임베딩(스레드) → 동시 upsert(스레드 풀)
+각 단계는 bounded queue로 연결되어 느린 단계가 앞 단계를 자연스럽게 막는다(backpressure).
+"""
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from .hashing import clause_point_id, content_hash, file_sha256
+from .preprocessing import build_documents_from_xml
+
+_SENTINEL = None
+
+
+@dataclass
+class IngestStats:
+    """파이프라인 실행 결과"""
+    files_ok: int = 0
+    files_failed: List[str] = field(default_factory=list)
+    documents: int = 0
+    failed_documents: int = 0
+    # manifest 기록용: 파일명 → (파일 해시, {point ID: content 해시})
+    file_points: Dict[str, Tuple[str, Dict[str, str]]] = field(default_factory=dict)
+    # 임베딩/upsert 중 일부라도 실패한 파일명
+    failed_sources: Set[str] = field(default_factory=set)
+
+    def completed_files(self) -> Dict[str, Tuple[str, Dict[str, str]]]:
+        """모든 조항이 정상 적재된 파일만"""
+        return {
+            name: entry for name, entry in self.file_points.items()
+            if name not in self.failed_sources
+        }
+
+
+def _parse_file(xml_path: str) -> Tuple[str, str, List[Document]]:
+    """프로세스 풀 워커: XML 1개 → (경로, 파일 해시, Document 리스트)"""
+    return xml_path, file_sha256(xml_path), build_documents_from_xml(xml_path)
+
+
+def parse_files(
+    xml_files: Iterable[Path], workers: int = 1
+) -> Iterator[Tuple[Path, Optional[str], Optional[List[Document]]]]:
+    """
+    XML 파일들을 파싱/분할 → (경로, 파일 해시, Document 리스트), 입력 순서 유지
+    workers > 1이면 프로세스 풀에서 파싱하고, 실패한 파일은 오류를 출력한 뒤 (경로, None, None)을 돌려준다.
+    """
+    xml_files = list(xml_files)
+    if workers <= 1:
+        results = (_try_parse(str(p)) for p in xml_files)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_try_parse, [str(p) for p in xml_files], chunksize=4)
+    try:
+        for xml_path, (file_hash, docs, error) in zip(xml_files, results):
+            if error is not None:
+                print(f"❌ Error processing {xml_path.name}: {error}")
+            yield xml_path, file_hash, docs
+    finally:
+        if workers > 1:
+            executor.shutdown()
+
+
+def _try_parse(xml_path: str):
+    try:
+        _, file_hash, docs = _parse_file(xml_path)
+        return file_hash, docs, None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def _source_names(docs: Sequence[Document]) -> Set[str]:
+    return {Path(d.metadata.get("source") or "").name for d in docs}
+
+
+def documents_to_points(
+    docs: Sequence[Document], vectors: Sequence[List[float]]
+) -> List[PointStruct]:
+    """
+    Document + 벡터 → Qdrant PointStruct
+    payload 구조는 QdrantVectorStore와 동일 (page_content / metadata)
+    ID는 clause_point_id로 결정적으로 생성 (재적재해도 중복 포인트가 생기지 않음)
+    """
+    return [
+        PointStruct(
+            id=clause_point_id(doc),
+            vector=list(vector),
+            payload={"page_content": doc.page_content, "metadata": doc.metadata},
+        )
+        for doc, vector in zip(docs, vectors)
+    ]
+
+
+def run_parallel_ingest(
+    xml_files: Iterable[Path],
+    client: QdrantClient,
+    embeddings: Embeddings,
+    collection_name: str,
+    parse_workers: int,
+    embed_batch_size: int,
+    upsert_workers: int,
+    upsert_batch_size: int,
+    queue_size: int,
+) -> IngestStats:
+    """
+    XML 파일들을 병렬 파이프라인으로 Qdrant에 적재
+
+    Args:
+        xml_files: 적재할 XML 파일 경로들
+        client: Qdrant 클라이언트 (컬렉션은 미리 생성되어 있어야 함)
+        embeddings: 문서 임베딩 모델
+        collection_name: 적재 대상 컬렉션
+        parse_workers: 파싱/분할 프로세스 수
+        embed_batch_size: 임베딩 1회당 문서 수
+        upsert_workers: 동시 upsert 스레드 수
+        upsert_batch_size: upsert 1회당 포인트 수
+        queue_size: 단계 간 queue 최대 크기
+
+    Returns:
+        IngestStats
+    """
+    stats = IngestStats()
+    stats_lock = threading.Lock()
+
+    doc_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    point_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+
+    # -----------------------------------------------------
+    # 2단계: 배치 임베딩
+    # -----------------------------------------------------
+    def embed_stage():
+        batch: List[Document] = []
+
+        def flush():
+            if not batch:
+                return
+            try:
+                vectors = embeddings.embed_documents([d.page_content for d in batch])
+                point_queue.put((list(batch), vectors))
+            except Exception as e:
+                print(f"❌ 임베딩 실패 ({len(batch)} docs): {e}")
+                with stats_lock:
+                    stats.failed_documents += len(batch)
+                    stats.failed_sources |= _source_names(batch)
+            batch.clear()
+
+        while True:
+            docs = doc_queue.get()
+            if docs is _SENTINEL:
+                break
+            for doc in docs:
+                batch.append(doc)
+                if len(batch) >= embed_batch_size:
+                    flush()
+        flush()
+
+        for _ in range(upsert_workers):
+            point_queue.put(_SENTINEL)
+
+    # -----------------------------------------------------
+    # 3단계: 동시 upsert
+    # -----------------------------------------------------
+    def upsert_stage():
+        while True:
+            item = point_queue.get()
+            if item is _SENTINEL:
+                break
+            docs, vectors = item
+            for start in range(0, len(docs), upsert_batch_size):
+                chunk_docs = docs[start:start + upsert_batch_size]
+                chunk_vectors = vectors[start:start + upsert_batch_size]
+                try:
+                    client.upsert(
+                        collection_name=collection_name,
+                        points=documents_to_points(chunk_docs, chunk_vectors),
+                        wait=True,
+                    )
+                    with stats_lock:
+                        stats.documents += len(chunk_docs)
+                except Exception as e:
+                    print(f"❌ upsert 실패 ({len(chunk_docs)} docs): {e}")
+                    with stats_lock:
+                        stats.failed_documents += len(chunk_docs)
+                        stats.failed_sources |= _source_names(chunk_docs)
+
+    embed_thread = threading.Thread(target=embed_stage, name="ingest-embed", daemon=True)
+    upsert_threads = [
+        threading.Thread(target=upsert_stage, name=f"ingest-upsert-{i}", daemon=True)
+        for i in range(upsert_workers)
+    ]
+    embed_thread.start()
+    for t in upsert_threads:
+        t.start()
+
+    # -----------------------------------------------------
+    # 1단계: 프로세스 풀 파싱/분할
+    # 동시에 진행 중인 파싱 작업 수를 제한해 결과가 메모리에 쌓이지 않게 한다.
+    # -----------------------------------------------------
+    def handle(future, xml_path: Path):
+        try:
+            _, file_hash, docs = future.result()
+        except Exception as e:
+            print(f"❌ Error processing {xml_path.name}: {e}")
+            stats.files_failed.append(xml_path.name)
+            return
+        stats.files_ok += 1
+        stats.file_points[xml_path.name] = (
+            file_hash,
+            {clause_point_id(d): content_hash(d.page_content) for d in docs},
+        )
+        print(f"✅ {len(docs)} documents parsed for {xml_path.name}")
+        doc_queue.put(docs)
+
+    try:
+        with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+            in_flight: deque = deque()
+            for xml_path in xml_files:
+                in_flight.append((executor.submit(_parse_file, str(xml_path)), xml_path))
+                if len(in_flight) >= parse_workers * 2:
+                    handle(*in_flight.popleft())
+            while in_flight:
+                handle(*in_flight.popleft())
+    finally:
+        doc_queue.put(_SENTINEL)
+        embed_thread.join()
+        for t in upsert_threads:
+            t.join()
+
+    return stats
@@ -1,7 +1,7 @@
 # preprocessing.py
 import re
 import xml.etree.ElementTree as ET
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 from pathlib import Path
 from langchain_core.documents import Document
 import unicodedata
@@ -29,16 +29,32 @@ def resolve_structure_type(insurance_type: str) -> str:
     return "default"
 
 # ---------- Load ----------
-def load_xml_text(xml_path: str) -> str:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
+def iter_normalized_lines(xml_path: str) -> Iterator[str]:
+    """
+    <cn> 텍스트를 스트리밍으로 읽어 정규화된 줄 단위로 반환
+    (load_xml_text + normalize_text 결과의 각 줄과 동일)
 
-    texts = []
-    for cn in root.iter("cn"):
-        if cn.text:
-            texts.append(cn.text)
+    전체 ElementTree를 만들지 않고 iterparse로 읽으면서
+    처리가 끝난 element는 바로 비워서 파일 크기와 무관하게 트리 메모리를 제한한다.
+    """
+    context = ET.iterparse(xml_path, events=("start", "end"))
+    _, root = next(context)
 
-    return "\n".join(texts)
+    for event, elem in context:
+        if event != "end":
+            continue
+        if elem.tag == "cn" and elem.text:
+            for line in elem.text.splitlines():
+                line = line.strip()
+                if line:
+                    yield line
+        elem.clear()
+        root.clear()
+
+
+def load_xml_text(xml_path: str) -> str:
+    """정규화된 전체 텍스트 (normalize_text를 다시 거칠 필요 없음)"""
+    return "\n".join(iter_normalized_lines(xml_path))
 
 
 # ---------- Normalize ----------
@@ -86,118 +102,73 @@ def split_with_pattern(
 # =========================================================
 # 5. Document Builder
 # =========================================================
-def build_documents_from_xml(xml_path: str) -> List[Document]:
-    raw_text = load_xml_text(xml_path)
-    text = normalize_text(raw_text)
+def _clause_document(body: str, titles: Tuple[Optional[str], ...], insurance_type: str, xml_path: str) -> Document:
+    levels = list(titles) + [None] * (4 - len(titles))
+    return Document(
+        page_content=body,
+        metadata={
+            "insurance_type": insurance_type,
+            "level_1": levels[0],
+            "level_2": levels[1],
+            "level_3": levels[2],
+            "level_4": levels[3],
+            "source": xml_path,
+        },
+    )
+
+
+def iter_documents_from_xml(xml_path: str) -> Iterator[Document]:
+    # 스트리밍 로더가 이미 정규화된 줄을 주므로 한 번만 합친다
+    # (조항 패턴이 줄바꿈을 넘어 매칭될 수 있어 분할은 전체 텍스트 기준)
+    text = load_xml_text(xml_path)
 
     insurance_type = extract_insurance_type(xml_path)
     structure_type = resolve_structure_type(insurance_type)
     patterns = LEVEL_PATTERNS[structure_type]
 
-    documents: List[Document] = []
+    found = False
 
     # -----------------------------------------------------
     # 🚗 자동차보험: 편 / 장 / 절 / 조
-    # -----------------------------------------------------
-    if structure_type == "automobile":
-        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
-            for l2_title, l2_body in split_with_pattern(l1_body, patterns["level_2"]):
-                for l3_title, l3_body in split_with_pattern(l2_body, patterns["level_3"]):
-                    jo_parts = patterns["level_4"].split(l3_body)
-
-                    if len(jo_parts) > 1:
-                        for i in range(1, len(jo_parts), 2):
-                            l4_title = jo_parts[i].strip()
-                            l4_body = jo_parts[i + 1].strip()
-
-                            documents.append(
-                                Document(
-                                    page_content=l4_body,
-                                    metadata={
-                                        "insurance_type": insurance_type,
-                                        "level_1": l1_title,
-                                        "level_2": l2_title,
-                                        "level_3": l3_title,
-                                        "level_4": l4_title,
-                                        "source": xml_path,
-                                    },
-                                )
-                            )
-                    else:
-                        content = l3_body.strip()
-                        if content:
-                            documents.append(
-                                Document(
-                                    page_content=content,
-                                    metadata={
-                                        "insurance_type": insurance_type,
-                                        "level_1": l1_title,
-                                        "level_2": l2_title,
-                                        "level_3": l3_title,
-                                        "level_4": None,
-                                        "source": xml_path,
-                                    },
-                                )
-                            )
-
-    # -----------------------------------------------------
     # 📘 일반 보험: 관 / 조
+    # (단일 패스 스캐너는 CPython에서 중첩 re.split보다 느려서 쓰지 않음 → test/source/benchmark_splitter.py 참고)
     # -----------------------------------------------------
+    if structure_type == "automobile":
+        sections = (
+            ((l1_title, l2_title, l3_title), l3_body)
+            for l1_title, l1_body in split_with_pattern(text, patterns["level_1"])
+            for l2_title, l2_body in split_with_pattern(l1_body, patterns["level_2"])
+            for l3_title, l3_body in split_with_pattern(l2_body, patterns["level_3"])
+        )
+        leaf_pattern = patterns["level_4"]
     else:
-        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
-            jo_parts = patterns["level_2"].split(l1_body)
-
-            if len(jo_parts) > 1:
-                for i in range(1, len(jo_parts), 2):
-                    l2_title = jo_parts[i].strip()
-                    l2_body = jo_parts[i + 1].strip()
-
-                    documents.append(
-                        Document(
-                            page_content=l2_body,
-                            metadata={
-                                "insurance_type": insurance_type,
-                                "level_1": l1_title,
-                                "level_2": l2_title,
-                                "level_3": None,
-                                "level_4": None,
-                                "source": xml_path,
-                            },
-                        )
-                    )
-            else:
-                content = l1_body.strip()
-                if content:
-                    documents.append(
-                        Document(
-                            page_content=content,
-                            metadata={
-                                "insurance_type": insurance_type,
-                                "level_1": l1_title,
-                                "level_2": None,
-                                "level_3": None,
-                                "level_4": None,
-                                "source": xml_path,
-                            },
-                        )
-                    )
+        sections = (
+            ((l1_title,), l1_body)
+            for l1_title, l1_body in split_with_pattern(text, patterns["level_1"])
+        )
+        leaf_pattern = patterns["level_2"]
+
+    for parent_titles, body in sections:
+        jo_parts = leaf_pattern.split(body)
+
+        if len(jo_parts) > 1:
+            for i in range(1, len(jo_parts), 2):
+                found = True
+                yield _clause_document(
+                    jo_parts[i + 1].strip(), parent_titles + (jo_parts[i].strip(),), insurance_type, xml_path
+                )
+        else:
+            content = body.strip()
+            if content:
+                found = True
+                yield _clause_document(content, parent_titles + (None,), insurance_type, xml_path)
 
     # -----------------------------------------------------
     # ❗ 최후 방어
     # -----------------------------------------------------
-    if not documents:
-        documents.append(
-            Document(
-                page_content=text,
-                metadata={
-                    "insurance_type": insurance_type,
-                    "level_1": None,
-                    "level_2": None,
-                    "level_3": None,
-                    "level_4": None,
-                    "source": xml_path,
-                },
-            )
-        )
+    if not found:
+        yield _clause_document(text, (), insurance_type, xml_path)
 
-    return documents
\ No newline at end of file
+
+def build_documents_from_xml(xml_path: str) -> List[Document]:
+    return list(iter_documents_from_xml(xml_path))
@@ -0,0 +1,79 @@
+# type_classifier_build.py
+"""
+보험유형 로컬 분류기(nearest centroid) 생성
+
+컬렉션에 적재된 조항 벡터를 보험유형별로 평균내서 centroid 파일을 만든다.
+임베딩을 다시 계산하지 않으므로 80k 조항 기준 scroll 시간만 든다.
+
+실행:
+    poetry run python -m source.ingest.type_classifier_build
+    poetry run python -m source.ingest.type_classifier_build --from-local   # 로컬 인덱스에서
+"""
+import argparse
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from source.ingest.vertorstore_ingest import COLLECTION_NAME, get_qdrant_client
+from source.vectorstore.local_index import LocalVectorIndex, iter_qdrant_points
+from source.vectorstore.type_classifier import TypeCentroidClassifier, iter_typed_vectors
+from source.config.settings import LOCAL_INDEX_DIR, TYPE_CLASSIFIER_PATH
+
+
+def build_type_classifier_from_qdrant(
+    client: QdrantClient,
+    collection_name: str = COLLECTION_NAME,
+    path: Path = TYPE_CLASSIFIER_PATH,
+) -> TypeCentroidClassifier:
+    classifier = TypeCentroidClassifier.from_vectors(
+        iter_typed_vectors(iter_qdrant_points(client, collection_name))
+    )
+    classifier.save(path)
+    return classifier
+
+
+def _iter_local_rows(index: LocalVectorIndex) -> Iterable[Tuple[np.ndarray, List[str]]]:
+    """로컬 인덱스 행 → (벡터, 보험유형들), payload를 읽지 않고 meta의 유형 구간만 사용"""
+    row_types: List[List[str]] = [[] for _ in range(len(index))]
+    for insurance_type, (start, end) in index.type_ranges.items():
+        for row in range(start, end):
+            row_types[row].append(insurance_type)
+    for insurance_type, rows in index.type_extra_rows.items():
+        for row in rows:
+            row_types[int(row)].append(insurance_type)
+    for row, types in enumerate(row_types):
+        yield index.vectors[row], types
+
+
+def build_type_classifier_from_local_index(
+    index_dir: Path = LOCAL_INDEX_DIR, path: Path = TYPE_CLASSIFIER_PATH
+) -> TypeCentroidClassifier:
+    index = LocalVectorIndex(index_dir)
+    try:
+        classifier = TypeCentroidClassifier.from_vectors(_iter_local_rows(index))
+    finally:
+        index.close()
+    classifier.save(path)
+    return classifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보험유형 로컬 분류기(centroid) 생성")
+    parser.add_argument("--from-local", action="store_true", help="Qdrant 대신 로컬 인덱스에서 생성")
+    parser.add_argument("--output", type=Path, default=TYPE_CLASSIFIER_PATH)
+    args = parser.parse_args()
+
+    if args.from_local:
+        classifier = build_type_classifier_from_local_index(LOCAL_INDEX_DIR, args.output)
+    else:
+        classifier = build_type_classifier_from_qdrant(get_qdrant_client(), COLLECTION_NAME, args.output)
+
+    print(f"\n보험유형 분류기 생성 완료 → {args.output}")
+    for insurance_type, count in zip(classifier.types, classifier.counts):
+        print(f"  {insurance_type}: {count:,} clauses")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,25 @@
 # source/vectorstore.py
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
 from langchain_qdrant import QdrantVectorStore
-from langchain_huggingface import HuggingFaceEmbeddings
+
+from source.config.settings import (
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    QDRANT_QUANTIZATION,
+    QDRANT_QUANTIZATION_ALWAYS_RAM,
+    QDRANT_VECTORS_ON_DISK,
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_HNSW_ON_DISK,
+)
+from source.vectorstore.embedding_cache import build_embeddings
+from source.vectorstore.collection import build_collection_config, ensure_payload_indexes
 
 
 COLLECTION_NAME = "insurance_docs"
+VECTOR_SIZE = 384  # 임베딩 차원 수
 
 
 def get_qdrant_client():
@@ -13,28 +27,45 @@ def get_qdrant_client():
 
 
 def get_embeddings():
-    return HuggingFaceEmbeddings(
-        model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-    )  # type: ignore
+    # 앱(질의 임베딩)과 같은 모델 / 같은 캐시 파일 (vectorstore.retriever.get_embeddings와 같은 factory)
+    return build_embeddings(
+        EMBEDDING_MODEL,
+        EMBEDDING_CACHE_PATH if EMBEDDING_CACHE_ENABLED else None,
+        EMBEDDING_CACHE_MAX_ENTRIES,
+    )
 
 
-def get_vectorstore(recreate: bool = False) -> QdrantVectorStore:
-    client = get_qdrant_client()
-    embeddings = get_embeddings()
-
+def ensure_collection(client: QdrantClient, collection_name: str = COLLECTION_NAME, recreate: bool = False):
     # 🔥 컬렉션 존재 여부 확인
     collections = [c.name for c in client.get_collections().collections]
 
-    if COLLECTION_NAME not in collections or recreate:
-        # 컬렉션 생성
+    if collection_name not in collections or recreate:
+        # 컬렉션 생성 (양자화 / on-disk / HNSW 설정은 settings의 QDRANT_* 값)
         client.recreate_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=384, # 임베딩 차원 수
-                distance=Distance.COSINE,
+            collection_name=collection_name,
+            **build_collection_config(
+                VECTOR_SIZE,
+                quantization=QDRANT_QUANTIZATION,
+                quantization_always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM,
+                vectors_on_disk=QDRANT_VECTORS_ON_DISK,
+                hnsw_m=QDRANT_HNSW_M,
+                hnsw_ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+                hnsw_on_disk=QDRANT_HNSW_ON_DISK,
             ),
         )
 
+    # 필터 검색(metadata.insurance_type 등)이 payload 전체를 훑지 않도록 keyword index
+    created = ensure_payload_indexes(client, collection_name)
+    if created:
+        print(f"✅ payload index 생성: {', '.join(created)}")
+
+
+def get_vectorstore(recreate: bool = False) -> QdrantVectorStore:
+    client = get_qdrant_client()
+    embeddings = get_embeddings()
+
+    ensure_collection(client, COLLECTION_NAME, recreate=recreate)
+
     return QdrantVectorStore(
         client=client,
         collection_name=COLLECTION_NAME,
@@ -1,8 +1,114 @@
+"""
+LLM 클라이언트 (프로세스 전역)
+
+- stage(분류/생성/평가)마다 ChatUpstage를 하나씩만 만들고 재사용
+- 모든 stage가 keep-alive httpx 연결 풀 하나를 공유 (요청마다 TLS 연결을 새로 열지 않음)
+- stage별 timeout, 재시도는 openai 클라이언트의 exponential backoff + jitter (LLM_MAX_RETRIES회)
+- 짧은 분류 호출은 hedged_invoke로 느린 요청을 하나 더 보내서 꼬리 지연을 줄임
+"""
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, Optional
+
+import httpx
 from langchain_upstage import ChatUpstage
-from config.settings import UPSTAGE_MODEL, TEMPERATURE
 
-def get_llm():
-    return ChatUpstage(
-        model=UPSTAGE_MODEL,
-        temperature=TEMPERATURE,
-    )
\ No newline at end of file
+from config.settings import (
+    LLM_HEDGE_DELAY_SECONDS,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_TIMEOUTS,
+    TEMPERATURE,
+    UPSTAGE_MODEL,
+)
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_llms: Dict[str, ChatUpstage] = {}
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_http_client() -> httpx.Client:
+    """모든 LLM 호출이 공유하는 keep-alive 연결 풀"""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                    ),
+                )
+    return _http_client
+
+
+def get_llm(stage: str = "generation") -> ChatUpstage:
+    """
+    stage별 ChatUpstage (프로세스에서 한 번만 생성)
+
+    Args:
+        stage: "classification" | "generation" | "judge" (LLM_TIMEOUTS의 키, 없으면 generation timeout)
+    """
+    llm = _llms.get(stage)
+    if llm is None:
+        http_client = get_http_client()
+        with _lock:
+            llm = _llms.get(stage)
+            if llm is None:
+                llm = ChatUpstage(
+                    model=UPSTAGE_MODEL,
+                    temperature=TEMPERATURE,
+                    request_timeout=LLM_TIMEOUTS.get(stage, LLM_TIMEOUTS["generation"]),
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=http_client,
+                )
+                _llms[stage] = llm
+    return llm
+
+
+def hedged_invoke(llm: Any, prompt: Any, delay: float = LLM_HEDGE_DELAY_SECONDS) -> Any:
+    """
+    delay초 안에 응답이 없으면 같은 요청을 하나 더 보내고 먼저 성공한 응답을 반환
+    (한 요청이 실패해도 다른 요청이 성공하면 그 결과를 쓴다. 늦은 요청은 취소하지 않고 버린다)
+    """
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(
+                    max_workers=LLM_MAX_CONNECTIONS, thread_name_prefix="llm-hedge"
+                )
+
+    first = _hedge_executor.submit(llm.invoke, prompt)
+    try:
+        return first.result(timeout=delay)
+    except FuturesTimeoutError:
+        pass
+
+    pending = {first, _hedge_executor.submit(llm.invoke, prompt)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error  # type: ignore[misc]
+
+
+def reset_llm_clients():
+    """생성된 LLM / 연결 풀 정리 (설정 변경 후 다시 만들 때)"""
+    global _http_client, _hedge_executor
+    with _lock:
+        _llms.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+        if _hedge_executor is not None:
+            _hedge_executor.shutdown(wait=False)
+            _hedge_executor = None
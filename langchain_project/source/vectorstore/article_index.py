@@ -0,0 +1,212 @@
+# vectorstore/article_index.py
+"""
+조항 번호 직접 조회 색인 (제N조 / 제N관 / 제N장 / 제N절 / 제N편)
+
+"제12조 보험금 지급사유"처럼 조항을 콕 집어 묻는 질문은 분류(LLM)/벡터 검색 없이
+preprocessing.py가 뽑아 둔 level_1 ~ level_4 제목의 조항 번호로 바로 찾는다.
+
+    keys["제12조"] = [문서 번호, ...]   (문서 번호는 docs 목록의 위치)
+
+질문에 조항 번호가 여러 개면 모두 포함하는 조항만 (제2장 제3조 → 제2장 아래의 제3조),
+같은 번호가 여러 약관에 있으면 제목과 질문이 겹치는 정도로 순서를 정하고 몇 개만 남긴다
+(어느 약관인지 모르는 "제1조"가 검색 결과를 다 채우지 않도록, 나머지는 벡터 검색으로 채움).
+
+적재(ingest)와 질의(query) 양쪽에서 쓰므로 settings를 import하지 않고 인자로 받는다.
+"""
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.documents import Document
+
+from .lexical_index import LEVEL_KEYS, tokenize
+
+INDEX_VERSION = 1
+
+# "제12조", "제 1 장", "제12조의2" ("제"가 있어야 함: "1조원", "3장 필요" 같은 금액/수량 제외)
+_REF = r"제\s*(\d+)\s*(편|장|절|관|조)(?:\s*의\s*(\d+))?"
+# 질문: "경제 1조원"처럼 바로 뒤에 금액 단위가 붙으면 조항 번호가 아님
+_ARTICLE_REF = re.compile(_REF + r"(?![원억])")
+_TITLE_REF = re.compile(r"^\s*" + _REF)
+
+
+def _format_ref(number: str, unit: str, branch: Optional[str]) -> str:
+    ref = f"제{int(number)}{unit}"
+    return f"{ref}의{int(branch)}" if branch else ref
+
+
+def extract_article_refs(text: str) -> List[str]:
+    """질문에서 조항 번호를 정규화해서 추출 ("제 12 조" → "제12조", "제"가 없는 "12조"는 제외)"""
+    text = unicodedata.normalize("NFKC", text or "")
+    refs: List[str] = []
+    for number, unit, branch in _ARTICLE_REF.findall(text):
+        ref = _format_ref(number, unit, branch)
+        if ref not in refs:
+            refs.append(ref)
+    return refs
+
+
+def title_article_ref(title: Optional[str]) -> Optional[str]:
+    """level 제목 맨 앞의 조항 번호 ("제 1 장 배상책임" → "제1장", 번호가 없으면 None)"""
+    if not title:
+        return None
+    match = _TITLE_REF.match(unicodedata.normalize("NFKC", title))
+    return _format_ref(*match.groups()) if match else None
+
+
+def mentioned_insurance_types(question: str, insurance_types: Iterable[str]) -> Set[str]:
+    """질문에 보험유형 이름이 그대로 들어 있으면 그 유형들 ("자동차보험 제3조")"""
+    q = (question or "").replace(" ", "")
+    return {t for t in insurance_types if t in q}
+
+
+class ArticleIndex:
+    """조항 번호 → 조항 목록 (exact match)"""
+
+    def __init__(self, data: Dict[str, Any]):
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"❌ 지원하지 않는 조항 색인 버전: {data.get('version')}")
+        self.collection_name: str = data.get("collection", "")
+        self.docs: List[Dict[str, Any]] = data["docs"]
+        self.keys: Dict[str, List[int]] = data["keys"]
+        self.types: List[Optional[str]] = [
+            (d["metadata"] or {}).get("insurance_type") for d in self.docs
+        ]
+        self.sources: List[Optional[str]] = [
+            (d["metadata"] or {}).get("source") for d in self.docs
+        ]
+        # 같은 번호가 여러 약관에 있을 때 순서를 정하기 위한 제목 토큰
+        self.title_tokens: List[Set[str]] = [
+            set(tokenize(" ".join(
+                (d["metadata"] or {}).get(key) or "" for key in LEVEL_KEYS
+            )))
+            for d in self.docs
+        ]
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # ---------- Build / Persist ----------
+    @staticmethod
+    def build_data(
+        ids: Sequence[Any],
+        payloads: Sequence[Dict[str, Any]],
+        collection_name: str = "",
+    ) -> Dict[str, Any]:
+        docs: List[Dict[str, Any]] = []
+        keys: Dict[str, List[int]] = defaultdict(list)
+
+        for point_id, payload in zip(ids, payloads):
+            metadata = payload.get("metadata") or {}
+            refs = {title_article_ref(metadata.get(key)) for key in LEVEL_KEYS} - {None}
+            if not refs:
+                continue  # 조항 번호가 없는 조항은 색인하지 않음
+            for ref in refs:
+                keys[ref].append(len(docs))
+            docs.append({
+                "id": str(point_id),
+                "page_content": payload.get("page_content", ""),
+                "metadata": metadata,
+            })
+
+        return {
+            "version": INDEX_VERSION,
+            "collection": collection_name,
+            "docs": docs,
+            "keys": keys,
+        }
+
+    @staticmethod
+    def build(
+        path: Path,
+        ids: Sequence[Any],
+        payloads: Sequence[Dict[str, Any]],
+        collection_name: str = "",
+    ) -> Path:
+        """색인 파일 생성 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(ArticleIndex.build_data(ids, payloads, collection_name), f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "ArticleIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    # ---------- Lookup ----------
+    def lookup(
+        self,
+        question: str,
+        insurance_types: Optional[Iterable[str]] = None,
+    ) -> List[int]:
+        """
+        질문의 조항 번호를 모두 포함하는 조항(문서 번호) 전체, 제목이 질문과 많이 겹치는 순
+        insurance_types가 있으면 해당 유형 조항만
+        """
+        refs = extract_article_refs(question)
+        if not refs:
+            return []
+
+        postings = [self.keys.get(ref) for ref in refs]
+        if not all(postings):
+            return []
+        # 가장 짧은 목록부터 교집합 (문서 번호 순서 = 적재 순서 유지)
+        postings.sort(key=len)
+        matched = set(postings[0]).intersection(*postings[1:])
+        if insurance_types is not None:
+            allowed = set(insurance_types)
+            matched = {doc for doc in matched if self.types[doc] in allowed}
+
+        query_tokens = set(tokenize(question))
+        return sorted(
+            matched, key=lambda doc: (-len(query_tokens & self.title_tokens[doc]), doc)
+        )
+
+    def document(self, doc: int) -> Document:
+        """QdrantVectorStore와 같은 Document 형태 (metadata에 _id / _collection_name)"""
+        record = self.docs[doc]
+        metadata = dict(record["metadata"])
+        metadata["_id"] = record["id"]
+        metadata["_collection_name"] = self.collection_name
+        return Document(page_content=record["page_content"], metadata=metadata)
+
+    def lookup_documents(
+        self,
+        question: str,
+        k: int,
+        insurance_types: Optional[Iterable[str]] = None,
+        max_ambiguous: Optional[int] = None,
+    ) -> Tuple[List[Document], Optional[str]]:
+        """
+        max_ambiguous: 찾은 조항이 여러 약관(source)에 걸쳐 있으면 상위 max_ambiguous개만 반환
+
+        Returns:
+            (상위 k개 docs, insurance_type) - 찾은 조항 전체가 한 보험유형이면 그 유형 (분류 생략 가능), 아니면 None
+        """
+        matched = self.lookup(question, insurance_types)
+        types = {self.types[doc] for doc in matched}
+        insurance_type = types.pop() if len(types) == 1 else None
+        if max_ambiguous is not None and len({self.sources[doc] for doc in matched}) > 1:
+            k = min(k, max_ambiguous)
+        return [self.document(doc) for doc in matched[:k]], insurance_type
+
+
+def merge_documents(primary: Sequence[Document], extra: Sequence[Document], k: int) -> List[Document]:
+    """primary를 앞에 두고 extra에서 중복(metadata _id) 없이 k개까지 채움"""
+    seen = {doc.metadata.get("_id") for doc in primary}
+    merged = list(primary)
+    for doc in extra:
+        if len(merged) >= k:
+            break
+        if doc.metadata.get("_id") not in seen:
+            seen.add(doc.metadata.get("_id"))
+            merged.append(doc)
+    return merged
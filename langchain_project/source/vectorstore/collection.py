@@ -0,0 +1,122 @@
+# vectorstore/collection.py
+"""
+Qdrant 컬렉션 설정 (payload index / 양자화 / HNSW / 검색 파라미터)
+적재(ingest)와 질의(query) 양쪽에서 쓰므로 settings를 import하지 않고 인자로 받는다.
+
+QdrantVectorStore는 payload를 {"page_content", "metadata": {...}}로 저장하므로
+필터 key는 "metadata." 접두어가 붙는다.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from qdrant_client import QdrantClient, models
+from qdrant_client.models import PayloadSchemaType
+
+PAYLOAD_INDEX_FIELDS = (
+    "metadata.insurance_type",  # 보험유형 필터 (모든 검색)
+    "metadata.insurance_types",  # 중복 제거 적재 시 family 전체 보험유형 (배열)
+    "metadata.source",
+    "metadata.level_1",
+    "metadata.level_2",
+    "metadata.level_3",
+    "metadata.level_4",
+)
+
+
+def find_missing_payload_indexes(
+    client: QdrantClient,
+    collection_name: str,
+    fields: Sequence[str] = PAYLOAD_INDEX_FIELDS,
+) -> List[str]:
+    """컬렉션에 keyword index가 없는 필드 목록"""
+    schema = client.get_collection(collection_name).payload_schema or {}
+    return [field for field in fields if field not in schema]
+
+
+def ensure_payload_indexes(
+    client: QdrantClient,
+    collection_name: str,
+    fields: Sequence[str] = PAYLOAD_INDEX_FIELDS,
+) -> List[str]:
+    """없는 keyword payload index만 생성하고, 생성한 필드 목록 반환"""
+    missing = find_missing_payload_indexes(client, collection_name, fields)
+    for field in missing:
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field,
+            field_schema=PayloadSchemaType.KEYWORD,
+            wait=True,
+        )
+    return missing
+
+
+def build_collection_config(
+    vector_size: int,
+    quantization: Optional[str] = None,
+    quantization_always_ram: bool = True,
+    vectors_on_disk: bool = False,
+    hnsw_m: int = 16,
+    hnsw_ef_construct: int = 100,
+    hnsw_on_disk: bool = False,
+) -> Dict[str, Any]:
+    """
+    create_collection 인자 (vectors_config / hnsw_config / quantization_config)
+
+    Args:
+        quantization: None | "scalar"(int8) | "binary"
+        quantization_always_ram: 양자화 벡터를 항상 RAM에 둘지 여부
+        vectors_on_disk: 원본 float32 벡터를 디스크(mmap)에 저장
+    """
+    if quantization is None:
+        quantization_config = None
+    elif quantization == "scalar":
+        quantization_config = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=quantization_always_ram,
+            )
+        )
+    elif quantization == "binary":
+        quantization_config = models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=quantization_always_ram)
+        )
+    else:
+        raise ValueError(f"❌ 지원하지 않는 quantization: {quantization}")
+
+    return {
+        "vectors_config": models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+            on_disk=vectors_on_disk,
+        ),
+        "hnsw_config": models.HnswConfigDiff(
+            m=hnsw_m,
+            ef_construct=hnsw_ef_construct,
+            on_disk=hnsw_on_disk,
+        ),
+        "quantization_config": quantization_config,
+    }
+
+
+def build_search_params(
+    hnsw_ef: Optional[int] = None,
+    quantization: Optional[str] = None,
+    rescore: bool = True,
+    oversampling: float = 2.0,
+    exact: bool = False,
+) -> Optional[models.SearchParams]:
+    """검색 시 SearchParams (양자화 컬렉션이면 rescore/oversampling 포함)"""
+    quantization_params = None
+    if quantization is not None:
+        quantization_params = models.QuantizationSearchParams(
+            rescore=rescore,
+            oversampling=oversampling,
+        )
+
+    if hnsw_ef is None and quantization_params is None and not exact:
+        return None
+    return models.SearchParams(
+        hnsw_ef=hnsw_ef,
+        exact=exact,
+        quantization=quantization_params,
+    )
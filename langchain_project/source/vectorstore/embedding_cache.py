@@ -0,0 +1,205 @@
+# vectorstore/embedding_cache.py
+"""
+SQLite 기반 영구 임베딩 캐시
+(모델명, 정규화된 텍스트 해시) → float32 벡터
+
+적재(ingest)와 질의(query) 임베딩이 같은 캐시 파일을 공유하므로
+여러 보험사 약관에 반복되는 표준 조항이나 반복 질문은 transformer를 거치지 않는다.
+
+적재/질의 양쪽에서 쓰므로 settings를 import하지 않고 build_embeddings 인자로 받는다.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_for_cache(text: str) -> str:
+    """유니코드(NFC)와 공백만 정규화 (임베딩 결과에 영향이 없는 차이)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 모델 앞단의 영구 캐시
+
+    Args:
+        embeddings: 실제 임베딩 모델 (캐시 miss일 때만 호출)
+        model_name: 캐시 키에 포함되는 모델명 (모델이 바뀌면 자동으로 다른 키)
+        cache_path: SQLite 파일 경로
+        max_entries: 최대 저장 벡터 수 (초과 시 오래 안 쓰인 것부터 삭제)
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        cache_path: Path,
+        max_entries: int,
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache_path = Path(cache_path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._count = 0  # 저장 행 수 추정치 (열 때 세고, 저장할 때마다 더함 → max_entries를 넘을 때만 다시 셈)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.cache_path), timeout=30, check_same_thread=False
+        )
+        # 적재 프로세스와 앱이 동시에 열어도 읽기가 막히지 않도록 WAL 사용
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+        self._count = self._row_count()
+
+    # ---------- Key ----------
+    def _key(self, text: str, kind: str) -> str:
+        raw = "\x1f".join([self.model_name, kind, normalize_for_cache(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ---------- Storage ----------
+    def _get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # SQLite 변수 개수 제한(999)을 넘지 않도록 나눠서 조회
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                        [time.time(), *chunk],
+                    )
+            self._conn.commit()
+        return found
+
+    def _put_many(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(k, array("f", v).tobytes(), now) for k, v in items.items()],
+            )
+            # REPLACE된 키도 더하므로 실제보다 크거나 같음 (넘었을 때만 COUNT로 확인)
+            self._count += len(items)
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _row_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _evict(self):
+        """max_entries 초과분을 LRU(last_used 오래된 순)로 삭제 (10% 여유를 두고)"""
+        count = self._row_count()  # 다른 프로세스(적재/앱)가 같은 파일에 쓴 행까지 포함
+        if count <= self.max_entries:
+            self._count = count
+            return
+        target = int(self.max_entries * 0.9)
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?
+            )
+            """,
+            (count - target,),
+        )
+        self._count = target
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [self._key(t, kind) for t in texts]
+        found = self._get_many(keys)
+
+        # miss난 텍스트만 (중복 제거 후) 모델에 전달
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        with self._lock:  # registry가 여러 스레드에서 같은 인스턴스를 씀
+            self.hits += len(texts) - sum(1 for k in keys if k in missing)
+            self.misses += len(missing)
+
+        if missing:
+            miss_keys = list(missing)
+            miss_texts = [missing[k] for k in miss_keys]
+            if kind == "query":
+                vectors = [self.embeddings.embed_query(t) for t in miss_texts]
+            else:
+                vectors = self.embeddings.embed_documents(miss_texts)
+            computed = dict(zip(miss_keys, vectors))
+            self._put_many(computed)
+            found.update(computed)
+
+        return [found[k] for k in keys]
+
+    # ---------- Embeddings API ----------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(list(texts), "document")
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query")[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def build_embeddings(
+    model_name: str,
+    cache_path: Optional[Path] = None,
+    max_entries: int = 0,
+) -> Embeddings:
+    """
+    적재/질의 공통 임베딩 모델 (cache_path가 있으면 영구 캐시를 앞에 둠)
+    적재와 질의가 같은 모델 / 같은 캐시 파일을 쓰도록 이 함수 하나로만 만든다.
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    embeddings = HuggingFaceEmbeddings(model_name=model_name)  # type: ignore
+    if cache_path is None:
+        return embeddings
+    return CachedEmbeddings(
+        embeddings,
+        model_name=model_name,
+        cache_path=cache_path,
+        max_entries=max_entries,
+    )
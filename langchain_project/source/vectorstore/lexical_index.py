@@ -0,0 +1,261 @@
+# vectorstore/lexical_index.py
+"""
+BM25 역색인 + 벡터 검색 결과와의 Reciprocal Rank Fusion
+
+MiniLM 임베딩은 "뇌출혈", "음주운전", "제3조" 같은 정확한 용어 차이를 흐리기 때문에
+조항 본문과 level 제목을 한국어 토크나이저(음절 bigram + 조항번호 토큰)로 색인해
+벡터 검색 결과와 순위 기반으로 합친다.
+
+적재(ingest)와 질의(query) 양쪽에서 쓰므로 settings를 import하지 않고 인자로 받는다.
+"""
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+INDEX_VERSION = 1
+LEVEL_KEYS = ("level_1", "level_2", "level_3", "level_4")
+
+_ARTICLE = re.compile(r"제\s*(\d+)\s*(편|장|절|관|조)")
+_HANGUL = re.compile(r"[가-힣]+")
+_ALNUM = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 약관용 토크나이저
+    - "제 3 조" / "제3조" → "제3조" (조항 번호 토큰)
+    - 한글 연속 구간 → 음절 bigram (뇌출혈 → 뇌출, 출혈 / 1음절은 그대로)
+    - 영문/숫자 단어
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = [f"제{number}{unit}" for number, unit in _ARTICLE.findall(text)]
+    for run in _HANGUL.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(_ALNUM.findall(text))
+    return tokens
+
+
+def doc_insurance_types(metadata: Dict[str, Any]) -> Set[Optional[str]]:
+    """조항이 속한 보험유형들 (중복 제거 적재된 대표 조항은 insurance_types 전체)"""
+    return set(metadata.get("insurance_types") or [metadata.get("insurance_type")])
+
+
+def index_text(page_content: str, metadata: Dict[str, Any]) -> str:
+    """색인 대상: level 제목 + 조항 본문"""
+    titles = [metadata.get(key) for key in LEVEL_KEYS]
+    return "\n".join([t for t in titles if t] + [page_content])
+
+
+class BM25Index:
+    """
+    조항 단위 BM25 역색인 (보험유형 필터 지원)
+
+    BM25 항 idf * tf * (k1 + 1) / (tf + norm)은 질의와 무관하므로 로딩할 때 term별
+    (문서 번호 배열, 가중치 배열)로 한 번 계산해 두고, 질의는 그 배열들을 NumPy로 합산한다.
+    "보험", "지급" 같은 흔한 bigram은 거의 모든 조항에 있어서 Python 루프로 돌면 질의마다 수십만 번 돈다.
+    """
+
+    def __init__(self, data: Dict[str, Any], k1: float = 1.5, b: float = 0.75):
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"❌ 지원하지 않는 BM25 인덱스 버전: {data.get('version')}")
+        self.collection_name: str = data.get("collection", "")
+        self.docs: List[Dict[str, Any]] = data["docs"]
+        self.doc_len: List[int] = data["doc_len"]
+        self.types: List[Set[Optional[str]]] = [doc_insurance_types(d["metadata"] or {}) for d in self.docs]
+        self.k1 = k1
+        self.b = b
+        avgdl = (sum(self.doc_len) / len(self.doc_len)) if self.doc_len else 1.0
+        # 문서 길이 정규화 항은 질의와 무관하므로 미리 계산
+        self.norms = k1 * (1 - b + b * np.asarray(self.doc_len, dtype=np.float32) / avgdl)
+        self.idf: Dict[str, float] = {}
+        self.weights: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: self._term_weights(term, posting) for term, posting in data["postings"].items() if posting
+        }
+        self._type_masks: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # ---------- Build / Persist ----------
+    @staticmethod
+    def build_data(
+        ids: Sequence[Any],
+        payloads: Sequence[Dict[str, Any]],
+        collection_name: str = "",
+    ) -> Dict[str, Any]:
+        docs: List[Dict[str, Any]] = []
+        doc_len: List[int] = []
+        postings: Dict[str, List[List[int]]] = defaultdict(list)
+
+        for i, (point_id, payload) in enumerate(zip(ids, payloads)):
+            metadata = payload.get("metadata") or {}
+            page_content = payload.get("page_content", "")
+            tokens = tokenize(index_text(page_content, metadata))
+            for term, tf in Counter(tokens).items():
+                postings[term].append([i, tf])
+            doc_len.append(len(tokens))
+            docs.append({"id": str(point_id), "page_content": page_content, "metadata": metadata})
+
+        return {
+            "version": INDEX_VERSION,
+            "collection": collection_name,
+            "docs": docs,
+            "doc_len": doc_len,
+            "postings": postings,
+        }
+
+    @staticmethod
+    def build(
+        path: Path,
+        ids: Sequence[Any],
+        payloads: Sequence[Dict[str, Any]],
+        collection_name: str = "",
+    ) -> Path:
+        """인덱스 파일 생성 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(BM25Index.build_data(ids, payloads, collection_name), f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), k1=k1, b=b)
+
+    # ---------- Search ----------
+    def _idf(self, df: int) -> float:
+        return math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def _term_weights(self, term: str, posting: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """posting [[문서 번호, tf], ...] → (문서 번호 배열, BM25 가중치 배열)"""
+        pairs = np.asarray(posting, dtype=np.int64)
+        docs, tf = pairs[:, 0], pairs[:, 1].astype(np.float32)
+        idf = self.idf[term] = self._idf(len(posting))
+        return docs.astype(np.int32), (idf * tf * (self.k1 + 1) / (tf + self.norms[docs])).astype(np.float32)
+
+    def reference_score(self, query_terms: Set[str]) -> float:
+        """
+        기준 점수: 평균 길이 조항에 질의 term(색인에 있는 것)이 모두 한 번씩 나올 때의 BM25 점수
+        (tf = 1, 길이 정규화 1 → term마다 idf * (k1 + 1) / 2)
+        """
+        return (self.k1 + 1) / 2 * sum(self.idf.get(term, 0.0) for term in query_terms)
+
+    def _type_mask(self, insurance_type: str) -> np.ndarray:
+        """문서 번호 → 해당 보험유형 조항인지 (bool 배열, 유형별로 한 번만 생성)"""
+        mask = self._type_masks.get(insurance_type)
+        if mask is None:
+            mask = np.fromiter(
+                (insurance_type in types for types in self.types), dtype=bool, count=len(self.types)
+            )
+            self._type_masks[insurance_type] = mask
+        return mask
+
+    def search(
+        self, query: str, k: int, insurance_type: Optional[str] = None, min_score: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """
+        (문서 번호, BM25 점수) 상위 k개, 점수 내림차순 (insurance_type이 있으면 해당 유형 문서만)
+        min_score: 기준 점수(reference_score) 대비 최소 비율 (질의 term 대부분이 안 맞는 조항 제외)
+        """
+        n = len(self.docs)
+        if not n or k <= 0:
+            return []
+
+        query_terms = set(tokenize(query))
+        terms = [self.weights[term] for term in query_terms if term in self.weights]
+        if not terms:
+            return []
+        docs = np.concatenate([d for d, _ in terms])
+        weights = np.concatenate([w for _, w in terms])
+        if insurance_type:
+            keep = self._type_mask(insurance_type)[docs]
+            docs, weights = docs[keep], weights[keep]
+            if not len(docs):
+                return []
+
+        scores = np.bincount(docs, weights=weights, minlength=n)
+        matched = np.flatnonzero(scores)  # 가중치는 모두 양수 → 점수 > 0 인 문서 = 질의 term이 있는 문서
+        if min_score > 0:
+            matched = matched[scores[matched] >= min_score * self.reference_score(query_terms)]
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        # 점수 내림차순, 같으면 문서 번호 순
+        top = matched[np.lexsort((matched, -scores[matched]))]
+        return [(int(doc), float(scores[doc])) for doc in top]
+
+    def document(self, doc: int) -> Document:
+        """QdrantVectorStore와 같은 Document 형태 (metadata에 _id / _collection_name)"""
+        record = self.docs[doc]
+        metadata = dict(record["metadata"])
+        metadata["_id"] = record["id"]
+        metadata["_collection_name"] = self.collection_name
+        return Document(page_content=record["page_content"], metadata=metadata)
+
+    def search_documents(
+        self, query: str, k: int, insurance_type: Optional[str] = None, min_score: float = 0.0
+    ) -> List[Document]:
+        return [self.document(doc) for doc, _ in self.search(query, k, insurance_type, min_score)]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Document]], k: int, rrf_k: int = 60
+) -> List[Document]:
+    """
+    여러 검색 결과를 순위만으로 합침: score(d) = Σ 1 / (rrf_k + rank)
+    같은 조항은 metadata["_id"]로 식별하고, 먼저 나온 목록의 Document를 사용한다.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    first_seen: Dict[str, Document] = {}
+    for docs in ranked_lists:
+        for rank, doc in enumerate(docs, start=1):
+            key = str(doc.metadata.get("_id", id(doc)))
+            scores[key] += 1.0 / (rrf_k + rank)
+            first_seen.setdefault(key, doc)
+
+    ordered = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [first_seen[key] for key in ordered[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    벡터 검색기 + BM25 결과를 RRF로 합치는 검색기 (get_retriever와 같은 인터페이스)
+    벡터 결과가 0개면 BM25 결과만으로 채우지 않는다 (score_threshold / 보험유형 fallback 판단은 벡터 기준).
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vector_retriever: BaseRetriever
+    lexical_index: BM25Index
+    insurance_type: Optional[str] = None
+    k: int = 4
+    candidates: int = 20
+    rrf_k: int = 60
+    min_score: float = 0.0
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        vector_docs = self.vector_retriever.invoke(query)
+        if not vector_docs:
+            return []
+        lexical_docs = self.lexical_index.search_documents(
+            query, self.candidates, self.insurance_type, self.min_score
+        )
+        return reciprocal_rank_fusion([vector_docs, lexical_docs], self.k, self.rrf_k)
@@ -0,0 +1,270 @@
+# vectorstore/local_index.py
+"""
+Qdrant 없이 쓰는 로컬 벡터 인덱스 (NumPy memmap)
+
+디렉터리 구조:
+    vectors.npy          float32 (N, dim), L2 정규화, 보험유형별로 연속 구간에 정렬
+    payload_offsets.npy  int64 (N + 1), payloads.jsonl의 줄 시작 byte 위치
+    payloads.jsonl       한 줄에 {"id", "page_content", "metadata"} 하나
+    meta.json            차원 / 개수 / 보험유형별 [start, end) 구간
+                         + 구간 밖인데 그 유형에도 속하는 행 (중복 제거 적재된 대표 조항의 insurance_types)
+
+벡터는 mmap으로 열어 필요한 구간만 OS가 올리고, 보험유형 필터는 해당 구간만 계산한다(사전 필터).
+검색은 정규화 벡터 내적(= Qdrant COSINE 점수)으로 정확(exact) 검색한다.
+
+적재(ingest)와 질의(query) 양쪽에서 쓰므로 settings를 import하지 않고 인자로 받는다.
+"""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+from qdrant_client import QdrantClient
+
+INDEX_VERSION = 1
+UNKNOWN_TYPE = ""  # insurance_type이 없는 포인트의 구간 키
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalVectorIndex:
+    """mmap된 벡터 + 보험유형별 구간 + 지연 로딩 payload"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"❌ 지원하지 않는 로컬 인덱스 버전: {meta.get('version')}")
+
+        self.collection_name: str = meta.get("collection", "")
+        self.dim: int = meta["dim"]
+        self.type_ranges: Dict[str, Tuple[int, int]] = {
+            t: (start, end) for t, (start, end) in meta["types"].items()
+        }
+        self.type_extra_rows: Dict[str, np.ndarray] = {
+            t: np.asarray(rows, dtype=np.int64) for t, rows in meta.get("type_extra_rows", {}).items()
+        }
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        self.offsets = np.load(self.path / "payload_offsets.npy", mmap_mode="r")
+        self._payloads = open(self.path / "payloads.jsonl", "rb")
+        self._payload_lock = threading.Lock()  # 여러 요청 스레드가 같은 파일 핸들을 공유
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    # ---------- Build ----------
+    @staticmethod
+    def build(
+        path: Path,
+        ids: Sequence[Any],
+        vectors: Sequence[Sequence[float]],
+        payloads: Sequence[Dict[str, Any]],
+        collection_name: str = "",
+    ) -> Path:
+        """
+        포인트들로 인덱스 디렉터리 생성 (임시 디렉터리에 쓴 뒤 교체 → 읽는 쪽은 항상 완전한 인덱스)
+
+        Args:
+            ids: point ID
+            vectors: 임베딩 벡터
+            payloads: {"page_content", "metadata"} (QdrantVectorStore payload와 동일)
+        """
+        path = Path(path)
+        if not (len(ids) == len(vectors) == len(payloads)):
+            raise ValueError("❌ ids / vectors / payloads 길이가 다릅니다")
+
+        def type_of(i: int) -> str:
+            return (payloads[i].get("metadata") or {}).get("insurance_type") or UNKNOWN_TYPE
+
+        # 보험유형별로 연속 구간이 되도록 정렬
+        order = sorted(range(len(ids)), key=type_of)
+        if ids:
+            matrix = _normalize(np.asarray(vectors, dtype=np.float32))[order]
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        types: Dict[str, List[int]] = {}
+        type_extra_rows: Dict[str, List[int]] = {}
+        for row, i in enumerate(order):
+            span = types.setdefault(type_of(i), [row, row])
+            span[1] = row + 1
+            for t in (payloads[i].get("metadata") or {}).get("insurance_types") or ():
+                if t != type_of(i):
+                    type_extra_rows.setdefault(t, []).append(row)
+
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        np.save(tmp / "vectors.npy", matrix)
+        offsets = [0]
+        with open(tmp / "payloads.jsonl", "wb") as f:
+            for i in order:
+                line = json.dumps(
+                    {
+                        "id": str(ids[i]),
+                        "page_content": payloads[i].get("page_content", ""),
+                        "metadata": payloads[i].get("metadata") or {},
+                    },
+                    ensure_ascii=False,
+                ).encode("utf-8") + b"\n"
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+        np.save(tmp / "payload_offsets.npy", np.asarray(offsets, dtype=np.int64))
+        (tmp / "meta.json").write_text(
+            json.dumps(
+                {
+                    "version": INDEX_VERSION,
+                    "collection": collection_name,
+                    "dim": int(matrix.shape[1]) if len(ids) else 0,
+                    "count": len(ids),
+                    "types": types,
+                    "type_extra_rows": type_extra_rows,
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+        old = path.with_name(path.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return path
+
+    # ---------- Search ----------
+    def search(
+        self,
+        query_vector: Sequence[float],
+        k: int,
+        insurance_type: Optional[str] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """(행 번호, cosine 점수) 상위 k개, 점수 내림차순"""
+        extra = None
+        if insurance_type:
+            start, end = self.type_ranges.get(insurance_type, (0, 0))
+            extra = self.type_extra_rows.get(insurance_type)
+        else:
+            start, end = 0, len(self)
+        if (end <= start and extra is None) or k <= 0:
+            return []
+
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        scores = self.vectors[start:end] @ query
+        rows = None
+        if extra is not None:
+            # 다른 유형 구간에 있지만 이 유형에도 속하는 행
+            scores = np.concatenate([scores, self.vectors[extra] @ query])
+            rows = np.concatenate([np.arange(start, end, dtype=np.int64), extra])
+
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        if rows is None:
+            results = [(start + int(i), float(scores[i])) for i in top]
+        else:
+            results = [(int(rows[i]), float(scores[i])) for i in top]
+        if score_threshold is not None:
+            results = [(row, score) for row, score in results if score >= score_threshold]
+        return results
+
+    def payload(self, row: int) -> Dict[str, Any]:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        with self._payload_lock:
+            self._payloads.seek(start)
+            data = self._payloads.read(end - start)
+        return json.loads(data)
+
+    def document(self, row: int) -> Document:
+        """QdrantVectorStore와 같은 Document 형태 (metadata에 _id / _collection_name)"""
+        record = self.payload(row)
+        metadata = dict(record["metadata"])
+        metadata["_id"] = record["id"]
+        metadata["_collection_name"] = self.collection_name
+        return Document(page_content=record["page_content"], metadata=metadata)
+
+    def search_documents(
+        self,
+        query_vector: Sequence[float],
+        k: int,
+        insurance_type: Optional[str] = None,
+        score_threshold: Optional[float] = None,
+    ) -> List[Document]:
+        return [
+            self.document(row)
+            for row, _ in self.search(query_vector, k, insurance_type, score_threshold)
+        ]
+
+    def close(self):
+        self._payloads.close()
+
+
+class LocalIndexRetriever(BaseRetriever):
+    """get_retriever와 같은 인터페이스의 로컬 인덱스 검색기"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: LocalVectorIndex
+    embeddings: Embeddings
+    insurance_type: Optional[str] = None
+    k: int = 4
+    score_threshold: Optional[float] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.index.search_documents(
+            self.embeddings.embed_query(query),
+            self.k,
+            self.insurance_type,
+            self.score_threshold,
+        )
+
+
+def iter_qdrant_points(
+    client: QdrantClient, collection_name: str, batch_size: int = 1000
+) -> Iterable[Any]:
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        yield from points
+        if offset is None:
+            break
+
+
+def export_from_qdrant(
+    client: QdrantClient, collection_name: str, path: Path, batch_size: int = 1000
+) -> int:
+    """Qdrant 컬렉션 전체(벡터 + payload)를 로컬 인덱스로 내보내기, 포인트 수 반환"""
+    ids, vectors, payloads = [], [], []
+    for point in iter_qdrant_points(client, collection_name, batch_size):
+        ids.append(point.id)
+        vectors.append(point.vector)
+        payloads.append(point.payload or {})
+    LocalVectorIndex.build(path, ids, vectors, payloads, collection_name=collection_name)
+    return len(ids)
@@ -0,0 +1,36 @@
+# vectorstore/qdrant_client.py
+from qdrant_client import QdrantClient
+
+from config.settings import QDRANT_HOST, QDRANT_PORT, QDRANT_POOL_SIZE, COLLECTION_NAME
+from vectorstore.collection import find_missing_payload_indexes
+
+_index_checked = False
+
+
+def get_qdrant_client() -> QdrantClient:
+    # pool_size: 여러 스레드가 같은 client를 공유할 때 HTTP connection 재사용
+    return QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT, pool_size=QDRANT_POOL_SIZE)
+
+
+def check_payload_indexes(client: QdrantClient) -> None:
+    """
+    기존 컬렉션에 payload index가 빠져 있으면 경고 (프로세스당 1회)
+    index 생성은 적재 쪽(ensure_collection)에서 한다.
+    """
+    global _index_checked
+    if _index_checked:
+        return
+    _index_checked = True
+
+    try:
+        missing = find_missing_payload_indexes(client, COLLECTION_NAME)
+    except Exception as e:
+        print(f"⚠️ payload index 확인 실패: {e}")
+        return
+
+    if missing:
+        print(
+            f"⚠️ {COLLECTION_NAME} 컬렉션에 payload index가 없습니다: {', '.join(missing)} "
+            "→ 필터 검색이 payload를 전부 훑습니다. "
+            "`python -m source.ingest.ingest_all --incremental`로 index를 생성하세요."
+        )
@@ -0,0 +1,533 @@
+# vectorstore/registry.py
+"""
+프로세스 전역 검색 객체 레지스트리
+
+Qdrant client(HTTP connection pool), 임베딩 모델, QdrantVectorStore,
+보험유형별 retriever를 프로세스당 한 번만 만들고 모든 요청/스레드가 공유한다.
+요청 경로에서는 이미 만들어진 객체를 꺼내기만 한다.
+
+VECTOR_BACKEND="local"이면 Qdrant 대신 로컬 memmap 인덱스(LocalVectorIndex)로 검색한다.
+HYBRID_SEARCH_ENABLED이면 벡터 검색 결과를 BM25 결과와 RRF로 합친다.
+ARTICLE_LOOKUP_ENABLED이면 "제N조"처럼 조항 번호를 묻는 질문을 조항 색인에서 바로 찾는다.
+TYPE_CLASSIFIER_ENABLED이면 보험유형 centroid 분류기를 함께 로딩한다.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient, models
+
+from config.settings import (
+    ALLOWED_INSURANCE_TYPES,
+    COLLECTION_NAME,
+    TOP_K,
+    SCORE_THRESHOLD,
+    SPECULATIVE_CANDIDATES,
+    SPECULATIVE_WORKERS,
+    VECTOR_BACKEND,
+    LOCAL_INDEX_DIR,
+    HYBRID_SEARCH_ENABLED,
+    HYBRID_CANDIDATES,
+    LEXICAL_INDEX_PATH,
+    RRF_K,
+    BM25_K1,
+    BM25_B,
+    BM25_MIN_SCORE,
+    ARTICLE_LOOKUP_ENABLED,
+    ARTICLE_INDEX_PATH,
+    ARTICLE_LOOKUP_MAX_AMBIGUOUS,
+    TYPE_CLASSIFIER_ENABLED,
+    TYPE_CLASSIFIER_PATH,
+    TYPE_CLASSIFIER_TEMPERATURE,
+    INGEST_MANIFEST_PATH,
+    COLLECTION_VERSION_CHECK_SECONDS,
+)
+from vectorstore.article_index import ArticleIndex, mentioned_insurance_types, merge_documents
+from vectorstore.lexical_index import (
+    BM25Index,
+    HybridRetriever,
+    doc_insurance_types,
+    reciprocal_rank_fusion,
+)
+from vectorstore.local_index import LocalIndexRetriever, LocalVectorIndex
+from vectorstore.qdrant_client import check_payload_indexes, get_qdrant_client
+from vectorstore.type_classifier import TypeCentroidClassifier
+from vectorstore.retriever import (
+    build_retriever,
+    build_type_filter,
+    get_embeddings,
+    get_search_params,
+)
+
+
+@dataclass
+class SpeculativeResult:
+    """분류와 동시에 시작한 전체 검색 결과"""
+    candidates: List[Document]
+    started_at: float
+    finished_at: float
+
+    @property
+    def exhaustive(self) -> bool:
+        # 후보 수가 limit보다 적으면 score_threshold를 넘는 문서를 모두 가져온 것
+        return len(self.candidates) < SPECULATIVE_CANDIDATES
+
+
+class VectorStoreRegistry:
+    """
+    client / 임베딩 모델 / vectorstore / 보험유형별 retriever를 lazy하게 한 번만 생성
+    (double-checked locking으로 여러 스레드가 동시에 처음 요청해도 한 번만 생성)
+    """
+
+    def __init__(self, backend: str = VECTOR_BACKEND):
+        if backend not in ("qdrant", "local"):
+            raise ValueError(f"❌ 지원하지 않는 VECTOR_BACKEND: {backend}")
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._client: Optional[QdrantClient] = None
+        self._embeddings: Optional[Embeddings] = None
+        self._vectorstore: Optional[QdrantVectorStore] = None
+        self._local_index: Optional[LocalVectorIndex] = None
+        self._lexical_index: Optional[BM25Index] = None
+        self._lexical_checked = False
+        self._article_index: Optional[ArticleIndex] = None
+        self._article_checked = False
+        self._type_classifier: Optional[TypeCentroidClassifier] = None
+        self._type_classifier_checked = False
+        self._retrievers: Dict[Optional[str], BaseRetriever] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._collection_version: Optional[Tuple[float, str]] = None  # (확인 시각, 버전)
+
+    @property
+    def is_local(self) -> bool:
+        return self.backend == "local"
+
+    @property
+    def client(self) -> QdrantClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    client = get_qdrant_client()
+                    check_payload_indexes(client)
+                    self._client = client
+        return self._client
+
+    @property
+    def embeddings(self) -> Embeddings:
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = get_embeddings()
+        return self._embeddings
+
+    @property
+    def vectorstore(self) -> QdrantVectorStore:
+        if self._vectorstore is None:
+            with self._lock:
+                if self._vectorstore is None:
+                    self._vectorstore = QdrantVectorStore(
+                        client=self.client,
+                        collection_name=COLLECTION_NAME,
+                        embedding=self.embeddings,
+                    )
+        return self._vectorstore
+
+    @property
+    def local_index(self) -> LocalVectorIndex:
+        if self._local_index is None:
+            with self._lock:
+                if self._local_index is None:
+                    self._local_index = LocalVectorIndex(LOCAL_INDEX_DIR)
+        return self._local_index
+
+    @property
+    def lexical_index(self) -> Optional[BM25Index]:
+        """BM25 인덱스 (HYBRID_SEARCH_ENABLED이고 인덱스 파일이 있을 때만, 없으면 벡터 검색만)"""
+        if not self._lexical_checked:
+            with self._lock:
+                if not self._lexical_checked:
+                    if HYBRID_SEARCH_ENABLED:
+                        if Path(LEXICAL_INDEX_PATH).exists():
+                            self._lexical_index = BM25Index.load(
+                                LEXICAL_INDEX_PATH, k1=BM25_K1, b=BM25_B
+                            )
+                        else:
+                            print(
+                                f"⚠️ BM25 인덱스가 없습니다: {LEXICAL_INDEX_PATH} → 벡터 검색만 사용합니다. "
+                                "`python -m source.ingest.lexical_index_build`로 생성하세요."
+                            )
+                    self._lexical_checked = True
+        return self._lexical_index
+
+    @property
+    def article_index(self) -> Optional[ArticleIndex]:
+        """조항 번호 색인 (ARTICLE_LOOKUP_ENABLED이고 색인 파일이 있을 때만)"""
+        if not self._article_checked:
+            with self._lock:
+                if not self._article_checked:
+                    if ARTICLE_LOOKUP_ENABLED:
+                        if Path(ARTICLE_INDEX_PATH).exists():
+                            self._article_index = ArticleIndex.load(ARTICLE_INDEX_PATH)
+                        else:
+                            print(
+                                f"⚠️ 조항 색인이 없습니다: {ARTICLE_INDEX_PATH} → 조항 직접 조회를 건너뜁니다. "
+                                "`python -m source.ingest.lexical_index_build`로 생성하세요."
+                            )
+                    self._article_checked = True
+        return self._article_index
+
+    @property
+    def type_classifier(self) -> Optional[TypeCentroidClassifier]:
+        """보험유형 centroid 분류기 (TYPE_CLASSIFIER_ENABLED이고 파일이 있을 때만, 없으면 LLM 분류)"""
+        if not self._type_classifier_checked:
+            with self._lock:
+                if not self._type_classifier_checked:
+                    if TYPE_CLASSIFIER_ENABLED:
+                        if Path(TYPE_CLASSIFIER_PATH).exists():
+                            self._type_classifier = TypeCentroidClassifier.load(
+                                TYPE_CLASSIFIER_PATH, temperature=TYPE_CLASSIFIER_TEMPERATURE
+                            )
+                        else:
+                            print(
+                                f"⚠️ 보험유형 분류기가 없습니다: {TYPE_CLASSIFIER_PATH} → LLM 분류를 사용합니다. "
+                                "`python -m source.ingest.type_classifier_build`로 생성하세요."
+                            )
+                    self._type_classifier_checked = True
+        return self._type_classifier
+
+    def _build_retriever(self, insurance_type: Optional[str]) -> BaseRetriever:
+        lexical = self.lexical_index
+        # 하이브리드면 벡터 후보를 넉넉히 가져온 뒤 RRF로 k개만 남긴다
+        k = HYBRID_CANDIDATES if lexical is not None else TOP_K
+
+        if self.is_local:
+            retriever: BaseRetriever = LocalIndexRetriever(
+                index=self.local_index,
+                embeddings=self.embeddings,
+                insurance_type=insurance_type,
+                k=k,
+                score_threshold=SCORE_THRESHOLD,
+            )
+        else:
+            retriever = build_retriever(self.vectorstore, insurance_type, k=k)
+
+        if lexical is None:
+            return retriever
+        return HybridRetriever(
+            vector_retriever=retriever,
+            lexical_index=lexical,
+            insurance_type=insurance_type,
+            k=TOP_K,
+            candidates=HYBRID_CANDIDATES,
+            rrf_k=RRF_K,
+            min_score=BM25_MIN_SCORE,
+        )
+
+    def get_retriever(self, insurance_type: Optional[str] = None) -> BaseRetriever:
+        """보험유형별 retriever (None이면 필터 없는 전체 검색)"""
+        retriever = self._retrievers.get(insurance_type)
+        if retriever is None:
+            with self._lock:
+                retriever = self._retrievers.get(insurance_type)
+                if retriever is None:
+                    retriever = self._build_retriever(insurance_type)
+                    self._retrievers[insurance_type] = retriever
+        return retriever
+
+    def embed_query(self, question: str) -> List[float]:
+        """질문 임베딩 (요청당 한 번 계산해서 모든 검색/단계에 재사용)"""
+        return self.embeddings.embed_query(question)
+
+    def embed_queries(self, questions: List[str]) -> List[List[float]]:
+        """여러 질문 임베딩을 한 번에 계산 (대칭 임베딩 모델이라 문서 임베딩과 같은 벡터)"""
+        return self.embeddings.embed_documents(questions)
+
+    def _vector_search(
+        self, query_vector: List[float], insurance_type: Optional[str], limit: int
+    ) -> List[Document]:
+        """
+        미리 계산한 질문 벡터로 벡터 검색만 수행
+        QdrantVectorStore의 by_vector 검색은 매번 컬렉션 설정을 조회하므로 client로 직접 검색한다.
+        """
+        if self.is_local:
+            return self.local_index.search_documents(
+                query_vector, limit, insurance_type, SCORE_THRESHOLD
+            )
+
+        points = self.client.query_points(
+            collection_name=COLLECTION_NAME,
+            query=query_vector,
+            query_filter=build_type_filter(insurance_type),
+            search_params=get_search_params(),
+            limit=limit,
+            score_threshold=SCORE_THRESHOLD,
+            with_payload=True,
+            with_vectors=False,
+        ).points
+        return self._to_documents(points)
+
+    def _fuse(
+        self,
+        vector_docs: List[Document],
+        question: Optional[str],
+        insurance_type: Optional[str],
+        k: int,
+    ) -> List[Document]:
+        """
+        BM25 결과와 RRF로 합쳐 k개 (BM25 인덱스가 없거나 질문이 없으면 벡터 결과 그대로)
+        벡터 결과가 0개(SCORE_THRESHOLD 이상 없음)면 BM25 결과만으로 채우지 않는다
+        → fallback 여부는 기존처럼 벡터 검색 결과로만 정해진다.
+        """
+        lexical = self.lexical_index
+        if lexical is None or not question or not vector_docs:
+            return vector_docs[:k]
+        lexical_docs = lexical.search_documents(
+            question, HYBRID_CANDIDATES, insurance_type, BM25_MIN_SCORE
+        )
+        return reciprocal_rank_fusion([vector_docs, lexical_docs], k, RRF_K)
+
+    def _candidate_limit(self, question: Optional[str], k: int) -> int:
+        return max(k, HYBRID_CANDIDATES) if question and self.lexical_index is not None else k
+
+    def search_by_vector(
+        self,
+        query_vector: List[float],
+        insurance_type: Optional[str] = None,
+        k: int = TOP_K,
+        question: Optional[str] = None,
+    ) -> List[Document]:
+        """
+        미리 계산한 질문 벡터로 검색 (retriever.invoke와 같은 k / score_threshold / 필터)
+        question을 넘기면 BM25 결과와 RRF로 합친다 (하이브리드 검색).
+        """
+        limit = self._candidate_limit(question, k)
+        return self._fuse(
+            self._vector_search(query_vector, insurance_type, limit), question, insurance_type, k
+        )
+
+    def search_with_fallback(
+        self,
+        query_vector: List[float],
+        insurance_type: Optional[str],
+        k: int = TOP_K,
+        question: Optional[str] = None,
+    ) -> Tuple[List[Document], bool]:
+        """
+        보험유형 필터 검색 + 전체 검색을 한 번의 batch 요청으로 보내고 결과를 로컬에서 선택
+        question을 넘기면 양쪽 모두 BM25 결과와 RRF로 합친다.
+
+        Returns:
+            (docs, fallback_activated) - 필터 결과가 0개일 때만 전체 검색 결과를 쓰고 True
+        """
+        if not insurance_type:
+            # 필터가 없으면 두 검색이 같으므로 한 번만 (0개면 기존처럼 fallback으로 기록)
+            docs = self.search_by_vector(query_vector, None, k, question)
+            return docs, not docs
+
+        if self.is_local:
+            # 로컬 인덱스는 네트워크 왕복이 없으므로 필터 검색 후 필요할 때만 전체 검색
+            docs = self.search_by_vector(query_vector, insurance_type, k, question)
+            if docs:
+                return docs, False
+            return self.search_by_vector(query_vector, None, k, question), True
+
+        limit = self._candidate_limit(question, k)
+        search_params = get_search_params()
+        filtered, unfiltered = self.client.query_batch_points(
+            collection_name=COLLECTION_NAME,
+            requests=[
+                models.QueryRequest(
+                    query=query_vector,
+                    filter=type_filter,
+                    params=search_params,
+                    limit=limit,
+                    score_threshold=SCORE_THRESHOLD,
+                    with_payload=True,
+                    with_vector=False,
+                )
+                for type_filter in (build_type_filter(insurance_type), None)
+            ],
+        )
+        docs = self._fuse(self._to_documents(filtered.points), question, insurance_type, k)
+        if docs:
+            return docs, False
+        return self._fuse(self._to_documents(unfiltered.points), question, None, k), True
+
+    def lookup_articles(
+        self,
+        question: str,
+        insurance_type: Optional[str] = None,
+        k: int = TOP_K,
+    ) -> Tuple[List[Document], Optional[str]]:
+        """
+        질문에 조항 번호(제N조 / 제N관 ...)가 있으면 조항 색인에서 바로 조회 (분류/임베딩/검색 없음)
+        insurance_type이 없으면 질문에 적힌 보험유형 이름으로만 좁힌다.
+        같은 번호가 여러 약관에 있으면 ARTICLE_LOOKUP_MAX_AMBIGUOUS개만 반환 (나머지는 fill_with_search로 채움)
+
+        Returns:
+            (docs, insurance_type) - 찾은 조항이 모두 한 보험유형이면 그 유형, 아니면 None (분류 필요)
+        """
+        index = self.article_index
+        if index is None or not question:
+            return [], None
+        if insurance_type:
+            insurance_types = {insurance_type}
+        else:
+            insurance_types = mentioned_insurance_types(question, ALLOWED_INSURANCE_TYPES) or None
+        return index.lookup_documents(question, k, insurance_types, ARTICLE_LOOKUP_MAX_AMBIGUOUS)
+
+    def fill_with_search(
+        self,
+        docs: List[Document],
+        query_vector: List[float],
+        insurance_type: Optional[str] = None,
+        k: int = TOP_K,
+        question: Optional[str] = None,
+    ) -> List[Document]:
+        """조항 색인 결과(docs)를 앞에 두고 부족한 만큼만 검색 결과로 채움 (중복 제외)"""
+        if len(docs) >= k:
+            return list(docs)
+        return merge_documents(docs, self.search_by_vector(query_vector, insurance_type, k, question), k)
+
+    def start_speculative_search(self, query_vector: List[float]) -> "Future[SpeculativeResult]":
+        """
+        보험유형 분류(LLM)를 기다리지 않고 필터 없는 벡터 검색을 백그라운드에서 시작
+        분류가 끝나면 resolve_speculative로 보험유형에 맞게 로컬 필터링한다.
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=SPECULATIVE_WORKERS, thread_name_prefix="speculative-search"
+                    )
+
+        def run() -> SpeculativeResult:
+            started_at = time.time()
+            candidates = self._vector_search(query_vector, None, SPECULATIVE_CANDIDATES)
+            return SpeculativeResult(candidates, started_at, time.time())
+
+        return self._executor.submit(run)
+
+    def resolve_speculative(
+        self,
+        speculative: SpeculativeResult,
+        query_vector: List[float],
+        insurance_type: Optional[str],
+        k: int = TOP_K,
+        question: Optional[str] = None,
+    ) -> Tuple[List[Document], bool, bool]:
+        """
+        미리 받은 전체 검색 후보를 보험유형으로 로컬 필터링
+        후보 안에 해당 유형 문서가 충분하면 그대로 쓰고(필터 검색 결과와 같은 순서), 부족하면 필터 검색을 한 번 더 보낸다.
+
+        Returns:
+            (docs, fallback_activated, requeried)
+        """
+        limit = self._candidate_limit(question, k)
+        candidates = speculative.candidates
+        if not insurance_type:
+            docs = self._fuse(candidates[:limit], question, None, k)
+            return docs, not docs, False
+
+        matched = [d for d in candidates if insurance_type in doc_insurance_types(d.metadata)]
+        if len(matched) >= limit or speculative.exhaustive:
+            filtered, requeried = matched[:limit], False
+        else:
+            filtered, requeried = self._vector_search(query_vector, insurance_type, limit), True
+
+        docs = self._fuse(filtered, question, insurance_type, k)
+        if docs:
+            return docs, False, requeried
+        # 필터 결과가 0개면 기존 fallback처럼 전체 검색 결과 사용
+        return self._fuse(candidates[:limit], question, None, k), True, requeried
+
+    def _to_documents(self, points: List[models.ScoredPoint]) -> List[Document]:
+        """검색 결과 point → QdrantVectorStore와 같은 Document 형태 (metadata에 _id / _collection_name)"""
+        vectorstore = self.vectorstore
+        content_key = vectorstore.content_payload_key
+        metadata_key = vectorstore.metadata_payload_key
+        docs = []
+        for point in points:
+            payload = point.payload or {}
+            metadata = dict(payload.get(metadata_key) or {})
+            metadata["_id"] = point.id
+            metadata["_collection_name"] = COLLECTION_NAME
+            docs.append(Document(page_content=payload.get(content_key, ""), metadata=metadata))
+        return docs
+
+    def warm_up(self, insurance_types: Iterable[Optional[str]] = (None, *sorted(ALLOWED_INSURANCE_TYPES))):
+        """
+        앱 시작 시 호출: Qdrant 연결(또는 로컬 인덱스) 확인 + 임베딩 모델 로딩 + retriever 생성을 미리 끝낸다
+        (컨텍스트 토큰 예산용 tokenizer도 여기서 로딩 → 첫 요청이 다운로드를 기다리지 않음)
+        """
+        from chains.token_counter import get_context_token_counter  # chains → registry 순환 import 방지
+
+        if self.is_local:
+            self.local_index  # 인덱스 파일 확인 (없으면 예외)
+        else:
+            self.client.get_collection(COLLECTION_NAME)  # 연결/컬렉션 확인 (실패 시 예외)
+        self.embeddings.embed_query("warm up")
+        self.lexical_index  # BM25 인덱스 로딩
+        self.article_index  # 조항 색인 로딩
+        self.type_classifier  # 보험유형 분류기 로딩
+        get_context_token_counter()
+        for insurance_type in insurance_types:
+            self.get_retriever(insurance_type)
+
+    def collection_version(self) -> str:
+        """
+        적재 상태가 바뀌면 달라지는 값 (답변 캐시 무효화용)
+        manifest(로컬 인덱스는 meta.json) 수정 시각 + 포인트 수, COLLECTION_VERSION_CHECK_SECONDS마다 다시 확인
+        """
+        now = time.time()
+        cached = self._collection_version
+        if cached is not None and now - cached[0] < COLLECTION_VERSION_CHECK_SECONDS:
+            return cached[1]
+
+        if self.is_local:
+            marker = Path(LOCAL_INDEX_DIR) / "meta.json"
+            count = len(self.local_index)
+        else:
+            marker = Path(INGEST_MANIFEST_PATH)
+            count = self.client.count(COLLECTION_NAME, exact=False).count
+        mtime = marker.stat().st_mtime_ns if marker.exists() else 0
+        version = f"{mtime}:{count}"
+        self._collection_version = (now, version)
+        return version
+
+    def reset(self):
+        """테스트/설정 변경 시 모든 객체를 버리고 다음 요청에서 다시 생성"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            if self._local_index is not None:
+                self._local_index.close()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._client = None
+            self._local_index = None
+            self._lexical_index = None
+            self._lexical_checked = False
+            self._article_index = None
+            self._article_checked = False
+            self._type_classifier = None
+            self._type_classifier_checked = False
+            self._embeddings = None
+            self._vectorstore = None
+            self._retrievers = {}
+            self._collection_version = None
+
+
+_registry = VectorStoreRegistry()
+
+
+def get_registry() -> VectorStoreRegistry:
+    return _registry
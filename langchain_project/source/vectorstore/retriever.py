@@ -0,0 +1,84 @@
+# vectorstore/retriever.py
+from typing import Optional
+
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStoreRetriever
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client.http import models
+
+from config.settings import (
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    TOP_K,
+    SCORE_THRESHOLD,
+    QDRANT_QUANTIZATION,
+    QDRANT_SEARCH_HNSW_EF,
+    QDRANT_SEARCH_RESCORE,
+    QDRANT_SEARCH_OVERSAMPLING,
+)
+from vectorstore.embedding_cache import build_embeddings
+from vectorstore.collection import build_search_params
+
+
+def get_embeddings():
+    # 적재(ingest)와 같은 모델 / 같은 캐시 파일을 공유 → 반복 질문은 모델을 거치지 않음
+    return build_embeddings(
+        EMBEDDING_MODEL,
+        EMBEDDING_CACHE_PATH if EMBEDDING_CACHE_ENABLED else None,
+        EMBEDDING_CACHE_MAX_ENTRIES,
+    )
+
+
+def get_search_params() -> Optional[models.SearchParams]:
+    """settings의 hnsw_ef / 양자화 rescore·oversampling → SearchParams"""
+    return build_search_params(
+        hnsw_ef=QDRANT_SEARCH_HNSW_EF,
+        quantization=QDRANT_QUANTIZATION,
+        rescore=QDRANT_SEARCH_RESCORE,
+        oversampling=QDRANT_SEARCH_OVERSAMPLING,
+    )
+
+
+def build_type_filter(insurance_type: Optional[str]) -> Optional[models.Filter]:
+    """
+    보험유형 payload 필터 (None이면 필터 없음)
+    중복 제거(dedup) 적재된 대표 포인트는 insurance_types(family 전체 유형 목록)로도 매칭
+    """
+    if not insurance_type:
+        return None
+    return models.Filter(
+        should=[
+            models.FieldCondition(
+                key=key,  # QdrantVectorStore는 metadata 하위에 저장
+                match=models.MatchValue(value=insurance_type),
+            )
+            for key in ("metadata.insurance_type", "metadata.insurance_types")
+        ]
+    )
+
+
+def build_retriever(
+    vectorstore: QdrantVectorStore, insurance_type: Optional[str] = None, k: int = TOP_K
+) -> VectorStoreRetriever:
+    search_kwargs = {"k": k, "score_threshold": SCORE_THRESHOLD}
+    search_params = get_search_params()
+    if search_params is not None:
+        search_kwargs["search_params"] = search_params
+    type_filter = build_type_filter(insurance_type)
+    if type_filter is not None:
+        search_kwargs["filter"] = type_filter
+
+    return vectorstore.as_retriever(search_kwargs=search_kwargs)
+
+
+def get_retriever(insurance_type: Optional[str] = None) -> BaseRetriever:
+    """
+    보험유형 필터 검색기 반환 (insurance_type=None이면 필터 없이 전체 검색)
+    프로세스 전역 레지스트리에서 꺼내므로 client/임베딩 모델을 다시 만들지 않는다.
+    VECTOR_BACKEND="local"이면 같은 Document를 돌려주는 로컬 인덱스 검색기를 반환한다.
+    """
+    from vectorstore.registry import get_registry  # registry가 이 모듈의 builder를 import
+
+    return get_registry().get_retriever(insurance_type)
@@ -0,0 +1,136 @@
+# vectorstore/type_classifier.py
+"""
+보험유형 로컬 분류기 (nearest centroid)
+
+컬렉션의 보험유형별 조항 임베딩 평균(centroid)과 질문 임베딩의 cosine 유사도로 보험유형을 고른다.
+모든 약관이 "보험" 도메인이라 원본 centroid끼리는 서로 매우 가깝기 때문에
+전체 평균을 뺀(centering) 방향으로 비교해야 유형 간 차이가 드러난다.
+
+    score_t    = cos(q - μ, c_t - μ)
+    confidence = softmax(score * temperature)의 최고 확률
+
+질문 임베딩은 검색에 쓰는 것을 그대로 재사용하므로 분류 비용은 유형 수(7) x 384 내적뿐이다.
+적재(ingest)와 질의(query) 양쪽에서 쓰므로 settings를 import하지 않고 인자로 받는다.
+"""
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 1
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class TypeCentroidClassifier:
+    """보험유형별 centroid + 전체 평균"""
+
+    def __init__(
+        self,
+        types: Sequence[str],
+        centroids: np.ndarray,
+        mean: np.ndarray,
+        counts: Sequence[int],
+        temperature: float = 20.0,
+    ):
+        self.types = list(types)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.counts = list(counts)
+        self.temperature = temperature
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    # ---------- Build / Persist ----------
+    @classmethod
+    def from_vectors(
+        cls, items: Iterable[Tuple[Sequence[float], Iterable[str]]], temperature: float = 20.0
+    ) -> "TypeCentroidClassifier":
+        """
+        (벡터, 그 조항이 속한 보험유형들) → 분류기
+        중복 제거 적재된 대표 조항은 insurance_types 전체에 한 번씩 더한다.
+        """
+        sums: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+        total = None
+        n = 0
+        for vector, types in items:
+            v = _normalize(np.asarray(vector, dtype=np.float64))
+            total = v.copy() if total is None else total + v
+            n += 1
+            for t in types:
+                if not t:
+                    continue
+                sums[t] = sums[t] + v if t in sums else v.copy()
+                counts[t] = counts.get(t, 0) + 1
+
+        if not sums:
+            raise ValueError("❌ 보험유형이 있는 벡터가 없습니다")
+
+        mean = total / n
+        types = sorted(sums)
+        centroids = _normalize(np.stack([sums[t] / counts[t] - mean for t in types]))
+        return cls(types, centroids, mean, [counts[t] for t in types], temperature)
+
+    def save(self, path: Path) -> Path:
+        """npz 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            version=np.asarray(INDEX_VERSION),
+            types=np.asarray(self.types),
+            centroids=self.centroids,
+            mean=self.mean,
+            counts=np.asarray(self.counts, dtype=np.int64),
+        )
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, temperature: float = 20.0) -> "TypeCentroidClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != INDEX_VERSION:
+                raise ValueError(f"❌ 지원하지 않는 분류기 파일 버전: {int(data['version'])}")
+            return cls(
+                [str(t) for t in data["types"]],
+                data["centroids"],
+                data["mean"],
+                data["counts"].tolist(),
+                temperature,
+            )
+
+    # ---------- Predict ----------
+    def scores(self, query_vector: Sequence[float]) -> np.ndarray:
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        return self.centroids @ _normalize(query - self.mean)
+
+    def predict(self, query_vector: Sequence[float]) -> Tuple[str, float, Dict[str, float]]:
+        """
+        Returns:
+            (보험유형, confidence, 유형별 확률)
+        """
+        logits = self.scores(query_vector) * self.temperature
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(np.argmax(probs))
+        return (
+            self.types[best],
+            float(probs[best]),
+            {t: float(p) for t, p in zip(self.types, probs)},
+        )
+
+
+def iter_typed_vectors(points: Iterable[Any]) -> Iterable[Tuple[List[float], List[str]]]:
+    """Qdrant point(vector + payload) → (벡터, 보험유형들)"""
+    for point in points:
+        metadata = (point.payload or {}).get("metadata") or {}
+        types = metadata.get("insurance_types") or [metadata.get("insurance_type")]
+        yield point.vector, types
@@ -0,0 +1,278 @@
+# benchmark_splitter.py
+"""
+조항 분할 벤치마크: 중첩 split_with_pattern (현재 방식) vs 단일 패스 스캐너 (실험)
+
+단일 패스 스캐너는 텍스트를 한 번만 훑으며 level 제목 상태를 추적하고 조항을 offset으로 내보낸다.
+중간 구간 문자열을 복사하지 않아 할당은 적지만, 제목마다 Python에서 상태를 갱신하는 비용 때문에
+CPython에서는 C 안에서 끝나는 중첩 re.split보다 처리량이 낮아 preprocessing에는 넣지 않았다.
+인터프리터/코퍼스가 바뀌면 이 벤치마크로 다시 비교한다.
+
+실제 XML 코퍼스에서
+- 두 방식의 결과가 완전히 같은지 파일마다 검증하고
+- 처리량(MB/s, 조항/s)과 메모리 할당(tracemalloc peak / 결과 크기)을 비교한다.
+
+실행:
+    poetry run python test/source/benchmark_splitter.py --limit 200 --repeat 3
+"""
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from source.ingest.preprocessing import (  # noqa: E402
+    LEVEL_PATTERNS,
+    extract_insurance_type,
+    load_xml_text,
+    resolve_structure_type,
+    split_with_pattern,
+)
+
+DATA_DIR = PROJECT_ROOT / "source" / "data_selected"
+
+Clause = Tuple[Tuple[Optional[str], ...], str]
+
+
+# ---------- 현재 방식 (iter_documents_from_xml의 분할 로직) ----------
+def nested_split(text: str, structure_type: str) -> List[Clause]:
+    patterns = LEVEL_PATTERNS[structure_type]
+    clauses: List[Clause] = []
+
+    if structure_type == "automobile":
+        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
+            for l2_title, l2_body in split_with_pattern(l1_body, patterns["level_2"]):
+                for l3_title, l3_body in split_with_pattern(l2_body, patterns["level_3"]):
+                    jo_parts = patterns["level_4"].split(l3_body)
+                    if len(jo_parts) > 1:
+                        for i in range(1, len(jo_parts), 2):
+                            clauses.append((
+                                (l1_title, l2_title, l3_title, jo_parts[i].strip()),
+                                jo_parts[i + 1].strip(),
+                            ))
+                    else:
+                        content = l3_body.strip()
+                        if content:
+                            clauses.append(((l1_title, l2_title, l3_title, None), content))
+    else:
+        for l1_title, l1_body in split_with_pattern(text, patterns["level_1"]):
+            jo_parts = patterns["level_2"].split(l1_body)
+            if len(jo_parts) > 1:
+                for i in range(1, len(jo_parts), 2):
+                    clauses.append(((l1_title, jo_parts[i].strip()), jo_parts[i + 1].strip()))
+            else:
+                content = l1_body.strip()
+                if content:
+                    clauses.append(((l1_title, None), content))
+
+    return clauses
+
+
+# ---------- 단일 패스 (실험) ----------
+# 구조 타입별 level 순서: (제목 키워드, 제목 꼬리 형태)
+#   line  → 제목이 줄 끝까지   (LEVEL_PATTERNS의 [^\n]*)
+#   paren → 제목이 (...)까지 (LEVEL_PATTERNS의 \s*\([^)]+\))
+LEVEL_HEADINGS = {
+    "automobile": [("편", "line"), ("장", "line"), ("절", "line"), ("조", "paren")],
+    "default": [("관", "line"), ("조", "paren")],
+}
+
+
+def _heading_pattern(headings: List[Tuple[str, str]]) -> re.Pattern:
+    """
+    모든 level 제목을 한 번에 찾는 정규식 (level i 제목이면 빈 group i + 1이 매치)
+
+    기존 중첩 split은 하위 level 제목을 상위 level 본문 안에서만 찾았기 때문에
+    하위 제목의 꼬리([^\n]*, [^)]+)가 다음 상위 제목 시작 위치를 넘지 못했다.
+    꼬리 글자마다 "상위 제목 시작(제N편 ...)이 아님"을 조건으로 걸어 같은 결과를 낸다.
+    공통 앞부분 "제"로 시작해야 정규식 엔진이 후보 위치를 빠르게 건너뛴다.
+    """
+    alternatives = []
+    for depth, (keyword, tail) in enumerate(headings):
+        higher = "".join(k for k, _ in headings[:depth])
+        stop = "\n" if tail == "line" else ")"
+        # [^\n]* / [^)]* 에서 상위 제목 시작만 제외 (글자마다 분기하지 않도록 풀어 쓴 형태)
+        chars = rf"[^{stop}제]*(?:제(?!\s*\d+\s*[{higher}])[^{stop}제]*)*" if higher else rf"[^{stop}]*"
+        tail_pattern = chars if tail == "line" else rf"\s*\((?!\)){chars}\)"
+        alternatives.append(rf"{keyword}(){tail_pattern}")
+    return re.compile(r"제\s*\d+\s*(?:" + "|".join(alternatives) + r")")
+
+
+HEADING_PATTERNS = {
+    structure_type: _heading_pattern(headings)
+    for structure_type, headings in LEVEL_HEADINGS.items()
+}
+
+
+class ClauseRecord(NamedTuple):
+    """조항 1개: level 제목들 + 정규화 텍스트 내 본문 위치 (앞뒤 공백 제외)"""
+    titles: Tuple[Optional[str], ...]
+    start: int
+    end: int
+
+
+# 조항마다 만드는 레코드라 NamedTuple의 Python __new__를 거치지 않고 바로 생성
+_new_record = tuple.__new__
+
+
+def scan_clauses(text: str, structure_type: str) -> List[ClauseRecord]:
+    """
+    정규화된 텍스트를 한 번만 훑으면서 level 제목 상태를 추적하는 스캐너
+    (편 → 장 → 절 → 조 / 관 → 조 중첩 split과 동일한 조항을 같은 순서로 반환)
+
+    중첩 split의 규칙:
+    - 상위 구간 안에 어떤 level 제목이 하나라도 있으면, 첫 제목 앞부분은 버린다
+    - 없으면 상위 구간 전체가 해당 level 제목 None으로 내려간다
+    - 최하위(조) 제목이 있으면 본문이 비어 있어도 조항으로 남기고,
+      없으면 본문이 비어 있지 않을 때만 남긴다
+
+    제목 찾기는 정규식(C) 안에서 끝나고, Python에서는 제목마다 본문 앞뒤 공백과 상태만 처리한다.
+    (텍스트는 정규화되어 있어 맨 앞/맨 뒤에 공백이 없다)
+    상위 제목이 나오면 앞부분이 버려질 수 있어 조항 목록을 다 만든 뒤 한 번에 반환한다 (offset만 담으므로 작음).
+    """
+    depth = len(LEVEL_HEADINGS[structure_type])
+    leaf = depth - 1
+
+    titles: List[Optional[str]] = [None] * depth
+    seen = [False] * depth      # 현재 상위 구간에서 해당 level 제목을 봤는지
+    marks = [0] * depth         # 현재 상위 구간이 시작될 때까지 만든 조항 수
+    records: List[ClauseRecord] = []
+    append = records.append
+    body_start = 0
+
+    for match in HEADING_PATTERNS[structure_type].finditer(text):
+        body_end, next_start = match.span()
+        # 본문 앞뒤 공백 제외 (정규화된 텍스트라 보통 줄바꿈 하나)
+        while body_start < body_end and text[body_start].isspace():
+            body_start += 1
+        while body_end > body_start and text[body_end - 1].isspace():
+            body_end -= 1
+        if body_start < body_end or titles[leaf] is not None:
+            append(_new_record(ClauseRecord, (tuple(titles), body_start, body_end)))
+        body_start = next_start
+
+        level = match.lastindex - 1
+        if level == leaf and seen[leaf]:
+            # 대부분의 제목(조)은 여기서 끝남 ("제N조(...)"라 앞뒤 공백 없음)
+            titles[leaf] = match.group()
+            continue
+
+        if not seen[level]:
+            # 이 level의 첫 제목 → 상위 구간 시작 이후 만든 조항(앞부분)은 버림
+            del records[marks[level]:]
+            seen[level] = True
+
+        titles[level] = match.group().rstrip()  # 다음 상위 제목 앞에서 잘린 줄 제목은 끝에 공백이 남을 수 있음
+        total = len(records)
+        for lower in range(level + 1, depth):
+            titles[lower] = None
+            seen[lower] = False
+            marks[lower] = total
+
+    while body_start < len(text) and text[body_start].isspace():
+        body_start += 1
+    if body_start < len(text) or titles[leaf] is not None:
+        append(_new_record(ClauseRecord, (tuple(titles), body_start, len(text))))
+    return records
+
+
+def single_pass_split(text: str, structure_type: str) -> List[Clause]:
+    return [(titles, text[start:end]) for titles, start, end in scan_clauses(text, structure_type)]
+
+
+def single_pass_offsets(text: str, structure_type: str) -> List[ClauseRecord]:
+    """본문을 자르지 않은 scan_clauses 결과 그대로 (쓰는 쪽에서 offset으로 한 번만 자름)"""
+    return scan_clauses(text, structure_type)
+
+
+def measure(
+    splitter: Callable[[str, str], Sequence],
+    corpus: List[Tuple[str, str]],
+    repeat: int,
+) -> Dict[str, float]:
+    total_bytes = sum(len(text.encode("utf-8")) for text, _ in corpus)
+
+    # 처리량: tracemalloc 없이 측정
+    best = float("inf")
+    clauses = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clauses = sum(len(splitter(text, st)) for text, st in corpus)
+        best = min(best, time.perf_counter() - start)
+
+    # 메모리: 파일별 할당 peak (중간 부분 문자열 복사 포함) / 결과로 남는 크기
+    peaks = []
+    retained = []
+    for text, st in corpus:
+        tracemalloc.start()
+        result = splitter(text, st)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        retained.append(current)
+        del result
+
+    return {
+        "seconds": best,
+        "mb_per_s": total_bytes / best / 1e6 if best else 0.0,
+        "clauses_per_s": clauses / best if best else 0.0,
+        "clauses": clauses,
+        "max_peak_kb": max(peaks) / 1024,
+        "avg_peak_kb": sum(peaks) / len(peaks) / 1024,
+        "avg_retained_kb": sum(retained) / len(retained) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조항 분할 벤치마크")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--limit", type=int, default=None, help="사용할 XML 파일 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    xml_files = sorted(args.data_dir.glob("*.xml"))[: args.limit]
+    if not xml_files:
+        raise SystemExit(f"❌ XML 파일이 없습니다: {args.data_dir}")
+
+    # XML 로딩은 두 방식이 같으므로 미리 끝내두고 분할만 측정
+    names: List[str] = []
+    corpus: List[Tuple[str, str]] = []
+    for xml_file in xml_files:
+        try:
+            structure_type = resolve_structure_type(extract_insurance_type(str(xml_file)))
+            corpus.append((load_xml_text(str(xml_file)), structure_type))
+            names.append(xml_file.name)
+        except Exception as e:
+            print(f"❌ 로딩 실패 {xml_file.name}: {e}")
+
+    mismatches = [
+        name
+        for name, (text, st) in zip(names, corpus)
+        if nested_split(text, st) != single_pass_split(text, st)
+    ]
+    print(f"파일 {len(corpus)}개 / 결과 불일치 {len(mismatches)}개")
+    for name in mismatches[:20]:
+        print(f"  ❌ {name}")
+
+    print(
+        f"\n{'splitter':<12}{'sec':>9}{'MB/s':>9}{'clauses/s':>12}"
+        f"{'max peak KB':>14}{'avg peak KB':>14}{'retained KB':>14}"
+    )
+    for name, splitter in [
+        ("nested", nested_split),
+        ("single_pass", single_pass_split),
+        ("offsets", single_pass_offsets),
+    ]:
+        r = measure(splitter, corpus, args.repeat)
+        print(
+            f"{name:<12}{r['seconds']:>9.3f}{r['mb_per_s']:>9.2f}{r['clauses_per_s']:>12,.0f}"
+            f"{r['max_peak_kb']:>14,.1f}{r['avg_peak_kb']:>14,.1f}{r['avg_retained_kb']:>14,.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
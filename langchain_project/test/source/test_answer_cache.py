@@ -0,0 +1,57 @@
+# test_answer_cache.py
+"""
+답변 캐시 보험유형 범위 테스트
+
+실행:
+    poetry run python -m pytest test/source/test_answer_cache.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "source"))
+
+from chains.answer_cache import SemanticAnswerCache  # noqa: E402
+
+VECTOR = [0.6, 0.8, 0.0]
+PARAPHRASE = [0.59, 0.8, 0.01]  # cosine > 0.99
+
+
+def _cache():
+    cache = SemanticAnswerCache(max_entries=10, ttl_seconds=3600, threshold=0.95)
+    cache.put("자동차보험 청구 서류", VECTOR, "자동차보험", {"answer": "자동차", "docs": []})
+    return cache
+
+
+def test_hit_within_same_type():
+    cached = _cache().get(PARAPHRASE, ["자동차보험"])
+    assert cached is not None
+    entry, similarity = cached
+    assert entry.insurance_type == "자동차보험" and similarity >= 0.95
+
+
+def test_no_hit_from_other_type():
+    # "화재보험 청구 서류"는 임베딩이 비슷해도 자동차보험 답변을 쓰면 안 됨
+    cache = _cache()
+    assert cache.get(PARAPHRASE, ["화재보험"]) is None
+    assert cache.get(PARAPHRASE, []) is None
+
+
+def test_version_change_clears():
+    cache = SemanticAnswerCache(max_entries=10, ttl_seconds=3600, threshold=0.95)
+    cache.put("자동차보험 청구 서류", VECTOR, "자동차보험", {"answer": "자동차"}, version="v1")
+    assert cache.get(VECTOR, ["자동차보험"], version="v2") is None
+
+
+def test_answer_cache_types():
+    pytest.importorskip("langchain_huggingface")  # insurance_classifier → registry → 임베딩 모델
+    from chains.insurance_classifier import InsuranceTypePrediction, answer_cache_types
+
+    pending = InsuranceTypePrediction("질병보험", 0.3, "pending")
+    assert answer_cache_types("자동차보험 청구 서류", pending) == ["자동차보험"]
+    assert answer_cache_types("화재보험 청구 서류", pending) == ["화재보험"]
+    assert answer_cache_types("청구 서류 알려줘", pending) == []
+
+    local = InsuranceTypePrediction("상해보험", 0.9, "local")
+    assert answer_cache_types("청구 서류 알려줘", local) == ["상해보험"]
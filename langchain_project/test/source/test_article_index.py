@@ -0,0 +1,85 @@
+# test_article_index.py
+"""
+조항 번호 추출 / 조회 테스트
+
+실행:
+    poetry run python -m pytest test/source/test_article_index.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "source"))
+
+from vectorstore.article_index import ArticleIndex, extract_article_refs, title_article_ref  # noqa: E402
+
+
+def _payload(insurance_type, source, level_1, level_2=None):
+    return {
+        "page_content": f"{level_1} {level_2 or ''} 본문",
+        "metadata": {
+            "insurance_type": insurance_type,
+            "level_1": level_1,
+            "level_2": level_2,
+            "level_3": None,
+            "level_4": None,
+            "source": source,
+        },
+    }
+
+
+def _index(payloads):
+    return ArticleIndex(ArticleIndex.build_data(range(len(payloads)), payloads, "test"))
+
+
+def test_extract_article_refs():
+    assert extract_article_refs("제12조 보험금 지급사유") == ["제12조"]
+    assert extract_article_refs("제 2 장 제 3 조") == ["제2장", "제3조"]
+    assert extract_article_refs("제12조의2 내용") == ["제12조의2"]
+    assert extract_article_refs("제1조만 보면 되나요") == ["제1조"]
+
+
+def test_extract_article_refs_ignores_amounts_and_counts():
+    # "제"가 없는 숫자 + 단위는 금액/수량
+    assert extract_article_refs("1조원 보상 가능한가요?") == []
+    assert extract_article_refs("보험금이 3장 필요해요") == []
+    assert extract_article_refs("서류 2장 내면 되나요") == []
+    assert extract_article_refs("12조 내용") == []
+    # 앞 단어 끝의 "제" + 금액 단위
+    assert extract_article_refs("경제 1조원 규모 보험사") == []
+
+
+def test_title_article_ref():
+    assert title_article_ref("제 1 장 배상책임") == "제1장"
+    assert title_article_ref("제2관 만기환급금") == "제2관"
+    assert title_article_ref("제3조(보험금의 지급사유)") == "제3조"
+    assert title_article_ref("보통약관") is None
+
+
+def test_lookup_ignores_amount_questions():
+    index = _index([_payload("질병보험", "a.xml", "제1관 목적", "제1조(목적)")])
+    docs, insurance_type = index.lookup_documents("1조원 보상 가능한가요?", 10, max_ambiguous=3)
+    assert docs == [] and insurance_type is None
+
+
+def test_lookup_caps_hits_across_policies():
+    payloads = [
+        _payload("질병보험" if i % 2 else "상해보험", f"{i}.xml", "제1관 목적", "제1조(목적)")
+        for i in range(20)
+    ]
+    index = _index(payloads)
+
+    docs, insurance_type = index.lookup_documents("제1조 내용", 10, max_ambiguous=3)
+    assert len(docs) == 3
+    assert insurance_type is None  # 여러 보험유형 → 분류 필요
+
+    docs, _ = index.lookup_documents("제1조 내용", 10)
+    assert len(docs) == 10
+
+
+def test_lookup_single_policy_not_capped():
+    payloads = [_payload("자동차보험", "car.xml", "제1편 배상책임", f"제{i}조(내용)") for i in range(1, 8)]
+    index = _index(payloads)
+
+    docs, insurance_type = index.lookup_documents("제1편", 10, max_ambiguous=3)
+    assert len(docs) == 7
+    assert insurance_type == "자동차보험"